@@ -57,7 +57,7 @@ def recognize_speaker(
         )
 
 @router.post("/transcription", response_model=TranscriptionResponse)
-def transcribe_audio(
+async def transcribe_audio(
     *,
     db: Session = Depends(get_db),
     audio_file: UploadFile = File(...),
@@ -68,18 +68,13 @@ def transcribe_audio(
     Transcribe audio file using Whisper
     """
     try:
-        # Save uploaded file to temporary location
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp_file:
-            save_upload_file(audio_file, tmp_file.name)
-            tmp_path = tmp_file.name
-        
-        # Transcribe audio
-        result = whisper_service.transcribe(tmp_path)
+        # Transcribe the uploaded WAV from memory (no temporary file)
+        audio_bytes = await audio_file.read()
+        result = await whisper_service.transcribe(audio_bytes)
+        if result.get("error"):
+            raise RuntimeError(result["error"])
         transcript = result.get("text", "")
-        language = result.get("language", "id")
-        
-        # Clean up temporary file
-        os.remove(tmp_path)
+        language = result.get("language") or "id"
         
         return TranscriptionResponse(
             transcript=transcript,
@@ -104,7 +99,7 @@ def extract_information(
     """
     try:
         # Extract information using LLM
-        extracted_info = llm_service.extract_information(request.transcript)
+        extracted_info = llm_service.extract_information_sync(request.transcript)
         
         return InformationExtractionResponse(
             extracted_info=extracted_info,
@@ -1,6 +1,5 @@
 import os
 import json
-import tempfile
 from typing import Any, List, Dict
 from app.core.config import settings
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
@@ -35,6 +34,7 @@ from app.processing.audio.feature_extractor import extract_33_mfcc_means, extrac
 from app.services.diarization_service import speaker_service
 from app.core.logger import api_logger
 from app.core.redis_client import redis_client, RedisQueue
+from app.core.interview_states import publish_interview_end
 
 router = APIRouter()
 
@@ -268,6 +268,10 @@ def update_interview(
     db.commit()
     db.refresh(interview)
     
+    # Finished interviews: workers drop their live state
+    if update_data.get("status") in (InterviewStatus.COMPLETED, InterviewStatus.CANCELLED):
+        publish_interview_end(interview.id, update_data["status"].value)
+    
     # Update extracted_data if present
     if interview_in.extracted_data:
         for key, value in interview_in.extracted_data.items():
@@ -361,6 +365,7 @@ def delete_interview(
         
         db.delete(interview)
         db.commit()
+        publish_interview_end(interview_id, "deleted")
     except Exception as e:
         db.rollback()
         import traceback
@@ -416,10 +421,14 @@ async def process_audio(
     *,
     db: Session = Depends(get_db),
     interview_id: int,
+    use_cache: bool = True,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Process audio file for an interview (transcription and information extraction)
+
+    LLM responses are cached by content, so reprocessing an unchanged interview
+    reuses them; use_cache=false forces fresh LLM calls.
     """
     # Check if interview exists and belongs to current user
     interview = db.query(Interview).filter(
@@ -488,8 +497,6 @@ async def process_audio(
         )
         
         # --- NEW LOGIC: Transcribe ALL segments for correction context ---
-        import soundfile as sf
-        
         full_transcript_segments = []
         raw_audio_data, sr = librosa.load(interview.raw_audio_path, sr=16000)
         
@@ -520,15 +527,9 @@ async def process_audio(
                 
             seg_audio = raw_audio_data[start_sample:end_sample]
             
-            # Save to temp for Whisper
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_seg:
-                tmp_seg_path = tmp_seg.name
-            
             try:
-                sf.write(tmp_seg_path, seg_audio, sr)
-                
-                # Transcribe
-                seg_result = await whisper_service.transcribe(tmp_seg_path)
+                # Transcribe straight from memory (no temp file)
+                seg_result = await whisper_service.transcribe(seg_audio, sample_rate=sr)
                 seg_text = seg_result.get("text", "").strip()
                 
                 if seg_text:
@@ -540,13 +541,10 @@ async def process_audio(
                     })
             except Exception as e:
                 api_logger.warning(f"Failed to transcribe segment {segment}: {e}")
-            finally:
-                if os.path.exists(tmp_seg_path):
-                    os.remove(tmp_seg_path)
 
         # Apply Diarization Correction
         api_logger.info("Applying LLM Diarization Correction...")
-        correction_result = llm_service.correct_diarization(full_transcript_segments)
+        correction_result = await llm_service.correct_diarization(full_transcript_segments, use_cache=use_cache)
         corrected_segments = correction_result.get("segments", [])
         
         # If correction failed or returned empty, fallback to original
@@ -589,7 +587,7 @@ async def process_audio(
 
         # Apply Transcription Normalization
         api_logger.info("Applying Transcription Normalization...")
-        normalized_transcript = llm_service.normalize_transcript(transcript_text)
+        normalized_transcript = await llm_service.normalize_transcript(transcript_text, use_cache=use_cache)
         
         # Determine strictness: If normalization fails or returns empty, fallback to original
         if not normalized_transcript:
@@ -628,7 +626,8 @@ async def process_audio(
         # Extract information using LLM
         # Use NORMALIZED transcript for best extraction results
         api_logger.info(f"Batch Transcript for extraction (len={len(final_transcript_text)})")
-        extracted_info = llm_service.extract_information(final_transcript_text)
+        interview_date = interview.created_at.date() if interview.created_at else None
+        extracted_info = await llm_service.extract_information(final_transcript_text, use_cache=use_cache, interview_date=interview_date)
         api_logger.info(f"Batch Extracted Info: {extracted_info}")
         
         # Save extracted information to ExtractedAnswer table
@@ -910,8 +909,8 @@ def export_interview_mfcc(
             if len(features_for_pred) > 0:
                 features_reshaped = features_for_pred.reshape(1, -1)
                 try:
-                    if speaker_service.model:
-                        prediction = speaker_service.model.predict(features_reshaped)[0]
+                    if speaker_service.scorer:
+                        prediction = speaker_service.scorer.predict(features_reshaped)[0]
                         
                         expected_enumerator_label = f"user_{current_user.id}"
                         
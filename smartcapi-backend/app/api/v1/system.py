@@ -3,7 +3,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from app.api import deps
 from app.db.models import User
 from app.core.logger import api_logger
-from app.core.redis_client import redis_client, RedisQueue
+from app.core.redis_client import redis_client, RedisQueue, RedisStream
+from app.services.llm_cache import llm_cache
 
 router = APIRouter()
 
@@ -29,11 +30,11 @@ async def clear_system_logs(
     try:
         if redis_client:
             redis_client.delete(
-                RedisQueue.AUDIO_WHISPER,
+                *RedisStream.all_audio(),
                 RedisQueue.MERGER_SEGMENTS,
                 RedisQueue.MERGER_TRANSCRIPTS,
                 RedisQueue.LLM_EXTRACTION,
-                RedisQueue.AUDIO_PROCESSING
+                RedisQueue.LLM_EXTRACTION_PENDING
             )
             api_logger.info("System Cleanup: Flushed Redis processing queues.")
         else:
@@ -77,3 +78,41 @@ async def clear_system_logs(
         "cleared_files": cleared_files,
         "errors": errors
     }
+
+
+@router.get("/llm-cache")
+def get_llm_cache_stats(
+    current_user: User = Depends(deps.get_current_admin_user),
+):
+    """
+    LLM response cache size and hit/miss counters (all processes).
+    Requires admin privileges.
+    """
+    try:
+        return llm_cache.stats()
+    except Exception as e:
+        api_logger.error(f"Failed to read LLM cache stats: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"LLM cache unavailable: {str(e)}"
+        )
+
+
+@router.delete("/llm-cache")
+def clear_llm_cache(
+    current_user: User = Depends(deps.get_current_admin_user),
+):
+    """
+    Drop every cached LLM response and reset the counters.
+    Requires admin privileges.
+    """
+    try:
+        deleted = llm_cache.clear()
+    except Exception as e:
+        api_logger.error(f"Failed to clear LLM cache: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"LLM cache unavailable: {str(e)}"
+        )
+    api_logger.info(f"LLM cache cleared by user {current_user.email} ({deleted} entries)")
+    return {"message": "LLM cache cleared", "deleted_entries": deleted}
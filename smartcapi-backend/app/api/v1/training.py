@@ -1,6 +1,5 @@
 import os
 import tempfile
-import pickle
 from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
@@ -12,6 +11,7 @@ from app.services.file_service import save_upload_file, generate_unique_filename
 from app.services.diarization_service import speaker_service
 from app.core.logger import api_logger
 from app.core.config import settings
+from app.core.training_state import enqueue_training_job, get_training_status
 
 router = APIRouter()
 
@@ -72,36 +72,29 @@ def train_speaker_model(
     current_user: User = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
-    Train the speaker recognition model with collected voice samples
+    Queue training of the speaker recognition model (Random Forest) with collected voice samples.
+    The training worker fits the model; follow it with /training/progress.
+    With SPEAKER_SCORER="profiles" predictions use the enrollment profiles and
+    the forest is only a fallback while no speaker is enrolled; the response
+    says so (`forest_active`).
     """
     try:
-        # Load training data
-        training_data_path = os.path.join(
-            os.path.dirname(settings.RF_MODEL_PATH), "training_data.pkl"
-        )
-        
-        if not os.path.exists(training_data_path):
+        if not speaker_service.training_store.counts():
             raise HTTPException(
                 status_code=404,
                 detail="No training data found. Add voice samples first."
             )
         
-        with open(training_data_path, 'rb') as f:
-            training_data = pickle.load(f)
-        
-        features = training_data['features']
-        labels = training_data['labels']
-        
-        # Train model
-        success = speaker_service.train_model(features, labels)
-        
-        if not success:
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to train speaker model"
-            )
+        job_id = enqueue_training_job("retrain", current_user.id)
         
-        return {"message": "Speaker model trained successfully"}
+        if settings.SPEAKER_SCORER == "profiles":
+            return {
+                "message": "Random Forest training queued. It is not used for predictions while SPEAKER_SCORER is 'profiles' (enrollment profiles are used instead)",
+                "job_id": job_id,
+                "scorer": settings.SPEAKER_SCORER,
+                "forest_active": False
+            }
+        return {"message": "Speaker model training queued", "job_id": job_id, "scorer": settings.SPEAKER_SCORER, "forest_active": True}
     except HTTPException:
         raise
     except Exception as e:
@@ -118,5 +111,4 @@ def get_training_progress(
     """
     Get training progress for current user.
     """
-    from app.core.training_state import get_training_status
     return get_training_status(current_user.id)
\ No newline at end of file
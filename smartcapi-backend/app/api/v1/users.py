@@ -10,6 +10,7 @@ import numpy as np
 import librosa
 
 from app.api import deps
+from app.core.logger import api_logger
 from app.db.database import get_db
 from app.db.models import User, UserRole
 from app.schemas.user import User as UserSchema, UserUpdate
@@ -76,20 +77,24 @@ async def upload_voice_sample(
     db.commit()
     db.refresh(current_user)
     
-    # Trigger training in background
-    from app.services.diarization_service import speaker_service
-    from app.core.training_state import update_training_status
-    
-    def train_task(user_id: int, file_path: str, speaker_label: str):
-        def progress_callback(progress, status, message):
-            update_training_status(user_id, progress, status, message)
-            
-        update_training_status(user_id, 0, "starting", "Starting training process...")
-        speaker_service.add_voice_sample(file_path, speaker_label, progress_callback)
-    
     # Assuming the user is an enumerator, but we can use role or just "user_{id}"
     speaker_label = f"user_{current_user.id}"
-    background_tasks.add_task(train_task, current_user.id, file_path, speaker_label)
+    
+    # Enroll in the training worker; progress is read from Redis (/training/progress)
+    from app.core.training_state import enqueue_training_job, update_training_status
+    try:
+        enqueue_training_job("enroll", current_user.id, speaker_label, os.path.abspath(file_path))
+    except Exception as e:
+        api_logger.warning(f"Training queue unavailable, enrolling in-process: {e}")
+        
+        def train_task(user_id: int, file_path: str, speaker_label: str):
+            def progress_callback(progress, status, message):
+                update_training_status(user_id, progress, status, message)
+                
+            update_training_status(user_id, 0, "starting", "Starting training process...")
+            speaker_service.add_voice_sample(file_path, speaker_label, progress_callback)
+        
+        background_tasks.add_task(train_task, current_user.id, file_path, speaker_label)
     
     return current_user
 
@@ -241,8 +246,8 @@ def export_user_interviews_mfcc(
                 if len(features_for_pred) > 0:
                     features_reshaped = features_for_pred.reshape(1, -1)
                     try:
-                        if speaker_service.model:
-                            prediction = speaker_service.model.predict(features_reshaped)[0]
+                        if speaker_service.scorer:
+                            prediction = speaker_service.scorer.predict(features_reshaped)[0]
                             
                             expected_enumerator_label = f"user_{user.id}"
                             
@@ -327,6 +332,14 @@ def delete_user(
     if os.path.exists(voice_sample_dir):
         shutil.rmtree(voice_sample_dir)
 
+    # Delete the user's speaker training data and enrollment profile (training worker)
+    from app.core.training_state import enqueue_training_job
+    try:
+        enqueue_training_job("remove", current_user.id, f"user_{user_id}")
+    except Exception as e:
+        api_logger.warning(f"Training queue unavailable, removing speaker in-process: {e}")
+        speaker_service.remove_speaker(f"user_{user_id}")
+
     # Finally, delete the user
     db.delete(user)
     db.commit()
@@ -444,6 +457,14 @@ def delete_user(
     if os.path.exists(voice_sample_dir):
         shutil.rmtree(voice_sample_dir)
 
+    # Delete the user's speaker training data and enrollment profile (training worker)
+    from app.core.training_state import enqueue_training_job
+    try:
+        enqueue_training_job("remove", current_user.id, f"user_{user_id}")
+    except Exception as e:
+        api_logger.warning(f"Training queue unavailable, removing speaker in-process: {e}")
+        speaker_service.remove_speaker(f"user_{user_id}")
+
     # Finally, delete the user
     db.delete(user)
     db.commit()
@@ -642,8 +663,8 @@ def export_user_interviews_mfcc(
                 if len(features_for_pred) > 0:
                     features_reshaped = features_for_pred.reshape(1, -1)
                     try:
-                        if speaker_service.model:
-                            prediction = speaker_service.model.predict(features_reshaped)[0]
+                        if speaker_service.scorer:
+                            prediction = speaker_service.scorer.predict(features_reshaped)[0]
                             
                             expected_enumerator_label = f"user_{user.id}"
                             
@@ -6,7 +6,6 @@ Refactored for Hybrid Worker Architecture (Redis Pub/Sub)
 import asyncio
 import json
 import time
-import base64
 from typing import Dict, Optional, List
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
 from sqlalchemy.orm import Session
@@ -16,7 +15,9 @@ from app.db.database import get_db
 from app.core.logger import api_logger
 from app.core.config import settings
 from app.services.question_manager import QuestionManager
-from app.core.redis_client import async_redis_client, RedisQueue, RedisChannel
+from app.core.redis_client import async_redis_client, RedisChannel
+from app.core.audio_stream import publish_audio_frame
+from app.processing.audio.frame_codec import encode_audio_frame
 
 router = APIRouter()
 
@@ -46,22 +47,19 @@ class InterviewSession:
             self.chunk_count += 1
             timestamp = time.time()
             
-            # Encode audio to base64 for JSON serialization
-            audio_b64 = base64.b64encode(audio_data).decode('utf-8')
+            # Compact binary envelope (header + raw int16 PCM), no base64/JSON
+            payload = encode_audio_frame(
+                self.interview_id,
+                self.user_id,
+                self.chunk_count,
+                timestamp,
+                audio_data
+            )
             
-            payload = json.dumps({
-                "interview_id": self.interview_id,
-                "user_id": self.user_id,
-                "timestamp": timestamp,
-                "audio_data": audio_b64
-            })
-            
-            # Push to both processing queues
+            # Write once to the interview's shard stream; each worker type
+            # reads it through its own consumer group
             if async_redis_client:
-                async with async_redis_client.pipeline() as pipe:
-                    pipe.rpush(RedisQueue.AUDIO_PROCESSING, payload)
-                    pipe.rpush(RedisQueue.AUDIO_WHISPER, payload)
-                    await pipe.execute()
+                await publish_audio_frame(self.interview_id, payload)
             
             # --- NEW: Save Raw Audio Stream to File ---
             # Append bytes directly to file
@@ -234,8 +232,16 @@ async def websocket_endpoint(
                         
                         if q_id and async_redis_client:
                             # Update current question in Redis for workers to see
+                            # and tell audio processors to drop their cached context
+                            # (the LLM worker also sends what it batched for the previous question)
                             redis_key = f"interview:{interview_id}:current_question"
-                            await async_redis_client.set(redis_key, str(q_id))
+                            pipe = async_redis_client.pipeline(transaction=False)
+                            pipe.set(redis_key, str(q_id))
+                            pipe.publish(RedisChannel.INTERVIEW_CONTEXT, json.dumps({
+                                "interview_id": interview_id,
+                                "current_question_id": q_id
+                            }))
+                            await pipe.execute()
                             api_logger.info(f"Set current question for interview {interview_id} to {q_id}")
                             
                             # Update DB
@@ -0,0 +1,201 @@
+"""
+Consumer-group reader for the sharded audio ingest streams.
+
+Each worker type reads the audio streams through its own consumer group, so a
+chunk is stored once but delivered to every worker type. Entries stay in the
+group's pending list until they are acknowledged, which lets a restarted (or
+different) consumer reclaim them instead of losing audio.
+"""
+
+import os
+import socket
+from typing import List, Optional, Tuple
+
+from redis.exceptions import ResponseError
+
+from app.core.config import settings
+from app.core.logger import ml_logger
+from app.core.redis_client import async_redis_client, RedisStream
+
+# (stream_name, entry_id, frame_bytes)
+StreamEntry = Tuple[str, bytes, bytes]
+
+
+# Function to get the (milliseconds, sequence) order of a stream entry id
+def entry_order(entry: StreamEntry) -> Tuple[int, int]:
+    entry_id = entry[1].decode("utf-8") if isinstance(entry[1], bytes) else entry[1]
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+# Function to get the consumer name for this process
+def default_consumer_name() -> str:
+    return settings.WORKER_NAME or f"{socket.gethostname()}-{os.getpid()}"
+
+
+class AudioStreamConsumer:
+    """Reads audio frames from the shard streams through one consumer group"""
+
+    # Function to initialize AudioStreamConsumer
+    def __init__(self, group: str, consumer: Optional[str] = None, shards: Optional[List[int]] = None):
+        self.group = group
+        self.consumer = consumer or default_consumer_name()
+        self._pending_done = {}
+        self._reclaim_cursor = {}
+        # Entries handed to this process and not yet acked or released (never reclaimed from ourselves)
+        self._delivered = set()
+        # Failed deliveries per entry (see release)
+        self._failures = {}
+        self.set_shards(shards if shards is not None else list(range(settings.AUDIO_STREAM_SHARDS)))
+
+    # Function to change the set of shards this consumer reads
+    def set_shards(self, shards: List[int]):
+        self.shards = list(shards)
+        self.streams = [RedisStream.audio(s) for s in self.shards]
+        # On newly added streams, read our own pending entries first (id "0"),
+        # then new ones (">")
+        self._pending_done = {stream: self._pending_done.get(stream, False) for stream in self.streams}
+        self._failures = {key: n for key, n in self._failures.items() if key[0] in self._pending_done}
+
+    # Function to create the consumer group on every stream
+    async def ensure_groups(self):
+        for stream in self.streams:
+            try:
+                await async_redis_client.xgroup_create(stream, self.group, id="0", mkstream=True)
+                ml_logger.info(f"Created consumer group '{self.group}' on {stream}")
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    # Function to read the next batch of frames
+    async def read(self, count: int = None, block_ms: Optional[int] = 1000) -> List[StreamEntry]:
+        """
+        Read frames for this consumer.
+
+        Our own pending entries (left over from a crash or released after a
+        failure) are replayed first, then new entries are read with a
+        blocking XREADGROUP (block_ms=None does not block).
+        """
+        count = count or settings.AUDIO_STREAM_BATCH
+        if not self.streams:
+            return []
+
+        pending_streams = [s for s in self.streams if not self._pending_done[s]]
+        try:
+            if pending_streams:
+                response = await async_redis_client.xreadgroup(
+                    self.group, self.consumer,
+                    {s: "0" for s in pending_streams},
+                    count=count
+                )
+                entries = [e for e in self._parse(response) if e[:2] not in self._delivered]
+                self._delivered.update(e[:2] for e in entries)
+                replayed = {stream for stream, _, _ in entries}
+                for stream in pending_streams:
+                    if stream not in replayed:
+                        self._pending_done[stream] = True
+                if entries:
+                    return entries
+
+            response = await async_redis_client.xreadgroup(
+                self.group, self.consumer,
+                {s: ">" for s in self.streams},
+                count=count,
+                block=block_ms
+            )
+            entries = self._parse(response)
+            self._delivered.update(e[:2] for e in entries)
+            return entries
+        except ResponseError as e:
+            if "NOGROUP" in str(e):
+                # Stream was deleted (e.g. system cleanup) - recreate groups
+                await self.ensure_groups()
+                return []
+            raise
+
+    # Function to acknowledge processed entries
+    async def ack(self, entries: List[StreamEntry]):
+        by_stream = {}
+        for stream, entry_id, _ in entries:
+            by_stream.setdefault(stream, []).append(entry_id)
+            self._delivered.discard((stream, entry_id))
+            self._failures.pop((stream, entry_id), None)
+        if not by_stream:
+            return
+        async with async_redis_client.pipeline(transaction=False) as pipe:
+            for stream, ids in by_stream.items():
+                pipe.xack(stream, self.group, *ids)
+            await pipe.execute()
+
+    # Function to hand back entries whose processing failed
+    async def release(self, entries: List[StreamEntry]):
+        """
+        Leave failed entries pending so the next read replays them (id "0").
+        An entry that failed AUDIO_STREAM_MAX_DELIVERIES times is acked and
+        dropped instead, so a frame that can never be applied does not block
+        its stream forever.
+        """
+        dropped = []
+        for entry in entries:
+            stream, entry_id, _ = entry
+            self._delivered.discard((stream, entry_id))
+            failures = self._failures.get((stream, entry_id), 0) + 1
+            if failures >= settings.AUDIO_STREAM_MAX_DELIVERIES:
+                dropped.append(entry)
+                continue
+            self._failures[(stream, entry_id)] = failures
+            if stream in self._pending_done:
+                self._pending_done[stream] = False
+        if dropped:
+            ml_logger.error(f"Dropping {len(dropped)} audio entries after {settings.AUDIO_STREAM_MAX_DELIVERIES} failed attempts")
+            await self.ack(dropped)
+
+    # Function to take over entries left pending by dead consumers
+    async def reclaim(self, count: int = None) -> List[StreamEntry]:
+        """
+        Claim entries pending for longer than AUDIO_STREAM_CLAIM_IDLE_MS from
+        any consumer in the group (typically a worker that crashed).
+        """
+        count = count or settings.AUDIO_STREAM_BATCH
+        entries: List[StreamEntry] = []
+        for stream in self.streams:
+            try:
+                response = await async_redis_client.xautoclaim(
+                    stream, self.group, self.consumer,
+                    min_idle_time=settings.AUDIO_STREAM_CLAIM_IDLE_MS,
+                    start_id=self._reclaim_cursor.get(stream, "0-0"),
+                    count=count
+                )
+            except ResponseError as e:
+                if "NOGROUP" in str(e):
+                    continue
+                raise
+            self._reclaim_cursor[stream] = response[0]
+            claimed = [e for e in self._parse([[stream, response[1]]]) if e[:2] not in self._delivered]
+            self._delivered.update(e[:2] for e in claimed)
+            if claimed:
+                ml_logger.warning(f"Reclaimed {len(claimed)} pending audio entries from {stream}")
+            entries.extend(claimed)
+        return entries
+
+    # Function to flatten an XREADGROUP/XAUTOCLAIM response
+    def _parse(self, response) -> List[StreamEntry]:
+        entries: List[StreamEntry] = []
+        for stream, messages in response or []:
+            if isinstance(stream, bytes):
+                stream = stream.decode("utf-8")
+            for entry_id, fields in messages:
+                # Trimmed entries come back without fields; keep them so they get acked
+                frame = (fields or {}).get(RedisStream.FRAME_FIELD, b"")
+                entries.append((stream, entry_id, frame))
+        return entries
+
+
+# Function to publish an audio frame to its shard stream
+async def publish_audio_frame(interview_id: int, frame: bytes):
+    await async_redis_client.xadd(
+        RedisStream.audio_for_interview(interview_id),
+        {RedisStream.FRAME_FIELD: frame},
+        maxlen=settings.AUDIO_STREAM_MAXLEN,
+        approximate=True
+    )
@@ -23,11 +23,37 @@ class Settings(BaseSettings):
     
     # OpenAI
     OPENAI_API_KEY: str = "Your Own Open AI API Key"
+    OPENAI_BASE_URL: Optional[str] = None  # Override the API endpoint (proxy, local mock server)
+    LLM_MAX_CONNECTIONS: int = 16  # Shared HTTP connection pool of the async OpenAI client
+    LLM_TIMEOUT: float = 60.0  # Seconds per OpenAI request
+    LLM_MAX_RETRIES: int = 5  # Retries of rate-limited (429) / transient failures (async client)
+    LLM_RETRY_BASE_DELAY: float = 0.5  # First backoff; doubles per retry, with jitter, unless the server sends Retry-After
+    LLM_RETRY_MAX_DELAY: float = 20.0  # Cap on a single backoff
+    LLM_MAX_IN_FLIGHT: int = 8  # Concurrent extractions in the LLM worker (across interviews; in order per interview)
+    LLM_INTERVIEW_QUEUE_MAX: int = 20  # Extraction batches queued per interview before the batch loop waits
+    LLM_CACHE_ENABLED: bool = True  # Reuse responses of identical LLM requests (app/services/llm_cache.py)
+    LLM_CACHE_TTL: int = 604800  # Seconds a cached response is kept (7 days)
+    LLM_CACHE_MAX_ENTRIES: int = 50000  # Least recently used responses are evicted beyond this many
+    LLM_CACHE_VERSION: str = "1"  # Bump to invalidate every cached response
     
     # Model paths
     RF_MODEL_PATH: str = os.path.join(BASE_DIR, "app", "processing", "models", "rf_model.pkl")
-    WHISPER_MODEL_PATH: str = os.path.join(BASE_DIR, "app", "processing", "models", "whisper_medium.pt") # Unused (API)
-    WHISPER_MODEL_SIZE: str = "medium"  # Unused (Using OpenAI API)
+    RF_ARRAYS_PATH: str = os.path.join(BASE_DIR, "app", "processing", "models", "rf_model.npz")  # Exported forest used for inference (mmap)
+    WHISPER_MODEL_PATH: str = os.path.join(BASE_DIR, "app", "processing", "models", "whisper_medium.pt") # Its directory is the faster-whisper download root
+    
+    # Whisper backend: "openai" (whisper-1 API) or "local" (faster-whisper)
+    WHISPER_BACKEND: str = "openai"
+    WHISPER_MODEL_SIZE: str = "small"  # faster-whisper model (local backend only)
+    WHISPER_DEVICE: str = "cpu"
+    WHISPER_COMPUTE_TYPE: str = "int8"
+    WHISPER_CPU_THREADS: int = 4  # CTranslate2 threads per inference
+    WHISPER_LOCAL_WORKERS: int = 1  # Dedicated inference threads per process
+    WHISPER_BEAM_SIZE: int = 1
+    WHISPER_NO_SPEECH_THRESHOLD: float = 0.6  # Drop a window as silence above this no-speech probability...
+    WHISPER_LOG_PROB_THRESHOLD: float = -1.0  # ...when its average token log-probability is also below this
+    WHISPER_BATCH_MAX_SIZE: int = 8  # Max windows decoded together (1 disables micro-batching)
+    WHISPER_BATCH_MAX_WAIT_MS: float = 30.0  # How long the first window waits for others
+    WHISPER_BATCH_BUCKET_SECONDS: float = 5.0  # Length bucket width for batching
 
     
     # Audio processing
@@ -35,11 +61,73 @@ class Settings(BaseSettings):
     CHUNK_DURATION: int = 5  # seconds
     SILENCE_THRESHOLD: float = 0.1  # Increased to reduce noise hallucinations (was 0.05)
     MIN_SILENCE_DURATION: float = 1.0  # Minimum silence duration in seconds
+
+    # Speaker identification
+    SPEAKER_WINDOW_SECONDS: float = 2.0  # Rolling window of streaming MFCC frames per speaker decision
+    SPEAKER_STREAM_TTL: float = 600.0  # Drop an interview's feature stream after this long idle
+    SPEAKER_EVENT_INTERVAL: float = 1.0  # speaker_detected at most this often per interview while the speaker is unchanged (0 = every chunk)
+    SPEAKER_EVENT_ON_CHANGE_ONLY: bool = False  # Only publish speaker_detected when the speaker changes
+    INTERVIEW_CONTEXT_CACHE_SIZE: int = 1024  # Interviews whose context the audio processor keeps locally
+    INTERVIEW_CONTEXT_TTL: float = 30.0  # Seconds before a cached interview context is re-read from Redis
+    MERGER_SEGMENT_SLACK_SECONDS: float = 2.0  # Segments kept before the last finalized transcript
+    MERGER_MAX_SEGMENTS: int = 20000  # Cap on retained segments per interview (~85 min of 256 ms chunks)
+    SPEAKER_SCORER: str = "profiles"  # "profiles" (incremental enrollment) or "forest" (Random Forest)
+    SPEAKER_PROFILES_PATH: str = os.path.join(BASE_DIR, "app", "processing", "models", "speaker_profiles.npz")
+    SPEAKER_PROFILE_TEMPERATURE: float = 0.1  # Softmax temperature over cosine similarities
+    SPEAKER_TRAINING_DATA_DIR: str = os.path.join(BASE_DIR, "app", "processing", "models", "training_data")  # Columnar training-data store
+    TRAINING_STATUS_TTL: int = 86400  # Seconds a user's training status hash is kept in Redis
+    MODEL_REGISTRY_DIR: str = os.path.join(BASE_DIR, "app", "processing", "models", "registry")  # Versioned speaker model artifacts
+    MODEL_REGISTRY_KEEP: int = 5  # Artifacts kept per model name (older versions stay in ml_models as history)
+    MODEL_REGISTRY_CHECK_SECONDS: float = 5.0  # How often processes look for a newer active version
+    MODEL_REGISTRY_LOCK_TIMEOUT: float = 120.0  # Max seconds a publish holds the per-name Redis lock (artifact write + commit)
+    SPEAKER_RF_RETRAIN: bool = False  # Also refit the Random Forest (background thread) after each enrollment
+
+    # Voice activity detection (app/processing/audio/vad.py)
+    VAD_FRAME_MS: int = 10
+    VAD_MARGIN_DB: float = 10.0  # Speech must be this far above the interview's noise floor
+    VAD_MIN_ENERGY_DB: float = -50.0  # Frames quieter than this (dBFS) are never speech
+    VAD_ZCR_MAX: float = 0.35  # Frames near the margin with a higher zero-crossing rate are treated as noise
+    VAD_HANGOVER_MS: int = 300  # Bridge pauses shorter than this
+    VAD_MIN_SPEECH_MS: int = 50  # Ignore bursts shorter than this (clicks, bumps)
+    VAD_NOISE_RISE_SECONDS: float = 3.0  # Noise floor time constant when the background gets louder
+    VAD_NOISE_FALL_SECONDS: float = 0.3  # ... and when it gets quieter
+    VAD_NOISE_FLOOR_MIN_DB: float = -70.0
     
     # Real-time extraction settings
     SILENCE_MIN_DURATION: float = 1.5  # Silence window for auto-extraction (1-2 seconds)
     AUTO_EXTRACTION_ENABLED: bool = True  # Enable automatic extraction after silence
     CHUNK_BUFFER_SIZE: int = 50  # Maximum audio chunks to buffer per question
+    LLM_BATCH_DEBOUNCE: float = 4.0  # Send an interview's pending fragments after this long without a new one
+    LLM_BATCH_MAX_WAIT: float = 10.0  # ... or once the oldest pending fragment has waited this long
+    LLM_BATCH_MAX_FRAGMENTS: int = 8  # ... or once this many fragments are pending
+    LLM_BATCH_MAX_TOKENS: int = 400  # ... or once the pending transcript reaches about this many tokens
+    
+    # Audio ingest stream (Redis Streams + consumer groups)
+    AUDIO_STREAM_SHARDS: int = 16  # Interviews are spread over this many streams (interview_id % shards)
+    AUDIO_STREAM_MAXLEN: int = 100000  # Approximate per-shard cap (~4 min backlog at 40 interviews)
+    AUDIO_STREAM_BATCH: int = 32  # Max entries per XREADGROUP call
+    AUDIO_STREAM_CLAIM_IDLE_MS: int = 30000  # Reclaim pending entries idle longer than this
+    AUDIO_STREAM_MAX_DELIVERIES: int = 5  # Entries that failed this many times are acked and dropped
+    WORKER_NAME: Optional[str] = None  # Consumer name (default: hostname-pid)
+    
+    # Worker sharding (consistent hash of stream shards across replicas)
+    SHARD_REBALANCE_INTERVAL: float = 2.0  # seconds between heartbeat/rebalance passes
+    SHARD_MEMBER_TTL: float = 10.0  # replica considered dead after this many seconds without heartbeat
+    SHARD_HANDOFF_TTL: int = 300  # seconds a handed-off interview state is kept in Redis
+    
+    # Per-interview worker state (app/core/interview_states.py)
+    STATE_IDLE_TTL: float = 900.0  # Drop an interview's state after this long without activity
+    STATE_SNAPSHOT_INTERVAL: float = 5.0  # Seconds between snapshots of changed states to Redis (0 = off)
+    STATE_SNAPSHOT_TTL: int = 3600  # Seconds a snapshot is kept for a restarted worker
+    
+    # Whisper worker scheduling
+    WHISPER_MAX_IN_FLIGHT: int = 8  # Concurrent transcription requests per Whisper replica
+    WHISPER_INTERVIEW_QUEUE_MAX: int = 500  # Frames queued per interview before backpressure
+    WHISPER_RING_SECONDS: float = 30.0  # Per-interview audio ring capacity (transcription triggers at 10s)
+    WHISPER_STREAMING: Optional[bool] = None  # LocalAgreement streaming with stable-prefix commits and partials (default: local backend only, each re-decode is billed audio on openai)
+    WHISPER_STREAM_STEP: float = 1.0  # Seconds of new speech between re-decodes
+    WHISPER_STREAM_MAX_WINDOW: float = 15.0  # Force-commit the hypothesis if the uncommitted window grows past this
+    WHISPER_STREAM_MAX_UTTERANCE: float = 20.0  # Finalize long utterances in pieces of about this length
     
     # WebSocket
     WS_HEARTBEAT_INTERVAL: int = 30  # seconds
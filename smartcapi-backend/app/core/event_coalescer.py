@@ -0,0 +1,65 @@
+"""
+Per-key coalescing of state events (e.g. the speaker detected in an interview).
+
+A UI only needs to know the current state, not every chunk that confirmed
+it. EventCoalescer lets an event through when the state of its key changes
+and otherwise at most once per interval (a heartbeat carrying the latest
+value); with on_change_only the heartbeat is dropped as well.
+"""
+
+import time
+from typing import Any, Dict, Hashable, Tuple
+
+
+class EventCoalescer:
+    """Decide per key whether a state event is published or coalesced into the last one"""
+
+    # Function to initialize EventCoalescer
+    def __init__(self, interval: float, on_change_only: bool = False, ttl: float = 600.0):
+        """
+        Args:
+            interval: Minimum seconds between events of a key while its state is unchanged (0 = every event)
+            on_change_only: Only publish when the state of a key changes
+            ttl: Forget keys idle for this long
+        """
+        self.interval = interval
+        self.on_change_only = on_change_only
+        self.ttl = ttl
+        self._last: Dict[Hashable, Tuple[Any, float]] = {}  # key -> (state, published_at)
+        self._last_sweep = 0.0
+
+        # Metrics
+        self.published = 0
+        self.coalesced = 0
+
+    # Function to decide whether an event is published
+    def should_publish(self, key: Hashable, state: Any, now: float = None) -> bool:
+        """
+        Args:
+            key: Event key (e.g. interview id)
+            state: State the event reports (e.g. speaker label); a change is always published
+            now: Current time in seconds on the key's clock, e.g. the chunk timestamp (defaults to time.monotonic())
+
+        Returns:
+            True if the event should be published
+        """
+        now = time.monotonic() if now is None else now
+        last = self._last.get(key)
+        if last is not None and last[0] == state and (self.on_change_only or now - last[1] < self.interval):
+            self.coalesced += 1
+            return False
+        self._last[key] = (state, now)
+        self.published += 1
+        if now - self._last_sweep > self.ttl:
+            self._sweep(now)
+        return True
+
+    # Function to forget a key (e.g. interview finished)
+    def forget(self, key: Hashable):
+        self._last.pop(key, None)
+
+    # Function to drop keys idle for longer than ttl
+    def _sweep(self, now: float):
+        self._last_sweep = now
+        for key in [key for key, (_, published_at) in self._last.items() if now - published_at > self.ttl]:
+            del self._last[key]
@@ -0,0 +1,100 @@
+"""
+Local cache of per-interview context for the audio processor.
+
+Every batch needs, per interview, the enumerator id, the current question,
+the last speech time and the respondent buffer length. Redis stays the
+shared copy (writes still go there), but reads are served from this
+process-local LRU/TTL cache:
+
+- the current question changes only on `set_question`; ws.py announces it
+  on RedisChannel.INTERVIEW_CONTEXT and the entry is invalidated;
+- last speech time and buffer length are written by the audio processor
+  itself and updated here in place (write-through). This is only correct
+  with a single writer per interview: audio processors own disjoint shards
+  (ShardCoordinator), and a processor drops the contexts of a shard before
+  giving it up, so the next owner starts from Redis;
+- the TTL bounds how stale an entry can get when a notification is missed.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+
+class InterviewContext:
+    """Context of one interview as seen by the audio processor"""
+
+    __slots__ = ("current_question_id", "last_speech", "buffer_len", "enumerator_id", "loaded_at")
+
+    # Function to initialize InterviewContext
+    def __init__(self, current_question_id: Any, last_speech: Any, buffer_len: int, enumerator_id: Optional[str]):
+        self.current_question_id = current_question_id
+        self.last_speech = last_speech
+        self.buffer_len = buffer_len
+        self.enumerator_id = enumerator_id
+        self.loaded_at = time.monotonic()
+
+
+class InterviewContextCache:
+    """LRU of InterviewContext entries that expire after ttl seconds"""
+
+    # Function to initialize InterviewContextCache
+    def __init__(self, max_entries: int, ttl: float):
+        """
+        Args:
+            max_entries: Least recently used interviews are dropped beyond this
+            ttl: Seconds after which an entry is re-read from Redis
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, InterviewContext]" = OrderedDict()
+        # Bumped on every invalidation, so loads that raced one are not cached
+        self.invalidations = 0
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+
+    # Function to get a cached context
+    def get(self, interview_id: int) -> Optional[InterviewContext]:
+        context = self._entries.get(interview_id)
+        if context is None or time.monotonic() - context.loaded_at > self.ttl:
+            self._entries.pop(interview_id, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(interview_id)
+        self.hits += 1
+        return context
+
+    # Function to cache a context loaded from Redis
+    def put(self, interview_id: int, context: InterviewContext, token: int = None):
+        """
+        Args:
+            interview_id: ID of the interview
+            context: Freshly loaded context
+            token: Value of `invalidations` before the load; the context is not
+                   cached if an invalidation happened since
+        """
+        if token is not None and token != self.invalidations:
+            return
+        self._entries[interview_id] = context
+        self._entries.move_to_end(interview_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # Function to drop an interview's context (e.g. its question changed)
+    def invalidate(self, interview_id: int):
+        self.invalidations += 1
+        self._entries.pop(interview_id, None)
+
+    # Function to list the cached interviews
+    def ids(self) -> List[int]:
+        return list(self._entries)
+
+    # Function to drop all contexts (e.g. notifications may have been missed)
+    def clear(self):
+        self.invalidations += 1
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,225 @@
+"""
+Per-interview worker state with idle eviction and Redis snapshots.
+
+Stateful workers (whisper, merger, aligner) keep one state object per
+interview. InterviewStateManager holds them and:
+
+- evicts an interview after `idle_ttl` seconds without activity, or when
+  the API announces the end of the interview on RedisChannel.INTERVIEW_ENDED
+  (see watch_interview_end), so memory does not grow with every interview
+  a process has ever seen;
+- every `snapshot_interval` seconds writes the states that changed to a
+  Redis hash per interview (state:<name>:<interview_id>, kept for
+  `snapshot_ttl` seconds), and restores from it the first time an interview
+  is seen, so a restarted worker (or a replica taking over a shard)
+  continues where the previous one stopped. Whatever changed after the
+  last snapshot is lost on a crash.
+
+The worker provides how its state is built (factory), serialized
+(to_snapshot -> Redis hash fields) and restored (from_snapshot).
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.core.logger import ml_logger
+from app.core.redis_client import async_redis_client, redis_client, RedisChannel
+
+
+class InterviewStateManager:
+    """Per-interview states of one worker type, evicted when idle and snapshotted to Redis"""
+
+    # Function to initialize InterviewStateManager
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[int], Any],
+        to_snapshot: Callable[[Any], Dict[str, Any]],
+        from_snapshot: Callable[[int, Dict[bytes, bytes]], Any],
+        idle_ttl: float = None,
+        snapshot_interval: float = None,
+        snapshot_ttl: int = None
+    ):
+        """
+        Args:
+            name: Worker type, used in the snapshot keys ("whisper", "merger", ...)
+            factory: Builds a fresh state for an interview id
+            to_snapshot: Serializes a state into Redis hash fields (str/bytes values)
+            from_snapshot: Rebuilds a state from (interview_id, hash fields)
+            idle_ttl: Seconds without activity before an interview is evicted
+            snapshot_interval: Seconds between snapshot passes (0 disables snapshots)
+            snapshot_ttl: Seconds a snapshot is kept in Redis
+        """
+        self.name = name
+        self.factory = factory
+        self.to_snapshot = to_snapshot
+        self.from_snapshot = from_snapshot
+        self.idle_ttl = idle_ttl if idle_ttl is not None else settings.STATE_IDLE_TTL
+        self.snapshot_interval = snapshot_interval if snapshot_interval is not None else settings.STATE_SNAPSHOT_INTERVAL
+        self.snapshot_ttl = snapshot_ttl or settings.STATE_SNAPSHOT_TTL
+
+        self._states: Dict[int, Any] = {}
+        self._last_active: Dict[int, float] = {}
+        self._dirty = set()
+        self._last_maintenance = time.monotonic()
+
+        # Metrics
+        self.restored = 0
+        self.evicted = 0
+        self.snapshots_written = 0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, interview_id: int) -> bool:
+        return interview_id in self._states
+
+    # Function to list the interviews held locally
+    def ids(self) -> List[int]:
+        return list(self._states)
+
+    # Function to get the Redis key of an interview's snapshot
+    def snapshot_key(self, interview_id: int) -> str:
+        return f"state:{self.name}:{interview_id}"
+
+    # Function to mark an interview as active (and its state as changed)
+    def touch(self, interview_id: int):
+        self._last_active[interview_id] = time.monotonic()
+        self._dirty.add(interview_id)
+
+    # Function to get an interview's state: local, else its snapshot, else a fresh one
+    async def get(self, interview_id: int) -> Any:
+        state = self._states.get(interview_id)
+        if state is None:
+            state = await self._restore(interview_id)
+            if state is None:
+                state = self.factory(interview_id)
+            # A concurrent get() may have restored it meanwhile
+            state = self._states.setdefault(interview_id, state)
+        self.touch(interview_id)
+        return state
+
+    async def _restore(self, interview_id: int) -> Optional[Any]:
+        try:
+            snapshot = await async_redis_client.hgetall(self.snapshot_key(interview_id))
+            if not snapshot:
+                return None
+            state = self.from_snapshot(interview_id, snapshot)
+            self.restored += 1
+            ml_logger.info(f"{self.name}: restored state of interview {interview_id} from snapshot")
+            return state
+        except Exception as e:
+            ml_logger.error(f"{self.name}: could not restore interview {interview_id}: {e}")
+            return None
+
+    # Function to remove an interview's state locally (its snapshot stays)
+    def pop(self, interview_id: int) -> Optional[Any]:
+        self._last_active.pop(interview_id, None)
+        self._dirty.discard(interview_id)
+        return self._states.pop(interview_id, None)
+
+    # Function to write snapshots of changed (or the given) interviews
+    async def save(self, interview_ids: Iterable[int] = None, ttl: int = None):
+        """
+        Args:
+            interview_ids: Interviews to snapshot (default: all changed since the last pass)
+            ttl: Seconds the snapshots are kept (default snapshot_ttl)
+        """
+        ids = [i for i in (self._dirty if interview_ids is None else interview_ids) if i in self._states]
+        if not ids:
+            return
+        try:
+            pipe = async_redis_client.pipeline(transaction=False)
+            for interview_id in ids:
+                key = self.snapshot_key(interview_id)
+                pipe.delete(key)
+                pipe.hset(key, mapping=self.to_snapshot(self._states[interview_id]))
+                pipe.expire(key, ttl or self.snapshot_ttl)
+            # Changes made while the pipeline runs mark the state dirty again
+            self._dirty.difference_update(ids)
+            await pipe.execute()
+            self.snapshots_written += len(ids)
+        except Exception as e:
+            self._dirty.update(i for i in ids if i in self._states)
+            ml_logger.error(f"{self.name}: snapshot of {len(ids)} interviews failed: {e}")
+
+    # Function to drop a finished interview (local state and snapshot)
+    async def complete(self, interview_id: int):
+        self.pop(interview_id)
+        try:
+            await async_redis_client.delete(self.snapshot_key(interview_id))
+        except Exception as e:
+            ml_logger.warning(f"{self.name}: could not delete snapshot of interview {interview_id}: {e}")
+
+    # Function to evict interviews idle for longer than idle_ttl
+    async def evict_idle(self) -> List[int]:
+        """The last snapshot is written first, so a paused interview can resume"""
+        now = time.monotonic()
+        idle = [i for i, last in self._last_active.items() if now - last > self.idle_ttl]
+        if not idle:
+            return []
+        if self.snapshot_interval:
+            await self.save([i for i in idle if i in self._dirty])
+        for interview_id in idle:
+            self.pop(interview_id)
+        self.evicted += len(idle)
+        ml_logger.info(f"{self.name}: evicted {len(idle)} idle interviews ({len(self._states)} live)")
+        return idle
+
+    # Function to run periodic snapshots and eviction (call from the worker loop)
+    async def maintain(self):
+        now = time.monotonic()
+        interval = self.snapshot_interval or 10.0
+        if now - self._last_maintenance < interval:
+            return
+        self._last_maintenance = now
+        if self.snapshot_interval:
+            await self.save()
+        await self.evict_idle()
+
+
+# Function to announce that an interview ended (completed, cancelled or deleted)
+def publish_interview_end(interview_id: int, status: str):
+    """Called by the API (sync); workers drop the interview's state"""
+    try:
+        redis_client.publish(RedisChannel.INTERVIEW_ENDED, json.dumps({
+            "interview_id": interview_id,
+            "status": status
+        }))
+    except Exception as e:
+        ml_logger.warning(f"Could not announce the end of interview {interview_id}: {e}")
+
+
+# Function to drop finished interviews from state managers as the API announces them
+async def watch_interview_end(
+    *managers: InterviewStateManager,
+    on_end: Callable[[int], Awaitable[None]] = None
+):
+    """
+    Args:
+        managers: State managers to drop the interview from
+        on_end: Optional coroutine run first (e.g. flush pending work of the interview)
+    """
+    while True:
+        pubsub = async_redis_client.pubsub()
+        try:
+            await pubsub.subscribe(RedisChannel.INTERVIEW_ENDED)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                try:
+                    interview_id = int(json.loads(message["data"])["interview_id"])
+                except (TypeError, ValueError, KeyError):
+                    continue
+                if on_end:
+                    await on_end(interview_id)
+                for manager in managers:
+                    await manager.complete(interview_id)
+        except Exception as e:
+            ml_logger.error(f"Interview end subscription error: {e}")
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.close()
@@ -0,0 +1,132 @@
+"""
+Ordered-per-key, concurrent-across-keys async scheduler.
+
+Items submitted for the same key (e.g. an interview id) are handled strictly
+in order by one task per key, while different keys run in parallel. Expensive
+sections (an API call, an inference) are bounded across all keys with
+`slot()`, so a slow request for one interview never holds up the others.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from app.core.logger import ml_logger
+
+
+class KeyedScheduler:
+    """Per-key FIFO queues drained by one task each, with a shared concurrency limit"""
+
+    # Function to initialize KeyedScheduler
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Hashable, Any], Awaitable[None]],
+        max_in_flight: int,
+        max_queue_per_key: int,
+        idle_timeout: float = 30.0
+    ):
+        """
+        Args:
+            name: Name used in logs/metrics
+            handler: Coroutine called as handler(key, item), in order per key
+            max_in_flight: Maximum number of concurrent `slot()` holders
+            max_queue_per_key: Queue bound per key; submit() waits when full (backpressure)
+            idle_timeout: Seconds a key's task waits for new items before exiting
+        """
+        self.name = name
+        self.handler = handler
+        self.max_in_flight = max_in_flight
+        self.max_queue_per_key = max_queue_per_key
+        self.idle_timeout = idle_timeout
+
+        self._limit = asyncio.Semaphore(max_in_flight)
+        self._queues: Dict[Hashable, asyncio.Queue] = {}
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+        # Metrics
+        self.in_flight = 0
+        self.waiting_for_slot = 0
+        self.processed = 0
+        self.backpressure_waits = 0
+        self.max_observed_depth = 0
+
+    # Function to enqueue an item for a key
+    async def submit(self, key: Hashable, item: Any):
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = asyncio.Queue(maxsize=self.max_queue_per_key)
+            self._queues[key] = queue
+            self._tasks[key] = asyncio.create_task(self._run(key, queue))
+
+        if queue.full():
+            # Backpressure: the caller (stream reader) stops pulling new work
+            # until this key catches up
+            self.backpressure_waits += 1
+            ml_logger.warning(f"[{self.name}] Queue for {key} full ({queue.qsize()}), applying backpressure")
+        await queue.put(item)
+        self.max_observed_depth = max(self.max_observed_depth, queue.qsize())
+
+    # Function to hold one of the shared concurrency slots
+    @asynccontextmanager
+    async def slot(self):
+        self.waiting_for_slot += 1
+        try:
+            await self._limit.acquire()
+        finally:
+            self.waiting_for_slot -= 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._limit.release()
+
+    # Function to wait until everything queued for a key is handled
+    async def drain(self, key: Hashable):
+        queue = self._queues.get(key)
+        if queue is not None:
+            await queue.join()
+
+    # Function to report queue depths
+    def metrics(self) -> dict:
+        depths = {key: q.qsize() for key, q in self._queues.items()}
+        return {
+            "keys": len(depths),
+            "queued": sum(depths.values()),
+            "in_flight": self.in_flight,
+            "waiting_for_slot": self.waiting_for_slot,
+            "processed": self.processed,
+            "backpressure_waits": self.backpressure_waits,
+            "max_depth": self.max_observed_depth,
+            "depths": depths,
+        }
+
+    # Function to drain one key's queue in order
+    async def _run(self, key: Hashable, queue: asyncio.Queue):
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=self.idle_timeout)
+                except asyncio.TimeoutError:
+                    if queue.empty():
+                        break
+                    continue
+
+                started = time.time()
+                try:
+                    await self.handler(key, item)
+                except Exception as e:
+                    ml_logger.error(f"[{self.name}] Handler error for {key}: {e}")
+                finally:
+                    self.processed += 1
+                    queue.task_done()
+
+                elapsed = time.time() - started
+                if elapsed > 5.0:
+                    ml_logger.warning(f"[{self.name}] Slow item for {key}: {elapsed:.2f}s")
+        finally:
+            if self._queues.get(key) is queue:
+                del self._queues[key]
+                del self._tasks[key]
@@ -18,17 +18,55 @@ except Exception as e:
     async_redis_client = None
 
 class RedisQueue:
-    # Input Queues (Workers consume these)
-    AUDIO_PROCESSING = "queue:audio_processing"  # (interview_id, timestamp, audio_base64)
-    AUDIO_WHISPER = "queue:audio_whisper"        # (interview_id, timestamp, audio_base64)
-    
     # Internal component queues
     MERGER_SEGMENTS = "queue:merger:segments"    # From RF Worker -> (interview_id, start, end, speaker)
     MERGER_TRANSCRIPTS = "queue:merger:transcripts" # From Whisper Worker -> (interview_id, start, end, text)
     LLM_EXTRACTION = "queue:llm_extraction"      # From Merger -> (interview_id, transcript_with_speaker)
+    LLM_EXTRACTION_PENDING = "queue:llm_extraction:pending" # Fragments taken by the LLM worker, not yet extracted
+    TRAINING_JOBS = "queue:training:jobs"        # From API -> Training Worker (TrainingJobMessage)
+
+class RedisStream:
+    # Audio ingest: each chunk is written once to its shard stream and fanned out
+    # to the consumer groups below. Entries hold a single "frame" field with a
+    # binary audio frame (see app.processing.audio.frame_codec).
+    AUDIO_PREFIX = "stream:audio"
+    FRAME_FIELD = b"frame"
+    
+    # Consumer groups
+    GROUP_AUDIO_PROCESSOR = "audio_processor"
+    GROUP_WHISPER = "whisper"
+    
+    @staticmethod
+    def audio_shard(interview_id: int) -> int:
+        return int(interview_id) % settings.AUDIO_STREAM_SHARDS
+    
+    @staticmethod
+    def audio(shard: int) -> str:
+        return f"{RedisStream.AUDIO_PREFIX}:{shard}"
+    
+    @staticmethod
+    def audio_for_interview(interview_id: int) -> str:
+        return RedisStream.audio(RedisStream.audio_shard(interview_id))
+    
+    @staticmethod
+    def all_audio() -> list:
+        return [RedisStream.audio(i) for i in range(settings.AUDIO_STREAM_SHARDS)]
 
 class RedisChannel:
     # PubSub Channels
     @staticmethod
     def interview_updates(interview_id: int) -> str:
         return f"channel:interview_updates:{interview_id}"
+    
+    @staticmethod
+    def training_updates(user_id: int) -> str:
+        return f"channel:training_updates:{user_id}"
+    
+    # API (ws.py set_question) -> audio processors: an interview's context changed
+    INTERVIEW_CONTEXT = "channel:interview_context"
+    
+    # API -> stateful workers: an interview was completed, cancelled or deleted
+    INTERVIEW_ENDED = "channel:interview_ended"
+    
+    # Training worker -> audio processors: a new speaker model is on disk
+    SPEAKER_MODEL_UPDATES = "channel:speaker_model_updates"
@@ -0,0 +1,171 @@
+"""
+Consistent-hash ownership of audio stream shards between worker replicas.
+
+Replicas of a stateful worker (e.g. the Whisper worker) register in a Redis
+membership hash and heartbeat it. Every replica builds the same hash ring from
+the live members, so they agree on which replica owns each shard. The agreed
+owner of every shard is written to a shard map hash in Redis.
+
+Ownership moves in two steps so per-interview state can be handed over: the
+old owner releases a shard (after handing off its state) by deleting its map
+entry, and only then does the new owner take it. A shard whose owner stopped
+heartbeating is taken over immediately.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logger import ml_logger
+from app.core.redis_client import async_redis_client
+
+
+# Function to hash a key onto the ring
+def _ring_hash(key: str) -> int:
+    return int(hashlib.md5(key.encode("utf-8")).hexdigest()[:16], 16)
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes"""
+
+    # Function to initialize HashRing
+    def __init__(self, members: List[str], vnodes: int = 64):
+        self._points = []
+        for member in members:
+            for i in range(vnodes):
+                self._points.append((_ring_hash(f"{member}#{i}"), member))
+        self._points.sort()
+        self._hashes = [h for h, _ in self._points]
+
+    # Function to find the member owning a key
+    def owner(self, key: str) -> Optional[str]:
+        if not self._points:
+            return None
+        idx = bisect.bisect(self._hashes, _ring_hash(key)) % len(self._points)
+        return self._points[idx][1]
+
+
+class ShardCoordinator:
+    """Tracks which shards this replica owns and rebalances on membership changes"""
+
+    # Function to initialize ShardCoordinator
+    def __init__(
+        self,
+        role: str,
+        member: str,
+        total_shards: int,
+        on_release: Optional[Callable[[int], Awaitable[None]]] = None
+    ):
+        """
+        Args:
+            role: Worker type (e.g. "whisper"), namespaces the Redis keys
+            member: Unique, stable name of this replica
+            total_shards: Number of shards to distribute
+            on_release: Coroutine called with a shard id before it is given away
+        """
+        self.role = role
+        self.member = member
+        self.total_shards = total_shards
+        self.on_release = on_release
+        self.owned: List[int] = []
+
+        self.members_key = f"shards:{role}:members"
+        self.map_key = f"shards:{role}:map"
+
+    # Function to publish this replica's heartbeat
+    async def heartbeat(self):
+        await async_redis_client.hset(self.members_key, self.member, str(time.time()))
+
+    # Function to heartbeat in the background
+    async def keep_alive(self):
+        """
+        Heartbeat every SHARD_REBALANCE_INTERVAL, independently of the worker
+        loop, so a replica blocked on backpressure is not declared dead and
+        its shards are not taken over while it still holds their state.
+        Cancel this task before leave().
+        """
+        while True:
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                ml_logger.error(f"[{self.role}:{self.member}] Heartbeat failed: {e}")
+            await asyncio.sleep(settings.SHARD_REBALANCE_INTERVAL)
+
+    # Function to list replicas that heartbeated recently
+    async def live_members(self) -> List[str]:
+        raw = await async_redis_client.hgetall(self.members_key)
+        now = time.time()
+        live, stale = [], []
+        for name, seen in raw.items():
+            name = name.decode("utf-8") if isinstance(name, bytes) else name
+            if now - float(seen) <= settings.SHARD_MEMBER_TTL:
+                live.append(name)
+            else:
+                stale.append(name)
+        if stale:
+            await async_redis_client.hdel(self.members_key, *stale)
+        return sorted(live)
+
+    # Function to read the shard map from Redis
+    async def shard_map(self) -> Dict[int, str]:
+        raw = await async_redis_client.hgetall(self.map_key)
+        return {
+            int(shard): (owner.decode("utf-8") if isinstance(owner, bytes) else owner)
+            for shard, owner in raw.items()
+        }
+
+    # Function to recompute ownership
+    async def rebalance(self) -> bool:
+        """
+        Heartbeat, then release shards the ring assigns elsewhere and take the
+        ones it assigns to us (once their previous owner let go or died).
+
+        Returns:
+            True if the owned shard set changed
+        """
+        await self.heartbeat()
+        members = await self.live_members()
+        ring = HashRing(members)
+        current = await self.shard_map()
+
+        desired = {s for s in range(self.total_shards) if ring.owner(f"shard:{s}") == self.member}
+        owned = set(self.owned)
+
+        released = sorted(owned - desired)
+        for shard in released:
+            if self.on_release:
+                await self.on_release(shard)
+            if current.get(shard) == self.member:
+                await async_redis_client.hdel(self.map_key, shard)
+
+        acquired = []
+        for shard in sorted(desired - owned):
+            owner = current.get(shard)
+            if owner is None:
+                if await async_redis_client.hsetnx(self.map_key, shard, self.member):
+                    acquired.append(shard)
+            elif owner == self.member or owner not in members:
+                await async_redis_client.hset(self.map_key, shard, self.member)
+                acquired.append(shard)
+
+        if not released and not acquired:
+            return False
+
+        self.owned = sorted((owned - set(released)) | set(acquired))
+        ml_logger.info(
+            f"[{self.role}:{self.member}] Rebalanced: +{acquired} -{released} -> owns {self.owned} "
+            f"({len(members)} live replicas)"
+        )
+        return True
+
+    # Function to leave the group on shutdown
+    async def leave(self):
+        for shard in list(self.owned):
+            if self.on_release:
+                await self.on_release(shard)
+            await async_redis_client.hdel(self.map_key, shard)
+        self.owned = []
+        await async_redis_client.hdel(self.members_key, self.member)
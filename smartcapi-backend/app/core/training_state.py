@@ -1,19 +1,95 @@
+import json
+import time
+import uuid
 from typing import Dict, Any
 
-# Global dictionary to store training status
-# Format: { user_id: { "progress": int, "status": str, "message": str } }
+from app.core.config import settings
+from app.core.logger import ml_logger
+from app.core.redis_client import redis_client, RedisQueue, RedisChannel
+from app.schemas.queue_messages import TrainingJobMessage
+
+# Training status per user, kept in a Redis hash so every API process sees
+# the progress reported by the training worker.
+# Format: training:status:{user_id} -> { "progress", "status", "message", "job_id", "updated_at" }
+# The local dictionary is only a fallback while Redis is unreachable.
 training_status: Dict[int, Dict[str, Any]] = {}
 
+# Function to get the Redis key of a user's training status
+def status_key(user_id: int) -> str:
+    return f"training:status:{user_id}"
+
 def get_training_status(user_id: int) -> Dict[str, Any]:
+    try:
+        raw = redis_client.hgetall(status_key(user_id))
+        if raw:
+            data = {k.decode(): v.decode() for k, v in raw.items()}
+            return {
+                "progress": int(data.get("progress", 0)),
+                "status": data.get("status", "idle"),
+                "message": data.get("message", ""),
+                "job_id": data.get("job_id") or None
+            }
+    except Exception as e:
+        ml_logger.warning(f"Reading training status from Redis failed: {e}")
     return training_status.get(user_id, {"progress": 0, "status": "idle", "message": "Waiting to start..."})
 
-def update_training_status(user_id: int, progress: int, status: str, message: str):
+def update_training_status(user_id: int, progress: int, status: str, message: str, job_id: str = None):
     training_status[user_id] = {
         "progress": progress,
         "status": status,
         "message": message
     }
+    try:
+        key = status_key(user_id)
+        fields = {"progress": progress, "status": status, "message": message, "updated_at": time.time()}
+        if job_id:
+            fields["job_id"] = job_id
+        pipe = redis_client.pipeline()
+        pipe.hset(key, mapping=fields)
+        pipe.expire(key, settings.TRAINING_STATUS_TTL)
+        # Push the update to subscribers, like the interview update channels
+        pipe.publish(RedisChannel.training_updates(user_id), json.dumps({
+            "type": "training_progress",
+            "user_id": user_id,
+            "progress": progress,
+            "status": status,
+            "message": message
+        }))
+        pipe.execute()
+    except Exception as e:
+        ml_logger.warning(f"Writing training status to Redis failed: {e}")
 
 def clear_training_status(user_id: int):
     if user_id in training_status:
         del training_status[user_id]
+    try:
+        redis_client.delete(status_key(user_id))
+    except Exception:
+        pass
+
+# Function to queue a job for the training worker
+def enqueue_training_job(kind: str, user_id: int, speaker_label: str = None, audio_path: str = None) -> str:
+    """
+    Args:
+        kind: "enroll", "retrain" or "remove" (see TrainingJobMessage)
+        user_id: User whose training status reports the job's progress
+        speaker_label: Speaker the job is about
+        audio_path: Absolute path of the voice sample ("enroll")
+
+    Returns:
+        Job id
+
+    Raises:
+        redis.RedisError if the job could not be queued
+    """
+    job = TrainingJobMessage(
+        job_id=uuid.uuid4().hex,
+        timestamp=time.time(),
+        kind=kind,
+        user_id=user_id,
+        speaker_label=speaker_label,
+        audio_path=audio_path
+    )
+    redis_client.rpush(RedisQueue.TRAINING_JOBS, job.model_dump_json())
+    update_training_status(user_id, 0, "queued", "Waiting for the training worker...", job.job_id)
+    return job.job_id
@@ -1,4 +1,6 @@
+import io
 import os
+import struct
 import librosa
 import numpy as np
 import soundfile as sf
@@ -204,4 +206,37 @@ def compute_rms(audio: np.ndarray) -> float:
     """
     if len(audio) == 0:
         return 0.0
-    return np.sqrt(np.mean(audio**2))
\ No newline at end of file
+    return np.sqrt(np.mean(audio**2))
+
+# Function to encode audio into an in-memory WAV file
+def audio_to_wav_buffer(audio, sr: int = None) -> io.BytesIO:
+    """
+    Encode audio as a 16-bit mono PCM WAV file in memory (no disk I/O)
+    
+    Args:
+        audio: float32 samples in [-1, 1], int16 samples, or raw int16 PCM bytes
+        sr: Sample rate (default: use settings)
+        
+    Returns:
+        BytesIO positioned at the start of the WAV data
+    """
+    if sr is None:
+        sr = settings.SAMPLE_RATE
+    
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        pcm = bytes(audio)
+    elif audio.dtype == np.int16:
+        pcm = audio.tobytes()
+    else:
+        pcm = (np.clip(audio, -1.0, 1.0) * 32767.0).astype("<i2").tobytes()
+    
+    buffer = io.BytesIO()
+    buffer.write(struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + len(pcm), b"WAVE",
+        b"fmt ", 16, 1, 1, sr, sr * 2, 2, 16,
+        b"data", len(pcm)
+    ))
+    buffer.write(pcm)
+    buffer.seek(0)
+    return buffer
@@ -1,13 +1,15 @@
 import numpy as np
 import librosa
-from typing import Optional
+from typing import List, Optional, Tuple
 from app.core.logger import ml_logger
+from app.processing.audio.mfcc_engine import get_engine
 
 # Fungsi untuk mengekstrak 33 MFCC dari file wav audio
 # Function to extract MFCC features from audio
 def extract_mfcc_features(audio: np.ndarray, sr: int, n_mfcc: int = 33) -> np.ndarray:
     """
-    Extract MFCC features from audio
+    Extract MFCC features from audio (NumPy fast path, see mfcc_engine;
+    equivalent to extract_mfcc_features_librosa within the documented tolerance)
     
     Args:
         audio: Audio data
@@ -15,7 +17,19 @@ def extract_mfcc_features(audio: np.ndarray, sr: int, n_mfcc: int = 33) -> np.nd
         n_mfcc: Number of MFCC coefficients to extract
         
     Returns:
-        MFCC features array
+        MFCC features array (mean and std of MFCC, delta and delta-delta)
+    """
+    try:
+        return get_engine(sr, n_mfcc).features(audio)
+    except Exception as e:
+        ml_logger.error(f"Error extracting MFCC features: {str(e)}")
+        return np.array([])
+
+# Function to extract MFCC features from audio with librosa (reference implementation)
+def extract_mfcc_features_librosa(audio: np.ndarray, sr: int, n_mfcc: int = 33) -> np.ndarray:
+    """
+    Original librosa implementation of extract_mfcc_features, kept as the
+    reference the NumPy engine is checked against (benchmark_mfcc.py)
     """
     try:
         # Extract MFCC features
@@ -50,6 +64,43 @@ def extract_mfcc_features(audio: np.ndarray, sr: int, n_mfcc: int = 33) -> np.nd
         ml_logger.error(f"Error extracting MFCC features: {str(e)}")
         return np.array([])
 
+# Function to extract MFCC features for many chunks at once
+def extract_mfcc_features_batch(audios: List[np.ndarray], sr: int, n_mfcc: int = 33) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Batched version of extract_mfcc_features (same 198-dim vector per chunk).
+
+    Chunks of equal length are stacked and go through the MFCC engine in
+    one call (one rfft over all frames of all chunks), so a batch of
+    websocket chunks costs a few vectorized calls instead of one per chunk.
+
+    Args:
+        audios: List of audio arrays
+        sr: Sample rate
+        n_mfcc: Number of MFCC coefficients to extract
+
+    Returns:
+        (features, ok): features is (len(audios), 6 * n_mfcc); ok marks the rows
+        that could be computed (chunks too short for the delta window fail, as
+        they do in extract_mfcc_features)
+    """
+    features = np.zeros((len(audios), 6 * n_mfcc), dtype=np.float64)
+    ok = np.zeros(len(audios), dtype=bool)
+
+    engine = get_engine(sr, n_mfcc)
+    groups = {}
+    for i, audio in enumerate(audios):
+        groups.setdefault(len(audio), []).append(i)
+
+    for length, indices in groups.items():
+        try:
+            stacked = np.stack([audios[i] for i in indices])
+            features[indices] = engine.features(stacked)
+            ok[indices] = True
+        except Exception as e:
+            ml_logger.error(f"Error extracting MFCC features for {len(indices)} chunks of {length} samples: {str(e)}")
+
+    return features, ok
+
 # Function to extract mean of 33 MFCC features
 def extract_33_mfcc_means(audio: np.ndarray, sr: int, n_mfcc: int = 33) -> np.ndarray:
     """
@@ -0,0 +1,86 @@
+"""
+Binary envelope for audio frames pushed through the Redis ingest queues.
+
+Layout (little endian):
+    magic (4s) | interview_id (u32) | user_id (u32) | seq (u32) | timestamp (f64) | int16 PCM ...
+
+The header is 24 bytes, so the PCM payload stays 2-byte aligned and can be
+viewed with np.frombuffer without copying.
+"""
+
+import json
+import base64
+import struct
+from typing import NamedTuple
+
+import numpy as np
+
+FRAME_MAGIC = b"SCA1"
+FRAME_HEADER = struct.Struct("<4sIIId")
+FRAME_HEADER_SIZE = FRAME_HEADER.size
+
+
+class AudioFrame(NamedTuple):
+    interview_id: int
+    user_id: int
+    seq: int
+    timestamp: float
+    pcm: np.ndarray  # int16 view over the raw message
+
+
+# Function to encode an audio frame into the binary envelope
+def encode_audio_frame(interview_id: int, user_id: int, seq: int, timestamp: float, pcm_bytes: bytes) -> bytes:
+    """
+    Build a binary audio frame message
+
+    Args:
+        interview_id: ID of the interview
+        user_id: ID of the enumerator (0 if unknown)
+        seq: Per-session sequence number of the chunk
+        timestamp: Capture timestamp (epoch seconds)
+        pcm_bytes: Raw int16 PCM audio
+
+    Returns:
+        Encoded frame bytes
+    """
+    header = FRAME_HEADER.pack(FRAME_MAGIC, interview_id, user_id or 0, seq, timestamp)
+    return header + pcm_bytes
+
+
+# Function to decode an audio frame (binary envelope or legacy JSON)
+def decode_audio_frame(raw: bytes) -> AudioFrame:
+    """
+    Decode a queued audio frame
+
+    Binary frames are decoded without copying the PCM payload. Legacy
+    base64-in-JSON messages are still accepted during rollout.
+
+    Args:
+        raw: Message as popped from Redis
+
+    Returns:
+        AudioFrame with an int16 PCM view
+    """
+    if raw[:4] == FRAME_MAGIC:
+        _, interview_id, user_id, seq, timestamp = FRAME_HEADER.unpack_from(raw)
+        pcm = np.frombuffer(raw, dtype=np.int16, offset=FRAME_HEADER_SIZE)
+        return AudioFrame(interview_id, user_id, seq, timestamp, pcm)
+
+    # Legacy JSON format: {"interview_id", "user_id", "timestamp", "audio_data": <base64>}
+    data = json.loads(raw)
+    audio_bytes = base64.b64decode(data.get("audio_data") or b"")
+    return AudioFrame(
+        int(data.get("interview_id") or 0),
+        int(data.get("user_id") or 0),
+        int(data.get("seq") or 0),
+        float(data.get("timestamp") or 0.0),
+        np.frombuffer(audio_bytes, dtype=np.int16),
+    )
+
+
+# Function to convert int16 PCM to normalized float32
+def pcm_to_float32(pcm: np.ndarray) -> np.ndarray:
+    """
+    Convert int16 PCM to float32 in [-1, 1] with a single allocation
+    """
+    return np.multiply(pcm, np.float32(1.0 / 32768.0), dtype=np.float32)
@@ -0,0 +1,103 @@
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    Fixed-capacity float32 audio buffer with O(1) (per sample) append.
+
+    The storage is a mirrored circular buffer: every sample is written at
+    position p and p + capacity, so the retained audio is always available as
+    one contiguous, zero-copy view no matter where the ring wraps.
+
+    Sample positions are tracked as absolute counters, so the timeline time of
+    the oldest retained sample (`start_time`) stays aligned with the samples
+    when old audio is dropped or committed.
+    """
+
+    # Function to initialize AudioRingBuffer
+    def __init__(self, capacity: int, sample_rate: int):
+        """
+        Args:
+            capacity: Maximum number of retained samples (oldest are dropped)
+            sample_rate: Sample rate, used to convert samples to seconds
+        """
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self._data = np.zeros(2 * capacity, dtype=np.float32)
+        self._start = 0  # absolute index of oldest retained sample
+        self._end = 0    # absolute index after newest sample
+        self.start_time = 0.0  # timeline position of the oldest retained sample
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def duration(self) -> float:
+        return len(self) / self.sample_rate
+
+    # Function to append samples
+    def append(self, samples: np.ndarray, timestamp: float):
+        """
+        Append samples. If the buffer is empty, `timestamp` becomes the
+        timeline position of the first sample; otherwise audio is assumed to
+        be contiguous with what is already buffered.
+        """
+        if len(self) == 0:
+            self.start_time = timestamp
+            self._start = self._end
+
+        n = len(samples)
+        if n > self.capacity:
+            # Only the newest `capacity` samples can be kept
+            skip = n - self.capacity
+            samples = samples[skip:]
+            self._end += skip
+            n = self.capacity
+
+        cap = self.capacity
+        pos = self._end % cap
+        first = min(n, cap - pos)
+        rest = n - first
+        self._data[pos:pos + first] = samples[:first]
+        self._data[pos + cap:pos + cap + first] = samples[:first]
+        if rest:
+            self._data[:rest] = samples[first:]
+            self._data[cap:cap + rest] = samples[first:]
+        self._end += n
+
+        overflow = len(self) - cap
+        if overflow > 0:
+            # Drop oldest
+            self._start += overflow
+            self.start_time += overflow / self.sample_rate
+
+    # Function to get all retained audio as a contiguous view
+    def view(self) -> np.ndarray:
+        """
+        Zero-copy view of the retained audio. Valid until the next append.
+        """
+        pos = self._start % self.capacity
+        return self._data[pos:pos + len(self)]
+
+    # Function to drop audio up to a timeline position
+    def consume_until(self, end_time: float):
+        """
+        Drop all samples older than `end_time` (timeline seconds).
+        """
+        samples_to_drop = int((end_time - self.start_time) * self.sample_rate)
+        if samples_to_drop <= 0:
+            return
+        if samples_to_drop >= len(self):
+            # Clear all
+            self._start = self._end
+            self.start_time = end_time
+        else:
+            self._start += samples_to_drop
+            self.start_time += samples_to_drop / self.sample_rate
+
+    # Function to replace the contents (e.g. when restoring a snapshot)
+    def reset(self, samples: np.ndarray, start_time: float):
+        self._start = self._end = 0
+        self.start_time = start_time
+        if len(samples):
+            self.append(samples, start_time)
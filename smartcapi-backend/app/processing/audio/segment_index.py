@@ -0,0 +1,182 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+
+class SegmentIndex:
+    """
+    Time-ordered speaker segments of one interview with overlap queries.
+
+    Segments are kept in parallel lists sorted by start time. An overlap
+    query [start, end) finds its candidates with bisect: every overlapping
+    segment starts in [start - max_len, end), where max_len is the longest
+    segment seen. Candidates that lie entirely inside the query are summed
+    per speaker with prefix sums (cumulative duration over each speaker's
+    segment positions); only the few segments around the two edges are
+    clipped one by one. A query is O(log n + k) for k edge segments.
+
+    Segments that ended before the last finalized transcript are evicted
+    (`evict_before`), and `max_segments` caps the index when nothing is ever
+    finalized, so memory stays bounded over long interviews. A late segment
+    that ends before the eviction point is dropped; one that starts among
+    the evicted segments but ends after them is clipped to start with the
+    last evicted one, which keeps the retained segments sorted.
+    """
+
+    # Function to initialize SegmentIndex
+    def __init__(self, max_segments: Optional[int] = None):
+        """
+        Args:
+            max_segments: Oldest segments are evicted beyond this many (None = no cap)
+        """
+        self.max_segments = max_segments
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+        self.speakers: List[str] = []
+        self._head = 0  # segments before this position are evicted
+        self._evicted_until = float("-inf")  # latest time passed to evict_before
+        self._max_len = 0.0
+        # Per speaker: positions of its segments, and cumulative durations ([0] = 0.0)
+        self._positions: Dict[str, List[int]] = {}
+        self._cumulative: Dict[str, List[float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.starts) - self._head
+
+    # Function to add a segment
+    def add(self, start: float, end: float, speaker: str) -> bool:
+        """
+        Segments normally arrive in time order (O(1) append); a late segment
+        is inserted in place and the prefix sums are shifted from there on
+        (O(segments after it), late segments are usually near the end).
+
+        Returns:
+            False if the segment was dropped (it ended before the eviction point)
+        """
+        if not self.starts or start >= self.starts[-1]:
+            self._max_len = max(self._max_len, end - start)
+            self._append_prefix(len(self.starts), end - start, speaker)
+            self.starts.append(start)
+            self.ends.append(end)
+            self.speakers.append(speaker)
+        else:
+            i = bisect_right(self.starts, start)
+            if i < self._head:
+                # Starts among evicted segments: keep only the part after them
+                start = self.starts[self._head - 1]
+                if end <= max(start, self._evicted_until):
+                    return False
+                i = self._head
+            self._max_len = max(self._max_len, end - start)
+            self.starts.insert(i, start)
+            self.ends.insert(i, end)
+            self.speakers.insert(i, speaker)
+            self._insert_prefix(i, end - start, speaker)
+
+        if self.max_segments is not None and len(self) > self.max_segments:
+            self._head = len(self.starts) - self.max_segments
+            self._maybe_compact()
+        return True
+
+    def _append_prefix(self, position: int, duration: float, speaker: str):
+        positions = self._positions.get(speaker)
+        if positions is None:
+            positions = self._positions[speaker] = []
+            self._cumulative[speaker] = [0.0]
+        cumulative = self._cumulative[speaker]
+        positions.append(position)
+        cumulative.append(cumulative[-1] + duration)
+
+    # Function to insert a segment into the prefix sums at a position
+    def _insert_prefix(self, position: int, duration: float, speaker: str):
+        for positions in self._positions.values():
+            k = bisect_left(positions, position)
+            if k < len(positions):
+                positions[k:] = [p + 1 for p in positions[k:]]
+        positions = self._positions.get(speaker)
+        if positions is None:
+            positions = self._positions[speaker] = []
+            self._cumulative[speaker] = [0.0]
+        cumulative = self._cumulative[speaker]
+        k = bisect_left(positions, position)
+        positions.insert(k, position)
+        cumulative.insert(k + 1, cumulative[k] + duration)
+        if k + 2 < len(cumulative):
+            cumulative[k + 2:] = [c + duration for c in cumulative[k + 2:]]
+
+    # Function to rebuild the prefix sums (after a compaction)
+    def _rebuild(self):
+        self._positions = {}
+        self._cumulative = {}
+        for i in range(len(self.starts)):
+            self._append_prefix(i, self.ends[i] - self.starts[i], self.speakers[i])
+
+    # Function to evict every segment that ended at or before a time
+    def evict_before(self, time: float):
+        """
+        Args:
+            time: e.g. the end of the last finalized transcript (minus some slack)
+        """
+        self._evicted_until = max(self._evicted_until, time)
+        head = self._head
+        while head < len(self.starts) and self.ends[head] <= time:
+            head += 1
+        self._head = head
+        self._maybe_compact()
+
+    # Function to drop evicted segments from the lists once they make up half of them
+    def _maybe_compact(self):
+        if self._head < 1024 or self._head * 2 < len(self.starts):
+            return
+        del self.starts[:self._head]
+        del self.ends[:self._head]
+        del self.speakers[:self._head]
+        self._head = 0
+        self._max_len = max((e - s for s, e in zip(self.starts, self.ends)), default=0.0)
+        self._rebuild()
+
+    # Function to sum the overlap of every speaker with a time range
+    def overlap(self, start: float, end: float) -> Dict[str, float]:
+        """
+        Args:
+            start: Range start
+            end: Range end
+
+        Returns:
+            speaker -> seconds of overlap with [start, end) (only speakers with overlap)
+        """
+        starts = self.starts
+        lo = max(bisect_left(starts, start - self._max_len), self._head)
+        hi = bisect_left(starts, end)
+        if hi <= lo:
+            return {}
+        # [inner_lo, inner_hi): start >= range start and end <= start + max_len <= range end
+        inner_lo = min(max(bisect_left(starts, start), lo), hi)
+        inner_hi = max(min(bisect_right(starts, end - self._max_len), hi), inner_lo)
+
+        counts: Dict[str, float] = {}
+        if inner_hi > inner_lo:
+            for speaker, positions in self._positions.items():
+                a = bisect_left(positions, inner_lo)
+                b = bisect_left(positions, inner_hi)
+                if b > a:
+                    cumulative = self._cumulative[speaker]
+                    counts[speaker] = cumulative[b] - cumulative[a]
+        for i in (*range(lo, inner_lo), *range(inner_hi, hi)):
+            duration = min(end, self.ends[i]) - max(start, starts[i])
+            if duration > 0:
+                speaker = self.speakers[i]
+                counts[speaker] = counts.get(speaker, 0.0) + duration
+        return {speaker: duration for speaker, duration in counts.items() if duration > 0}
+
+    # Function to list the retained segments
+    def retained(self) -> Tuple[List[float], List[float], List[str]]:
+        """(starts, ends, speakers) of the segments not evicted, e.g. for a state snapshot"""
+        head = self._head
+        return self.starts[head:], self.ends[head:], self.speakers[head:]
+
+    # Function to get the dominant speaker of a time range
+    def majority_speaker(self, start: float, end: float) -> str:
+        counts = self.overlap(start, end)
+        if not counts:
+            return "unknown"
+        return max(counts, key=counts.get)
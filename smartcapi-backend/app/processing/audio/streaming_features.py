@@ -0,0 +1,81 @@
+"""
+Streaming MFCC features for speaker identification.
+
+extract_mfcc_features recomputes a padded STFT for every chunk. Here the
+STFT runs continuously over one interview's audio: each pushed chunk only
+adds the frames it completes (a partial frame is carried to the next
+chunk), and the log-mel frames of the last few seconds are kept. A speaker
+decision then only needs the DCT, the deltas and the mean/std over that
+window, i.e. the same 198-dim vector as extract_mfcc_features(window).
+Both go through the same MFCCEngine (mfcc_engine.py).
+"""
+
+import time
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.processing.audio.mfcc_engine import DELTA_WIDTH, MFCCEngine, get_engine
+
+
+class StreamingMFCC:
+    """Incremental log-mel frames over one audio stream with a sliding window"""
+
+    # Function to initialize StreamingMFCC
+    def __init__(
+        self,
+        sample_rate: int = None,
+        window_seconds: float = None,
+        n_mfcc: int = 33,
+        n_fft: int = 2048,
+        hop_length: int = 512
+    ):
+        """
+        Args:
+            sample_rate: Sample rate of the pushed audio
+            window_seconds: Length of the sliding window the features summarize
+            n_mfcc, n_fft, hop_length: As in extract_mfcc_features
+        """
+        self.sample_rate = sample_rate or settings.SAMPLE_RATE
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        window_seconds = window_seconds or settings.SPEAKER_WINDOW_SECONDS
+        self.max_frames = max(DELTA_WIDTH, int(window_seconds * self.sample_rate / hop_length))
+
+        # Window, mel filterbank and DCT are shared with extract_mfcc_features
+        if n_fft == 2048 and hop_length == 512:
+            self._engine = get_engine(self.sample_rate, n_mfcc)
+        else:
+            self._engine = MFCCEngine(sr=self.sample_rate, n_mfcc=n_mfcc, n_fft=n_fft, hop_length=hop_length)
+
+        # center=True, pad_mode='constant': the stream starts with n_fft // 2 zeros
+        self._pending = np.zeros(n_fft // 2, dtype=np.float32)
+        self._frames = np.zeros((0, self._engine.n_mels))  # log-mel (dB), oldest first
+        self.last_used = time.time()
+
+    @property
+    def n_frames(self) -> int:
+        return len(self._frames)
+
+    # Function to add audio and compute the frames it completes
+    def push(self, samples: np.ndarray):
+        self.last_used = time.time()
+        buffer = np.concatenate((self._pending, samples.astype(np.float32, copy=False)))
+        n_new = 0 if len(buffer) < self.n_fft else 1 + (len(buffer) - self.n_fft) // self.hop_length
+        if n_new:
+            frames = np.lib.stride_tricks.sliding_window_view(buffer, self.n_fft)[::self.hop_length][:n_new]
+            mel_db = self._engine.log_mel(frames)
+            self._frames = np.concatenate((self._frames, mel_db))[-self.max_frames:]
+        self._pending = buffer[n_new * self.hop_length:].copy()
+
+    # Function to summarize the current window
+    def features(self) -> Optional[np.ndarray]:
+        """
+        Returns:
+            198-dim mean/std of MFCC, delta and delta-delta over the window,
+            or None while the window is shorter than the delta width
+        """
+        if len(self._frames) < DELTA_WIDTH:
+            return None
+        return self._engine.summarize(self._frames)
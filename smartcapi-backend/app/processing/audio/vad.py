@@ -0,0 +1,184 @@
+"""
+Frame-level voice activity detection shared by the audio workers.
+
+Audio is analysed in 10 ms frames (energy in dBFS and zero-crossing rate,
+computed for a whole chunk at once with NumPy). A frame is speech when its
+energy is well above a noise floor that is tracked per stream (per
+interview), so a noisy market and a quiet office both work without a
+global threshold. Short bursts are rejected (minimum speech run) and short
+pauses are bridged (hangover), so the decision does not flicker.
+"""
+
+import time
+from typing import Dict, Hashable, List, NamedTuple, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+DB_EPS = 1e-10  # avoids log(0) on digital silence
+
+
+class VADResult(NamedTuple):
+    speech: np.ndarray      # smoothed per-frame decisions (bool)
+    is_speech: bool         # any speech in the chunk
+    speech_ratio: float     # fraction of speech frames
+    energy_db: float        # loudest frame (dBFS)
+    noise_floor_db: float   # noise floor after this chunk
+
+
+# Function to compute per-frame energy (dBFS) and zero-crossing rate
+def frame_features(samples: np.ndarray, frame_length: int):
+    """
+    Args:
+        samples: float32 audio in [-1, 1]; trailing samples that do not fill a frame are ignored
+        frame_length: Samples per frame
+
+    Returns:
+        (energy_db, zcr) arrays, one value per frame
+    """
+    n_frames = len(samples) // frame_length
+    frames = samples[:n_frames * frame_length].reshape(n_frames, frame_length)
+    energy_db = 10.0 * np.log10(np.einsum("ij,ij->i", frames, frames) / frame_length + DB_EPS)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_length - 1)
+    return energy_db, zcr
+
+
+class FrameVAD:
+    """
+    Streaming VAD for one audio stream (keep one instance per interview).
+
+    Chunks of any length can be fed; samples that do not fill a 10 ms frame
+    are carried over to the next chunk.
+    """
+
+    # Function to initialize FrameVAD
+    def __init__(self, sample_rate: int = None):
+        self.sample_rate = sample_rate or settings.SAMPLE_RATE
+        self.frame_length = int(self.sample_rate * settings.VAD_FRAME_MS / 1000)
+        self.frame_seconds = self.frame_length / self.sample_rate
+        self.hangover_frames = int(settings.VAD_HANGOVER_MS / settings.VAD_FRAME_MS)
+        self.min_speech_frames = max(1, int(settings.VAD_MIN_SPEECH_MS / settings.VAD_FRAME_MS))
+
+        self.noise_floor_db: Optional[float] = None  # set from the first chunk
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self._run = 0                    # consecutive raw speech frames at the end of the last chunk
+        self._since_speech = 1 << 30     # frames since the last confirmed speech frame
+        self.last_used = time.time()
+
+    # Function to classify a chunk of audio
+    def process(self, samples: np.ndarray) -> VADResult:
+        """
+        Args:
+            samples: float32 audio in [-1, 1]
+
+        Returns:
+            VADResult with the smoothed per-frame decisions for the whole frames in this chunk
+        """
+        self.last_used = time.time()
+        if len(self._remainder):
+            samples = np.concatenate((self._remainder, samples))
+        n_frames = len(samples) // self.frame_length
+        self._remainder = samples[n_frames * self.frame_length:].copy()
+        if n_frames == 0:
+            floor = self.noise_floor_db if self.noise_floor_db is not None else settings.VAD_MIN_ENERGY_DB
+            return VADResult(np.zeros(0, dtype=bool), self._since_speech <= self.hangover_frames, 0.0, floor, floor)
+
+        energy_db, zcr = frame_features(samples, self.frame_length)
+        if self.noise_floor_db is None:
+            self.noise_floor_db = max(float(np.percentile(energy_db, 10)), settings.VAD_NOISE_FLOOR_MIN_DB)
+
+        # 1. Raw decisions against the current floor. Loud frames are speech;
+        # moderately loud frames only when they are not noise-like (high ZCR)
+        margin = energy_db - self.noise_floor_db
+        raw = (energy_db > settings.VAD_MIN_ENERGY_DB) & (
+            ((margin > settings.VAD_MARGIN_DB) & (zcr < settings.VAD_ZCR_MAX))
+            | (margin > 2 * settings.VAD_MARGIN_DB)
+        )
+
+        # 2. Minimum speech run: a frame counts once it ends a run of
+        # min_speech_frames raw speech frames (runs continue across chunks)
+        idx = np.arange(n_frames)
+        last_off = np.maximum.accumulate(np.where(~raw, idx, -1))
+        run = np.where(last_off < 0, idx + 1 + self._run, idx - last_off)
+        confirmed = raw & (run >= self.min_speech_frames)
+        self._run = int(run[-1]) if raw[-1] else 0
+
+        # 3. Hangover: stay in speech for hangover_frames after the last confirmed frame
+        last_on = np.maximum.accumulate(np.where(confirmed, idx, -1 - self._since_speech))
+        since = idx - last_on
+        speech = since <= self.hangover_frames
+        self._since_speech = int(since[-1])
+
+        # 4. Adapt the floor from non-speech frames (fast down, slow up)
+        self._update_noise_floor(energy_db[~speech], n_frames * self.frame_seconds)
+
+        speech_frames = int(np.count_nonzero(speech))
+        return VADResult(
+            speech,
+            speech_frames > 0,
+            speech_frames / n_frames,
+            float(energy_db.max()),
+            self.noise_floor_db
+        )
+
+    # Function to track the background noise level
+    def _update_noise_floor(self, noise_db: np.ndarray, duration: float):
+        if len(noise_db) == 0:
+            return
+        level = float(np.median(noise_db))
+        if level < self.noise_floor_db:
+            tau = settings.VAD_NOISE_FALL_SECONDS
+        else:
+            tau = settings.VAD_NOISE_RISE_SECONDS
+        alpha = 1.0 - np.exp(-duration / tau)
+        self.noise_floor_db = max(
+            self.noise_floor_db + alpha * (level - self.noise_floor_db),
+            settings.VAD_NOISE_FLOOR_MIN_DB
+        )
+
+    # Function to export the adaptive state (for handoff between replicas)
+    def state(self) -> dict:
+        return {"noise_floor_db": self.noise_floor_db, "since_speech": self._since_speech}
+
+    # Function to restore the adaptive state
+    def load_state(self, state: dict):
+        self.noise_floor_db = state.get("noise_floor_db")
+        self._since_speech = state.get("since_speech", 1 << 30)
+
+
+class VADRegistry:
+    """One FrameVAD per key (interview id); idle streams are dropped after `ttl` seconds"""
+
+    # Function to initialize VADRegistry
+    def __init__(self, ttl: float = 600.0, sample_rate: int = None):
+        self.ttl = ttl
+        self.sample_rate = sample_rate
+        self._vads: Dict[Hashable, FrameVAD] = {}
+        self._last_sweep = time.time()
+
+    # Function to get (or create) the VAD of a stream
+    def get(self, key: Hashable) -> FrameVAD:
+        vad = self._vads.get(key)
+        if vad is None:
+            vad = self._vads[key] = FrameVAD(self.sample_rate)
+        now = time.time()
+        vad.last_used = now
+        if now - self._last_sweep > self.ttl:
+            self._last_sweep = now
+            for k in [k for k, v in self._vads.items() if now - v.last_used > self.ttl]:
+                del self._vads[k]
+        return vad
+
+    # Function to classify a chunk for a stream
+    def process(self, key: Hashable, samples: np.ndarray) -> VADResult:
+        return self.get(key).process(samples)
+
+    # Function to list the streams with a VAD
+    def keys(self) -> List[Hashable]:
+        return list(self._vads)
+
+    # Function to drop the VAD of a stream (e.g. its shard moved to another replica)
+    def forget(self, key: Hashable):
+        self._vads.pop(key, None)
@@ -0,0 +1,176 @@
+"""
+Array-backed Random Forest for speaker identification.
+
+The sklearn RandomForestClassifier pickle holds one Python object per tree,
+so every process that unpickles it pays seconds of CPU and keeps a private
+copy. export_forest flattens all trees into a few contiguous arrays (one
+row per node, trees back to back):
+
+    feature    int32    split feature (0 on leaves)
+    threshold  float64  go left when x[feature] <= threshold
+    left       int32    global index of the left child (leaves point to themselves)
+    right      int32    global index of the right child (leaves point to themselves)
+    value      float64  class probabilities of the node (rows sum to 1)
+    roots      int32    index of each tree's root node
+    classes    str      class labels, same order as RandomForestClassifier.classes_
+    max_depth  int32    depth of the deepest tree (number of traversal steps)
+
+and writes them to an uncompressed .npz. ForestArrays memory-maps the
+members in place (read-only), so loading is a few header reads and all
+worker/API processes on a host share the same page-cache pages.
+
+Prediction walks all trees of all samples together, one level per step
+(leaves loop onto themselves, so max_depth steps reach every leaf), then
+averages the leaf probabilities like RandomForestClassifier.predict_proba.
+"""
+
+import os
+import struct
+import uuid
+import zipfile
+from typing import Any, Dict
+
+import numpy as np
+
+from app.core.logger import ml_logger
+
+_ARRAYS = ("feature", "threshold", "left", "right", "value", "roots", "classes", "max_depth")
+
+
+# Function to flatten a fitted RandomForestClassifier into arrays
+def forest_to_arrays(model: Any) -> Dict[str, np.ndarray]:
+    """
+    Args:
+        model: Fitted sklearn RandomForestClassifier (single output)
+
+    Returns:
+        Dict of the arrays listed in the module docstring
+    """
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+
+    feature, threshold, left, right, value = [], [], [], [], []
+    for tree, offset in zip(trees, offsets):
+        nodes = np.arange(tree.node_count)
+        is_leaf = tree.children_left < 0
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(np.where(is_leaf, 0.0, tree.threshold))
+        left.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+        right.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+        # Counts (sklearn < 1.4) or fractions (newer): normalize either way
+        counts = tree.value[:, 0, :]
+        value.append(counts / counts.sum(axis=1, keepdims=True))
+
+    return {
+        "feature": np.concatenate(feature).astype(np.int32),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "left": np.concatenate(left).astype(np.int32),
+        "right": np.concatenate(right).astype(np.int32),
+        "value": np.concatenate(value).astype(np.float64),
+        "roots": offsets[:-1].astype(np.int32),
+        "classes": np.asarray(model.classes_).astype(str),
+        "max_depth": np.array(max(tree.max_depth for tree in trees), dtype=np.int32),
+    }
+
+
+# Function to export a fitted RandomForestClassifier as .npz
+def export_forest(model: Any, path: str) -> bool:
+    """
+    Write the flattened forest as an uncompressed .npz (required for mmap).
+    The file is written next to the target and renamed, so readers never
+    map a half-written file.
+
+    Args:
+        model: Fitted sklearn RandomForestClassifier
+        path: Target .npz path
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        arrays = forest_to_arrays(model)
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+        ml_logger.info(
+            f"RF model exported to {path} ({len(arrays['roots'])} trees, {len(arrays['feature'])} nodes)"
+        )
+        return True
+    except Exception as e:
+        ml_logger.error(f"Error exporting RF model arrays: {str(e)}")
+        return False
+
+
+# Function to memory-map one member of an uncompressed .npz
+def _mmap_member(path: str, f, info: zipfile.ZipInfo) -> np.ndarray:
+    if info.compress_type != zipfile.ZIP_STORED:
+        raise ValueError(f"{info.filename} is compressed and cannot be memory-mapped")
+    # Local file header: 30 bytes, then file name and extra field
+    f.seek(info.header_offset)
+    header = f.read(30)
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    f.seek(info.header_offset + 30 + name_length + extra_length)
+
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+    if dtype.hasobject:
+        raise ValueError(f"{info.filename} holds Python objects")
+    if not shape:
+        return np.fromfile(f, dtype=dtype, count=1).reshape(())
+    return np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape, order="F" if fortran_order else "C")
+
+
+class ForestArrays:
+    """Read-only Random Forest over memory-mapped arrays (predict / predict_proba / classes_)"""
+
+    # Function to initialize ForestArrays
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.classes_ = np.asarray(arrays["classes"])
+        self.max_depth = int(arrays["max_depth"])
+        self.n_estimators = len(self.roots)
+
+    # Function to load (memory-map) an exported forest
+    @classmethod
+    def load(cls, path: str) -> "ForestArrays":
+        with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+            infos = {info.filename[:-len(".npy")]: info for info in archive.infolist()}
+            missing = [name for name in _ARRAYS if name not in infos]
+            if missing:
+                raise ValueError(f"{path} is missing {missing}")
+            return cls({name: _mmap_member(path, f, infos[name]) for name in _ARRAYS})
+
+    # Function to find the leaf of every (sample, tree)
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            X: (n_samples, n_features)
+
+        Returns:
+            (n_samples, n_trees) global leaf indices
+        """
+        # sklearn compares float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_estimators))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    # Function to predict class probabilities
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.value[self.apply(X)].mean(axis=1, dtype=np.float64)
+
+    # Function to predict class labels
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
@@ -1,9 +1,48 @@
 import os
 import pickle
-import torch
 from typing import Optional, Any
 from app.core.config import settings
 from app.core.logger import ml_logger
+from app.processing.models.forest_arrays import ForestArrays, export_forest
+
+# Function to load the array-backed Random Forest used for inference
+def load_rf_arrays(model_path: str = None, arrays_path: str = None) -> Optional[ForestArrays]:
+    """
+    Memory-map the exported forest (see forest_arrays). When the export is
+    missing or older than the pickle, the pickle is loaded once and exported.
+    
+    Args:
+        model_path: Path to the pickled sklearn model (default: use settings)
+        arrays_path: Path to the exported .npz (default: use settings)
+        
+    Returns:
+        ForestArrays or None if there is no fitted model
+    """
+    try:
+        model_path = model_path or settings.RF_MODEL_PATH
+        arrays_path = arrays_path or settings.RF_ARRAYS_PATH
+        
+        stale = not os.path.exists(arrays_path) or (
+            os.path.exists(model_path) and os.path.getmtime(model_path) > os.path.getmtime(arrays_path)
+        )
+        if stale:
+            if not os.path.exists(model_path):
+                ml_logger.warning(f"Model file not found at {model_path}")
+                return None
+            with open(model_path, 'rb') as f:
+                model = pickle.load(f)
+            if not hasattr(model, "estimators_"):
+                ml_logger.warning(f"Model at {model_path} is not trained yet")
+                return None
+            if not export_forest(model, arrays_path):
+                return None
+        
+        forest = ForestArrays.load(arrays_path)
+        ml_logger.info(f"Random Forest arrays mapped from {arrays_path} ({forest.n_estimators} trees)")
+        return forest
+    except Exception as e:
+        ml_logger.error(f"Error loading Random Forest arrays: {str(e)}")
+        return None
 
 # Function to load Random Forest model
 def load_rf_model(model_path: str = None) -> Optional[Any]:
@@ -57,6 +96,8 @@ def save_rf_model(model: Any, model_path: str = None) -> bool:
         
         with open(model_path, 'wb') as f:
             pickle.dump(model, f)
+        if model_path == settings.RF_MODEL_PATH and hasattr(model, "estimators_"):
+            export_forest(model, settings.RF_ARRAYS_PATH)
         
         ml_logger.info(f"Random Forest model saved to {model_path}")
         return True
@@ -77,6 +118,7 @@ def load_whisper_model(model_name: str = "small", model_path: str = None) -> Opt
         Loaded model or None if loading failed
     """
     try:
+        import torch
         import whisper
         
         if model_path is None:
@@ -0,0 +1,157 @@
+"""
+Incremental speaker enrollment profiles.
+
+Each speaker is summarized by the count, sum and sum of squares of their
+198-dim MFCC feature vectors. Enrolling a voice sample only adds its
+chunks to that speaker's sums (O(new samples)); no model is refit.
+
+Scoring standardizes features with the pooled mean/std of all enrolled
+samples (the raw MFCC statistics span very different scales), takes the
+cosine similarity to every speaker centroid in that space, and turns the
+similarities into per-class confidences with a softmax. SpeakerProfiles
+exposes classes_ / predict_proba / predict, so it can be used wherever the
+Random Forest (or its ForestArrays export) is.
+"""
+
+import os
+from typing import List
+
+import numpy as np
+
+from app.core.logger import ml_logger
+
+
+class SpeakerProfiles:
+    """Per-speaker running feature statistics with a cosine-to-centroid scorer"""
+
+    # Function to initialize SpeakerProfiles
+    def __init__(self, n_features: int = 198, temperature: float = 0.1):
+        """
+        Args:
+            n_features: Length of the feature vectors
+            temperature: Softmax temperature applied to the cosine similarities
+        """
+        self.n_features = n_features
+        self.temperature = temperature
+        self.labels: List[str] = []
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.sums = np.zeros((0, n_features))
+        self.sumsq = np.zeros((0, n_features))
+        self._scorer = None  # (mean, std, unit centroids), rebuilt after changes
+
+    @property
+    def classes_(self) -> np.ndarray:
+        return np.array(self.labels)
+
+    @property
+    def n_speakers(self) -> int:
+        return len(self.labels)
+
+    # Function to enroll feature vectors for a speaker
+    def add(self, label: str, features: np.ndarray):
+        """
+        Args:
+            label: Speaker label (e.g. "user_12", "respondent")
+            features: (n_samples, n_features) feature vectors of the new chunks
+        """
+        features = np.atleast_2d(np.asarray(features, dtype=np.float64))
+        if label not in self.labels:
+            self.labels.append(label)
+            self.counts = np.append(self.counts, 0)
+            self.sums = np.vstack([self.sums, np.zeros(self.n_features)])
+            self.sumsq = np.vstack([self.sumsq, np.zeros(self.n_features)])
+        row = self.labels.index(label)
+        self.counts[row] += len(features)
+        self.sums[row] += features.sum(axis=0)
+        self.sumsq[row] += (features ** 2).sum(axis=0)
+        self._scorer = None
+
+    # Function to remove a speaker
+    def remove(self, label: str) -> bool:
+        if label not in self.labels:
+            return False
+        row = self.labels.index(label)
+        del self.labels[row]
+        self.counts = np.delete(self.counts, row)
+        self.sums = np.delete(self.sums, row, axis=0)
+        self.sumsq = np.delete(self.sumsq, row, axis=0)
+        self._scorer = None
+        return True
+
+    # Function to build the standardized, unit-length centroids
+    def _build_scorer(self):
+        total = self.counts.sum()
+        mean = self.sums.sum(axis=0) / total
+        var = self.sumsq.sum(axis=0) / total - mean ** 2
+        std = np.sqrt(np.maximum(var, 1e-12))
+        centroids = (self.sums / self.counts[:, None] - mean) / std
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        self._scorer = (mean, std, centroids)
+        return self._scorer
+
+    # Function to compute cosine similarities to every speaker
+    def similarities(self, X: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            X: (n_samples, n_features)
+
+        Returns:
+            (n_samples, n_speakers) cosine similarities in [-1, 1]
+        """
+        if not self.labels:
+            raise ValueError("No speakers enrolled")
+        mean, std, centroids = self._scorer or self._build_scorer()
+        Z = (np.asarray(X, dtype=np.float64) - mean) / std
+        Z /= np.maximum(np.linalg.norm(Z, axis=1, keepdims=True), 1e-12)
+        return Z @ centroids.T
+
+    # Function to predict class probabilities
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        logits = self.similarities(X) / self.temperature
+        logits -= logits.max(axis=1, keepdims=True)
+        weights = np.exp(logits)
+        return weights / weights.sum(axis=1, keepdims=True)
+
+    # Function to predict class labels
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[self.similarities(X).argmax(axis=1)]
+
+    # Function to save profiles
+    def save(self, path: str) -> bool:
+        """Write the profiles as .npz (written next to the target and renamed)"""
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    labels=np.array(self.labels, dtype=str),
+                    counts=self.counts,
+                    sums=self.sums,
+                    sumsq=self.sumsq
+                )
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            ml_logger.error(f"Error saving speaker profiles: {str(e)}")
+            return False
+
+    # Function to load profiles
+    @classmethod
+    def load(cls, path: str, temperature: float = 0.1) -> "SpeakerProfiles":
+        with np.load(path) as data:
+            profiles = cls(n_features=data["sums"].shape[1], temperature=temperature)
+            profiles.labels = [str(label) for label in data["labels"]]
+            profiles.counts = data["counts"].astype(np.int64)
+            profiles.sums = data["sums"].astype(np.float64)
+            profiles.sumsq = data["sumsq"].astype(np.float64)
+        return profiles
+
+    # Function to build profiles from an existing feature/label dataset
+    @classmethod
+    def from_training_data(cls, features: List[np.ndarray], labels: List[str], temperature: float = 0.1) -> "SpeakerProfiles":
+        X = np.asarray(features, dtype=np.float64)
+        y = np.asarray(labels)
+        profiles = cls(n_features=X.shape[1], temperature=temperature)
+        for label in dict.fromkeys(labels):
+            profiles.add(str(label), X[y == label])
+        return profiles
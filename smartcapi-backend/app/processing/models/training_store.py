@@ -0,0 +1,264 @@
+"""
+Append-only columnar store for speaker training data.
+
+Replaces training_data.pkl (Python lists of arrays rewritten in full on
+every upload). Layout under the store directory:
+
+    index.json                  current base generation and its label counts
+    base-<gen>-features.npy     (N, 198) float64 feature matrix (memory-mapped on read)
+    base-<gen>-labels.npy       (N,) labels
+    segments/<seq>.npz          one file per append: features + labels
+
+Appends write a new segment file (temporary name, then os.replace), so
+writers never touch shared files and concurrent uploads cannot overwrite
+each other. Compaction merges the base and all segments into a new base
+generation and then swaps index.json, which also lists the merged
+segments so readers skip them until they are removed. Compaction is also
+how a speaker is deleted (their rows are left out). Only compaction takes
+the store lock (a lock file, so it works across processes and on Windows).
+"""
+
+import json
+import os
+import time
+import uuid
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from app.core.logger import ml_logger
+
+INDEX_FILE = "index.json"
+SEGMENTS_DIR = "segments"
+LOCK_FILE = ".lock"
+
+
+class StoreLock:
+    """Exclusive lock file (O_EXCL) shared by all processes using the store"""
+
+    # Function to initialize StoreLock
+    def __init__(self, path: str, timeout: float = 30.0, stale_after: float = 300.0):
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self._fd = None
+
+    # Function to acquire the lock (blocking up to timeout, or once when blocking=False)
+    def acquire(self, blocking: bool = True) -> bool:
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                self._fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                return True
+            except FileExistsError:
+                try:
+                    # A crashed holder leaves the file behind
+                    if time.time() - os.path.getmtime(self.path) > self.stale_after:
+                        os.remove(self.path)
+                        continue
+                except OSError:
+                    continue
+                if not blocking:
+                    return False
+                if time.time() > deadline:
+                    raise TimeoutError(f"Timed out waiting for {self.path}")
+                time.sleep(0.05)
+
+    # Function to release the lock
+    def release(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class TrainingStore:
+    """Speaker training features: append-only segments over a compacted, memory-mapped base"""
+
+    # Function to initialize TrainingStore
+    def __init__(self, root: str, n_features: int = 198, compact_segments: int = 32):
+        """
+        Args:
+            root: Store directory
+            n_features: Length of the feature vectors
+            compact_segments: Merge segments into the base once there are this many
+        """
+        self.root = root
+        self.n_features = n_features
+        self.compact_segments = compact_segments
+        self.segments_dir = os.path.join(root, SEGMENTS_DIR)
+        os.makedirs(self.segments_dir, exist_ok=True)
+
+    # Function to write a file atomically (temporary name, then rename)
+    def _write_atomic(self, path: str, write):
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+
+    # Function to read index.json
+    def _index(self) -> Dict:
+        try:
+            with open(os.path.join(self.root, INDEX_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"base": None, "labels": {}, "merged": []}
+
+    # Function to list the segments not yet merged into the base
+    def _tail(self, index: Dict) -> List[str]:
+        merged = set(index["merged"])
+        return sorted(
+            name for name in os.listdir(self.segments_dir)
+            if name.endswith(".npz") and name not in merged
+        )
+
+    # Function to append feature vectors for a speaker
+    def append(self, label: str, features: np.ndarray) -> int:
+        """
+        Args:
+            label: Speaker label
+            features: (n_samples, n_features) feature vectors
+
+        Returns:
+            Number of rows appended
+        """
+        features = np.atleast_2d(np.asarray(features, dtype=np.float64))
+        labels = np.full(len(features), label, dtype=f"<U{max(len(label), 1)}")
+        name = f"{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex[:8]}.npz"
+        self._write_atomic(
+            os.path.join(self.segments_dir, name),
+            lambda f: np.savez(f, features=features, labels=labels)
+        )
+        if len(self._tail(self._index())) >= self.compact_segments:
+            self.compact(blocking=False)
+        return len(features)
+
+    # Function to read the whole dataset
+    def read(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns:
+            (features, labels): features is (N, n_features); when there are no
+            pending segments it is the memory-mapped base itself (read-only)
+        """
+        for _ in range(5):
+            index = self._index()
+            try:
+                return self._read(index)
+            except FileNotFoundError:
+                # A compaction replaced the files we were about to read
+                continue
+        return self._read(self._index())
+
+    def _read(self, index: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        features = [np.zeros((0, self.n_features))]
+        labels = [np.zeros(0, dtype="<U1")]
+        if index["base"]:
+            prefix = os.path.join(self.root, index["base"])
+            features.append(np.load(f"{prefix}-features.npy", mmap_mode="r"))
+            labels.append(np.load(f"{prefix}-labels.npy"))
+        for name in self._tail(index):
+            with np.load(os.path.join(self.segments_dir, name)) as segment:
+                features.append(segment["features"])
+                labels.append(segment["labels"])
+        if len(features) == 2:
+            return features[1], labels[1]
+        return np.concatenate(features), np.concatenate(labels)
+
+    # Function to count rows per speaker
+    def counts(self) -> Dict[str, int]:
+        _, labels = self.read()
+        names, counts = np.unique(labels, return_counts=True)
+        return {str(name): int(count) for name, count in zip(names, counts)}
+
+    @property
+    def n_rows(self) -> int:
+        return sum(self.counts().values())
+
+    # Function to merge all segments into a new base generation
+    def compact(self, exclude: Iterable[str] = (), blocking: bool = True) -> int:
+        """
+        Args:
+            exclude: Labels whose rows are dropped (speaker deletion)
+            blocking: Wait for a running compaction instead of skipping
+
+        Returns:
+            Number of rows dropped (-1 if skipped because another compaction runs)
+        """
+        lock = StoreLock(os.path.join(self.root, LOCK_FILE))
+        if not lock.acquire(blocking=blocking):
+            return -1
+        try:
+            index = self._index()
+            tail = self._tail(index)
+            features, labels = self._read(index)
+            keep = ~np.isin(labels, list(exclude)) if exclude else np.ones(len(labels), dtype=bool)
+            features, labels = np.asarray(features[keep]), labels[keep]
+
+            base = f"base-{time.time_ns():020d}"
+            prefix = os.path.join(self.root, base)
+            self._write_atomic(f"{prefix}-features.npy", lambda f: np.save(f, features))
+            self._write_atomic(f"{prefix}-labels.npy", lambda f: np.save(f, labels))
+            names, counts = np.unique(labels, return_counts=True)
+            new_index = {
+                "base": base,
+                "labels": {str(name): int(count) for name, count in zip(names, counts)},
+                "merged": index["merged"] + tail
+            }
+            self._write_atomic(
+                os.path.join(self.root, INDEX_FILE),
+                lambda f: f.write(json.dumps(new_index).encode("utf-8"))
+            )
+            self._cleanup(new_index)
+            return int((~keep).sum())
+        finally:
+            lock.release()
+
+    # Function to remove files no longer referenced by the index
+    def _cleanup(self, index: Dict):
+        """Files still mapped by readers may not be removable (Windows); later compactions retry"""
+        merged = []
+        for name in index["merged"]:
+            try:
+                os.remove(os.path.join(self.segments_dir, name))
+            except FileNotFoundError:
+                pass
+            except OSError:
+                merged.append(name)
+        for name in os.listdir(self.root):
+            if name.startswith("base-") and not name.startswith(f"{index['base']}-"):
+                try:
+                    os.remove(os.path.join(self.root, name))
+                except OSError:
+                    pass
+        if merged != index["merged"]:
+            index["merged"] = merged
+            self._write_atomic(
+                os.path.join(self.root, INDEX_FILE),
+                lambda f: f.write(json.dumps(index).encode("utf-8"))
+            )
+
+    # Function to delete all rows of a speaker
+    def delete_label(self, label: str) -> int:
+        removed = self.compact(exclude=[label])
+        ml_logger.info(f"Removed {removed} training rows for {label}")
+        return removed
+
+    # Function to import a legacy training_data.pkl
+    def import_legacy(self, features: List[np.ndarray], labels: List[str]) -> int:
+        """Append the legacy dataset (one segment per label) and compact it into the base"""
+        X = np.asarray(features, dtype=np.float64)
+        y = np.asarray(labels)
+        for label in dict.fromkeys(labels):
+            self.append(str(label), X[y == label])
+        self.compact()
+        return len(X)
@@ -43,3 +43,10 @@ class ProgressMessage(BaseMessage):
     progress: float  # 0.0 to 1.0
     message: str
     metadata: Optional[Dict[str, Any]] = None
+
+# Message schema for speaker training jobs (queue:training:jobs)
+class TrainingJobMessage(BaseMessage):
+    kind: str  # "enroll" (voice sample), "retrain" (Random Forest refit), "remove" (delete a speaker)
+    user_id: int  # User whose training status is reported
+    speaker_label: Optional[str] = None
+    audio_path: Optional[str] = None
@@ -5,12 +5,33 @@ import redis
 from datetime import datetime
 from app.core.config import settings
 from app.core.logger import api_logger
+from app.core.redis_client import RedisChannel
+from app.core.interview_states import InterviewStateManager
 from app.services.llm_service import llm_service
 from app.db.database import SessionLocal
 from app.db.models import Interview, QuestionnaireQuestion
 # We need to access questions to know what to extract
 from app.services.question_manager import QuestionManager
 
+# Function to create the aligner buffer of an interview
+def new_interview_buffer(interview_id: int) -> dict:
+    return {
+        "transcript_parts": [],
+        "current_speaker": "unknown",
+        "accumulated_text": "",
+        "last_activity": datetime.now()
+    }
+
+# Function to serialize an aligner buffer for a state snapshot
+def buffer_snapshot(buffer: dict) -> dict:
+    return {"meta": json.dumps({key: value for key, value in buffer.items() if key != "last_activity"})}
+
+# Function to restore an aligner buffer from a state snapshot
+def buffer_from_snapshot(interview_id: int, fields: dict) -> dict:
+    buffer = new_interview_buffer(interview_id)
+    buffer.update(json.loads(fields[b"meta"]))
+    return buffer
+
 class AlignerService:
     """
     Consumes events from Redis (segment.speaker, transcript.partial)
@@ -21,7 +42,9 @@ class AlignerService:
     def __init__(self):
         self.redis = redis.Redis.from_url(settings.CELERY_BROKER_URL)
         self.pubsub = self.redis.pubsub()
-        self.interview_buffers = {} # {interview_id: {text: [], speakers: [], last_processed: 0}}
+        # {interview_id: {transcript_parts, current_speaker, accumulated_text, last_activity}},
+        # evicted when idle or ended and snapshotted to Redis (see interview_states)
+        self.interview_buffers = InterviewStateManager("aligner", new_interview_buffer, buffer_snapshot, buffer_from_snapshot)
         
     # Function to listen to redis events
     async def listen(self):
@@ -30,6 +53,7 @@ class AlignerService:
         """
         # Subscribe to pattern
         self.pubsub.psubscribe("interview.*.events")
+        self.pubsub.subscribe(RedisChannel.INTERVIEW_ENDED)
         api_logger.info("AlignerService listening on interview.*.events")
         
         for message in self.pubsub.listen():
@@ -39,6 +63,12 @@ class AlignerService:
                     await self.process_event(data)
                 except Exception as e:
                     api_logger.error(f"Aligner Error processing message: {e}")
+            elif message['type'] == 'message':
+                # Interview completed, cancelled or deleted: drop its buffer
+                try:
+                    await self.interview_buffers.complete(int(json.loads(message['data'])["interview_id"]))
+                except Exception as e:
+                    api_logger.error(f"Aligner Error handling interview end: {e}")
 
     # Function to process an event
     async def process_event(self, event):
@@ -48,16 +78,12 @@ class AlignerService:
         if not interview_id:
             return
 
-        # Initialize buffer
-        if interview_id not in self.interview_buffers:
-            self.interview_buffers[interview_id] = {
-                "transcript_parts": [],
-                "current_speaker": "unknown",
-                "accumulated_text": "",
-                "last_activity": datetime.now()
-            }
+        # Snapshot changed buffers, drop idle ones
+        await self.interview_buffers.maintain()
         
-        buffer = self.interview_buffers[interview_id]
+        # Local buffer, or its snapshot, or a new one
+        buffer = await self.interview_buffers.get(interview_id)
+        buffer["last_activity"] = datetime.now()
         
         if event_type == "segment.speaker":
             # Update current speaker state
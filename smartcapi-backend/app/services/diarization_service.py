@@ -4,31 +4,71 @@ import numpy as np
 import librosa
 import soundfile as sf
 import asyncio
+import threading
+import time
 from typing import List, Dict, Tuple, Optional, Any
 from sklearn.ensemble import RandomForestClassifier
 from app.core.config import settings
 from app.core.logger import ml_logger
 from app.services.file_service import ensure_directory_exists
-from app.processing.audio.feature_extractor import extract_mfcc_features
+from app.processing.audio.feature_extractor import extract_mfcc_features, extract_mfcc_features_batch
+from app.processing.audio.streaming_features import StreamingMFCC
+from app.processing.models.forest_arrays import ForestArrays, export_forest
+from app.processing.models.loader import load_rf_arrays
+from app.processing.models.speaker_profiles import SpeakerProfiles
+from app.processing.models.training_store import TrainingStore
+from app.services.model_registry import model_registry, FOREST, PROFILES
 
 class SpeakerRecognitionService:
     # Function to initialize SpeakerRecognitionService
     def __init__(self):
         self.model = None
         self.model_path = settings.RF_MODEL_PATH
+        self.arrays_path = settings.RF_ARRAYS_PATH
         self.sample_rate = settings.SAMPLE_RATE
+        # Rolling-window feature streams, one per interview (see stream_features)
+        self._streams: Dict[Any, StreamingMFCC] = {}
+        self._last_sweep = 0.0
+        # Incremental enrollment profiles (see speaker_profiles)
+        self.profiles_path = settings.SPEAKER_PROFILES_PATH
+        self.profiles = SpeakerProfiles(temperature=settings.SPEAKER_PROFILE_TEMPERATURE)
+        self._profiles_lock = threading.Lock()
+        # Registry version checks (see scorer); new versions load on a background thread
+        self._versions_checked = time.time()
+        self._version_check_running = False
+        # Optional background Random Forest refit
+        self._retrain_lock = threading.Lock()
+        self._retrain_pending = False
+        self._retrain_thread = None
         self._load_model()
+        self.training_store = TrainingStore(settings.SPEAKER_TRAINING_DATA_DIR)
+        self._load_profiles()
     
     # Function to load model
     def _load_model(self):
-        """Load the Random Forest model for speaker recognition"""
+        """
+        Load the Random Forest model for speaker recognition.
+        
+        A trained model is used through its memory-mapped array export
+        (ForestArrays: predict / predict_proba / classes_), so processes do not
+        unpickle the forest; the sklearn model is only built again for training.
+        The active registry version is preferred over the unversioned files.
+        """
         try:
             # Ensure model directory exists
             model_dir = os.path.dirname(self.model_path)
             ensure_directory_exists(model_dir)
             
+            entry = model_registry.active(FOREST)
+            forest = self._load_version(entry) if entry else None
+            if forest is None:
+                forest = load_rf_arrays(self.model_path, self.arrays_path)
+                if forest is not None:
+                    forest.version = f"{FOREST}:file"
+            if forest is not None:
+                self.model = forest
             # Load model if exists, otherwise create a new one
-            if os.path.exists(self.model_path):
+            elif os.path.exists(self.model_path):
                 ml_logger.info(f"Loading RF model from {self.model_path}")
                 with open(self.model_path, 'rb') as f:
                     self.model = pickle.load(f)
@@ -43,15 +83,163 @@ class SpeakerRecognitionService:
             # Create a new model as fallback
             self.model = RandomForestClassifier(n_estimators=100, random_state=42)
     
+    # Function to load speaker profiles
+    def _load_profiles(self):
+        """
+        Load enrollment profiles: the active registry version, else the
+        unversioned file. Without either, profiles stay empty until the
+        training worker publishes them (see bootstrap_profiles).
+        """
+        try:
+            entry = model_registry.active(PROFILES)
+            profiles = self._load_version(entry) if entry else None
+            if profiles is not None:
+                self.profiles = profiles
+            elif os.path.exists(self.profiles_path):
+                self.profiles = SpeakerProfiles.load(self.profiles_path, settings.SPEAKER_PROFILE_TEMPERATURE)
+                self.profiles.version = f"{PROFILES}:file"
+            else:
+                return
+            ml_logger.info(f"Loaded speaker profiles {self.profiles.version} for {self.profiles.n_speakers} speakers")
+        except Exception as e:
+            ml_logger.error(f"Failed to load speaker profiles: {str(e)}")
+    
+    # Function to build and publish the first profiles version (training worker only)
+    def bootstrap_profiles(self):
+        """
+        Build the enrollment profiles from the training data when no version
+        exists yet (first start after upgrading from the Random Forest only
+        setup). Only the training worker calls this, so a single process
+        publishes; the others swap the version in when it is announced.
+        """
+        with self._profiles_lock:
+            if getattr(self.profiles, "version", None) or model_registry.active(PROFILES, use_cache=False):
+                return
+            features, labels = self._load_training_data()
+            if not len(labels):
+                return
+            self.profiles = SpeakerProfiles.from_training_data(features, labels, settings.SPEAKER_PROFILE_TEMPERATURE)
+            self._publish_profiles()
+            ml_logger.info(f"Built speaker profiles {self.profiles.version} for {self.profiles.n_speakers} speakers")
+    
+    # Function to load one registered model version
+    def _load_version(self, entry: Dict[str, Any]):
+        """
+        Args:
+            entry: Registry entry {id, name, version, file_path}
+            
+        Returns:
+            ForestArrays or SpeakerProfiles tagged with .version ("<name>:v<version>"), or None
+        """
+        try:
+            if entry["name"] == FOREST:
+                model = ForestArrays.load(entry["file_path"])
+            else:
+                model = SpeakerProfiles.load(entry["file_path"], settings.SPEAKER_PROFILE_TEMPERATURE)
+            model.version = f"{entry['name']}:v{entry['version']}"
+            return model
+        except Exception as e:
+            ml_logger.error(f"Failed to load {entry.get('name')} v{entry.get('version')}: {str(e)}")
+            return None
+    
+    # Function to register the current profiles as a new version
+    def _publish_profiles(self):
+        """Called with the profiles lock held (or before the service is shared)"""
+        entry = model_registry.publish(
+            PROFILES,
+            self.profiles.save,
+            metrics={"n_speakers": self.profiles.n_speakers, "n_samples": int(self.profiles.counts.sum())},
+            parameters={"temperature": self.profiles.temperature}
+        )
+        if entry:
+            self.profiles.version = f"{PROFILES}:v{entry['version']}"
+        else:
+            # No registry (database unavailable): keep the unversioned file current
+            self.profiles.save(self.profiles_path)
+            self.profiles.version = f"{PROFILES}:file"
+    
+    # Function to swap in a newer registered version
+    def _swap_in(self, entry: Dict[str, Any]) -> bool:
+        current = self.model if entry["name"] == FOREST else self.profiles
+        if getattr(current, "version", None) == f"{entry['name']}:v{entry['version']}":
+            return False
+        model = self._load_version(entry)
+        if model is None:
+            return False
+        # Single attribute assignment: predictions see the old or the new model, never a mix
+        if entry["name"] == FOREST:
+            self.model = model
+        else:
+            self.profiles = model
+        ml_logger.info(f"Swapped in {model.version}")
+        return True
+    
+    # Function to check the registry for new active versions (background thread)
+    def _check_versions(self):
+        try:
+            for name in (FOREST, PROFILES):
+                entry = model_registry.active(name)
+                if entry:
+                    self._swap_in(entry)
+        except Exception as e:
+            ml_logger.error(f"Model version check failed: {str(e)}")
+        finally:
+            self._version_check_running = False
+    
+    @property
+    def scorer(self):
+        """
+        Model used for speaker predictions: enrollment profiles, or the Random Forest.
+        Every MODEL_REGISTRY_CHECK_SECONDS a background thread looks for newer
+        active versions, so predictions never wait for a model load.
+        """
+        now = time.time()
+        if now - self._versions_checked >= settings.MODEL_REGISTRY_CHECK_SECONDS and not self._version_check_running:
+            self._versions_checked = now
+            self._version_check_running = True
+            threading.Thread(target=self._check_versions, name="model-version-check", daemon=True).start()
+        if settings.SPEAKER_SCORER == "profiles" and self.profiles.n_speakers:
+            return self.profiles
+        return self.model
+    
+    # Function to load the accumulated training data
+    def _load_training_data(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(features, labels) from the training store; features may be memory-mapped"""
+        return self.training_store.read()
+    
+    # Function to move a legacy training_data.pkl into the training store (training worker only)
+    def migrate_training_data(self):
+        """
+        Import the legacy dataset once and rename the pickle. Only the
+        (single) training worker calls this at startup, so concurrent
+        processes cannot import the same rows twice.
+        """
+        training_data_path = os.path.join(os.path.dirname(self.model_path), "training_data.pkl")
+        if not os.path.exists(training_data_path):
+            return
+        try:
+            with open(training_data_path, 'rb') as f:
+                training_data = pickle.load(f)
+            if training_data['labels']:
+                rows = self.training_store.import_legacy(training_data['features'], training_data['labels'])
+                ml_logger.info(f"Migrated {rows} training rows from {training_data_path}")
+            os.replace(training_data_path, f"{training_data_path}.migrated")
+        except Exception as e:
+            ml_logger.error(f"Failed to migrate {training_data_path}: {str(e)}")
+    
     # Function to save model
     def save_model(self):
-        """Save the current model to disk"""
+        """Save the current model to disk (pickle for training, .npz export for inference)"""
         try:
+            if isinstance(self.model, ForestArrays):
+                return True  # Already on disk
             model_dir = os.path.dirname(self.model_path)
             ensure_directory_exists(model_dir)
             
             with open(self.model_path, 'wb') as f:
                 pickle.dump(self.model, f)
+            if hasattr(self.model, "estimators_"):
+                export_forest(self.model, self.arrays_path)
             ml_logger.info(f"Model saved to {self.model_path}")
             return True
         except Exception as e:
@@ -108,14 +296,29 @@ class SpeakerRecognitionService:
             if progress_callback:
                 progress_callback(50, "training", f"Training model with {len(X)} samples...")
             
-            # Train the model
-            self.model.fit(X, y)
+            # Train a fresh forest (fit replaces all trees anyway); the current
+            # model keeps serving predictions until the new one is fitted
+            model = RandomForestClassifier(n_estimators=100, random_state=42)
+            model.fit(X, y)
+            self.model = model
             
             if progress_callback:
                 progress_callback(80, "saving", "Saving trained model...")
             
-            # Save the trained model
+            # Save the trained model, register it as a new version and switch to its mapped export
             self.save_model()
+            entry = model_registry.publish(
+                FOREST,
+                lambda path: export_forest(model, path),
+                metrics={"n_samples": int(len(X)), "n_speakers": int(len(model.classes_)), "classes": [str(c) for c in model.classes_]},
+                parameters={"n_estimators": 100, "random_state": 42}
+            )
+            forest = self._load_version(entry) if entry else None
+            if forest is None:
+                forest = load_rf_arrays(self.model_path, self.arrays_path)
+                if forest is not None:
+                    forest.version = f"{FOREST}:file"
+            self.model = forest or self.model
             
             ml_logger.info(f"Model trained with {len(X)} samples")
             return True
@@ -145,11 +348,12 @@ class SpeakerRecognitionService:
             features = features.reshape(1, -1)
             
             # Make prediction
-            prediction = self.model.predict(features)[0]
+            scorer = self.scorer
+            prediction = scorer.predict(features)[0]
             
             # Get confidence score
-            if hasattr(self.model, "predict_proba"):
-                probabilities = self.model.predict_proba(features)[0]
+            if hasattr(scorer, "predict_proba"):
+                probabilities = scorer.predict_proba(features)[0]
                 confidence = max(probabilities)
             else:
                 confidence = 1.0  # Default confidence if predict_proba is not available
@@ -162,55 +366,159 @@ class SpeakerRecognitionService:
             ml_logger.error(f"Error predicting speaker: {str(e)}")
             return "unknown", 0.0
 
+    # Function to compute rolling-window features for chunks of known streams
+    def stream_features(self, audios: List[np.ndarray], sample_rate: int, stream_keys: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Push each chunk into its stream's StreamingMFCC (in order) and take
+        the features of the window ending at that chunk. Frames computed for
+        earlier chunks are reused, so each chunk only costs its own STFT frames.
+
+        Returns:
+            (features, ok) like extract_mfcc_features_batch; rows whose stream
+            window is still too short are not ok
+        """
+        features = np.zeros((len(audios), 198), dtype=np.float64)
+        ok = np.zeros(len(audios), dtype=bool)
+        for i, (audio, key) in enumerate(zip(audios, stream_keys)):
+            stream = self._streams.get(key)
+            if stream is None or stream.sample_rate != sample_rate:
+                stream = self._streams[key] = StreamingMFCC(sample_rate)
+            stream.push(audio)
+            row = stream.features()
+            if row is not None:
+                features[i] = row
+                ok[i] = True
+
+        now = time.time()
+        if now - self._last_sweep > settings.SPEAKER_STREAM_TTL:
+            self._last_sweep = now
+            for key in [k for k, v in self._streams.items() if now - v.last_used > settings.SPEAKER_STREAM_TTL]:
+                del self._streams[key]
+        return features, ok
+
+    # Function to drop the rolling feature window of a stream
+    def forget_stream(self, stream_key: Any):
+        self._streams.pop(stream_key, None)
+
+    # Function to predict speakers for a batch of in-memory chunks, with the model version (blocking)
+    def predict_speakers_versioned_sync(
+        self,
+        audios: List[np.ndarray],
+        sample_rate: int,
+        stream_keys: Optional[List[Any]] = None
+    ) -> Tuple[List[Tuple[str, float]], Optional[str]]:
+        """
+        Predict the speaker of many chunks with one feature pass and one
+        predict_proba call on the stacked matrix (label = argmax)
+
+        Args:
+            audios: List of audio arrays
+            sample_rate: Sample rate of the audio
+            stream_keys: Optional stream (interview) of each chunk. When given,
+                features summarize the last SPEAKER_WINDOW_SECONDS of that
+                stream instead of the chunk alone; chunks arriving before the
+                window has enough frames fall back to per-chunk features.
+
+        Returns:
+            (results, model_version): one (speaker_label, confidence_score) per
+            chunk, and the version of the model that scored them
+            (e.g. "speaker_profiles:v12"; None if nothing was scored)
+        """
+        results = [("unknown", 0.0)] * len(audios)
+        if not audios:
+            return results, None
+        try:
+            if stream_keys is not None:
+                features, ok = self.stream_features(audios, sample_rate, stream_keys)
+                if not ok.all():
+                    missing = np.flatnonzero(~ok)
+                    fallback, fallback_ok = extract_mfcc_features_batch([audios[i] for i in missing], sample_rate)
+                    features[missing] = fallback
+                    ok[missing] = fallback_ok
+            else:
+                features, ok = extract_mfcc_features_batch(audios, sample_rate)
+            rows = np.flatnonzero(ok)
+            if len(rows) == 0:
+                return results, None
+
+            # One read: the whole batch uses the same model even if a swap happens meanwhile
+            scorer = self.scorer
+            version = getattr(scorer, "version", None)
+            if hasattr(scorer, "predict_proba"):
+                probabilities = scorer.predict_proba(features[rows])
+                best = probabilities.argmax(axis=1)
+                labels = scorer.classes_[best]
+                confidences = probabilities[np.arange(len(rows)), best]
+            else:
+                labels = scorer.predict(features[rows])
+                confidences = np.ones(len(rows))
+
+            for row, label, confidence in zip(rows, labels, confidences):
+                results[row] = (str(label), float(confidence))
+            return results, version
+        except Exception as e:
+            ml_logger.error(f"Error predicting speakers for batch of {len(audios)}: {str(e)}")
+            return results, None
+
+    # Function to predict speakers for a batch of in-memory chunks (blocking)
+    def predict_speakers_batch_sync(
+        self,
+        audios: List[np.ndarray],
+        sample_rate: int,
+        stream_keys: Optional[List[Any]] = None
+    ) -> List[Tuple[str, float]]:
+        """predict_speakers_versioned_sync without the model version"""
+        return self.predict_speakers_versioned_sync(audios, sample_rate, stream_keys)[0]
+
+    # Function to predict speakers for a batch of in-memory chunks, with the model version
+    async def predict_speakers_versioned(
+        self,
+        audios: List[np.ndarray],
+        sample_rate: int,
+        stream_keys: Optional[List[Any]] = None
+    ) -> Tuple[List[Tuple[str, float]], Optional[str]]:
+        """Async wrapper of predict_speakers_versioned_sync: one executor hop per batch"""
+        loop = asyncio.get_running_loop()
+        results, version = await loop.run_in_executor(None, self.predict_speakers_versioned_sync, audios, sample_rate, stream_keys)
+        ml_logger.debug(f"Speaker prediction (batch of {len(audios)}, {version}): {[label for label, _ in results]}")
+        return results, version
+
+    # Function to predict speakers for a batch of in-memory chunks
+    async def predict_speakers_batch(
+        self,
+        audios: List[np.ndarray],
+        sample_rate: int,
+        stream_keys: Optional[List[Any]] = None
+    ) -> List[Tuple[str, float]]:
+        """predict_speakers_versioned without the model version"""
+        return (await self.predict_speakers_versioned(audios, sample_rate, stream_keys))[0]
+
+    # Function to predict speaker from memory (blocking)
+    def predict_speaker_from_memory_sync(self, audio_data: np.ndarray, sample_rate: int, stream_key: Any = None) -> Tuple[str, float]:
+        keys = None if stream_key is None else [stream_key]
+        return self.predict_speakers_batch_sync([audio_data], sample_rate, keys)[0]
+
     # Function to predict speaker from memory
-    async def predict_speaker_from_memory(self, audio_data: np.ndarray, sample_rate: int) -> Tuple[str, float]:
+    async def predict_speaker_from_memory(self, audio_data: np.ndarray, sample_rate: int, stream_key: Any = None) -> Tuple[str, float]:
         """
         Predict the speaker from in-memory audio data (Async)
         
         Args:
             audio_data: Audio data as numpy array
             sample_rate: Sample rate of the audio
+            stream_key: Optional stream (e.g. interview id) the chunk belongs to;
+                        enables rolling-window features across its chunks
             
         Returns:
             Tuple of (speaker_label, confidence_score)
         """
-        try:
-            loop = asyncio.get_event_loop()
-            
-            # Use executor to avoid blocking event loop
-            def _predict():
-                # Extract MFCC features directly from memory
-                mfccs = extract_mfcc_features(audio_data, sample_rate)
-                features = mfccs.flatten()
-                
-                if len(features) == 0:
-                    return "unknown", 0.0
-                
-                # Reshape for prediction
-                features = features.reshape(1, -1)
-                
-                # Make prediction
-                prediction = self.model.predict(features)[0]
-                
-                # Get confidence score
-                if hasattr(self.model, "predict_proba"):
-                    probabilities = self.model.predict_proba(features)[0]
-                    confidence = max(probabilities)
-                else:
-                    confidence = 1.0
-                
-                return prediction, confidence
-
-            # Run in thread pool (default executor)
-            prediction, confidence = await loop.run_in_executor(None, _predict)
-            
-            # BOOST CONFIDENCE DISPLAY (User Request)
-            boosted_conf = min(1.0, confidence + 0.40)
-            ml_logger.info(f"Speaker prediction (memory): {prediction} with confidence {boosted_conf:.2f}")
-            return prediction, confidence
-        except Exception as e:
-            ml_logger.error(f"Error predicting speaker from memory: {str(e)}")
-            return "unknown", 0.0
+        keys = None if stream_key is None else [stream_key]
+        prediction, confidence = (await self.predict_speakers_batch([audio_data], sample_rate, keys))[0]
+        
+        # BOOST CONFIDENCE DISPLAY (User Request)
+        boosted_conf = min(1.0, confidence + 0.40)
+        ml_logger.info(f"Speaker prediction (memory): {prediction} with confidence {boosted_conf:.2f}")
+        return prediction, confidence
 
     # Function to add voice sample
     def add_voice_sample(self, audio_path: str, speaker_label: str, progress_callback=None) -> bool:
@@ -281,41 +589,24 @@ class SpeakerRecognitionService:
             ml_logger.info(f"Extracted features for {len(new_features_list)} chunks")
             
             if progress_callback:
-                progress_callback(30, "loading_data", "Loading existing training data...")
-            
-            # Load existing training data if exists
-            training_data_path = os.path.join(os.path.dirname(self.model_path), "training_data.pkl")
-            if os.path.exists(training_data_path):
-                with open(training_data_path, 'rb') as f:
-                    training_data = pickle.load(f)
-                all_features = training_data['features']
-                all_labels = training_data['labels']
-            else:
-                all_features = []
-                all_labels = []
+                progress_callback(30, "enrolling", f"Enrolling {len(new_features_list)} samples for {speaker_label}...")
             
-            # Add new samples
-            for features in new_features_list:
-                all_features.append(features)
-                all_labels.append(speaker_label)
+            # Enroll: only this speaker's profile statistics change (published as a new version)
+            with self._profiles_lock:
+                self.profiles.add(speaker_label, np.array(new_features_list))
+                self._publish_profiles()
             
             if progress_callback:
-                progress_callback(40, "saving_data", f"Updating dataset with {len(new_features_list)} new samples...")
+                progress_callback(60, "saving_data", f"Updating dataset with {len(new_features_list)} new samples...")
             
-            # Save updated training data
-            training_data = {
-                'features': all_features,
-                'labels': all_labels
-            }
-            with open(training_data_path, 'wb') as f:
-                pickle.dump(training_data, f)
+            # Keep the full dataset for (optional) Random Forest training
+            self.training_store.append(speaker_label, np.array(new_features_list))
             
-            # Retrain model with new data
-            # Pass progress callback to handle 40% -> 100%
-            success = self.train_model(all_features, all_labels, progress_callback)
+            if settings.SPEAKER_RF_RETRAIN:
+                self.schedule_retrain()
             
-            if success and progress_callback:
-                progress_callback(100, "completed", "Training completed successfully!")
+            if progress_callback:
+                progress_callback(100, "completed", "Voice profile enrolled successfully!")
             
             ml_logger.info(f"Added {len(new_features_list)} voice samples for {speaker_label}")
             return True
@@ -325,6 +616,76 @@ class SpeakerRecognitionService:
                 progress_callback(0, "error", f"Error: {str(e)}")
             return False
 
+    # Function to swap in models activated by another process (training worker)
+    def reload_models(self, entry: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            entry: Registry entry from the model update notification; None checks
+                   the active versions of all speaker models
+        """
+        if entry and entry.get("name") in (FOREST, PROFILES):
+            self._swap_in(entry)
+        else:
+            for name in (FOREST, PROFILES):
+                active = model_registry.active(name)
+                if active:
+                    self._swap_in(active)
+        self._versions_checked = time.time()
+    
+    # Function to remove a speaker's training data and profile
+    def remove_speaker(self, speaker_label: str) -> bool:
+        """
+        Delete a speaker (e.g. a deleted user) from the training store and
+        the enrollment profiles; the Random Forest follows on its next refit
+        
+        Args:
+            speaker_label: Label of the speaker (e.g. "user_12")
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            self.training_store.delete_label(speaker_label)
+            with self._profiles_lock:
+                if self.profiles.remove(speaker_label):
+                    self._publish_profiles()
+            if settings.SPEAKER_RF_RETRAIN:
+                self.schedule_retrain()
+            ml_logger.info(f"Removed speaker {speaker_label}")
+            return True
+        except Exception as e:
+            ml_logger.error(f"Error removing speaker {speaker_label}: {str(e)}")
+            return False
+    
+    # Function to refit the Random Forest in the background
+    def schedule_retrain(self):
+        """
+        Queue a Random Forest refit on the accumulated training data. Runs on
+        one background thread; requests made while a refit runs are coalesced
+        into a single follow-up refit.
+        """
+        with self._retrain_lock:
+            self._retrain_pending = True
+            if self._retrain_thread is not None and self._retrain_thread.is_alive():
+                return
+            self._retrain_thread = threading.Thread(target=self._retrain_loop, name="rf-retrain", daemon=True)
+            self._retrain_thread.start()
+    
+    # Function to run queued Random Forest refits
+    def _retrain_loop(self):
+        while True:
+            with self._retrain_lock:
+                if not self._retrain_pending:
+                    self._retrain_thread = None
+                    return
+                self._retrain_pending = False
+            try:
+                features, labels = self._load_training_data()
+                if len(labels):
+                    self.train_model(features, labels)
+            except Exception as e:
+                ml_logger.error(f"Background RF retraining failed: {str(e)}")
+
 class AudioDiarizationService:
     # Function to initialize AudioDiarizationService
     def __init__(self):
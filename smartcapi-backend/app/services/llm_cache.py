@@ -0,0 +1,189 @@
+"""
+Content-addressed cache of LLM responses in Redis.
+
+LLMService calls are pure functions of the request: model, prompt template
+and the (normalized) transcript, schema and interview date all end up in
+the chat request. The cache key is a SHA-256 over that request plus
+LLM_CACHE_VERSION (bump it to drop every entry, e.g. after changing the
+post-processing), so reprocessing an unchanged interview or retrying after
+an error reuses the earlier answers instead of paying for them again:
+
+    llm_cache:<sha256>      response content (string, expires LLM_CACHE_TTL after its last use)
+    llm_cache:lru           sorted set key -> last use; members older than the TTL
+                            (expired keys) are pruned on every store, and beyond
+                            LLM_CACHE_MAX_ENTRIES the least recently used entries
+                            are deleted
+    llm_cache:stats         hits / misses / stores / evictions across processes
+
+Redis errors never fail a call; they count as a miss and are logged.
+"""
+
+import hashlib
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logger import ml_logger
+from app.core.redis_client import redis_client, async_redis_client
+
+
+class LLMResponseCache:
+    """Redis cache of chat completion contents keyed by a hash of the request"""
+
+    PREFIX = "llm_cache:"
+    LRU_KEY = "llm_cache:lru"
+    STATS_KEY = "llm_cache:stats"
+
+    # Function to initialize LLMResponseCache
+    def __init__(self, ttl: int = None, max_entries: int = None, version: str = None):
+        """
+        Args:
+            ttl: Seconds an entry is kept
+            max_entries: Least recently used entries are evicted beyond this many
+            version: Part of every key; changing it invalidates the cache
+        """
+        self.ttl = ttl or settings.LLM_CACHE_TTL
+        self.max_entries = max_entries or settings.LLM_CACHE_MAX_ENTRIES
+        self.version = version or settings.LLM_CACHE_VERSION
+
+        # Metrics (this process; Redis holds the totals)
+        self.hits = 0
+        self.misses = 0
+
+    # Function to get the cache key of a chat request
+    def key(self, method: str, request: Dict[str, Any]) -> str:
+        """
+        Args:
+            method: LLMService method, so identical prompts of different methods never collide
+            request: chat.completions.create arguments
+
+        Returns:
+            Redis key of the entry
+        """
+        payload = json.dumps(
+            {"version": self.version, "method": method, "request": request},
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return self.PREFIX + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # Function to decode a cached value and count the lookup
+    def _lookup_result(self, value: Optional[bytes]) -> Optional[str]:
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    # Function to look up a response
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            value = await async_redis_client.get(key)
+            pipe = async_redis_client.pipeline(transaction=False)
+            if value is not None:
+                self._queue_touch(pipe, key)
+            pipe.hincrby(self.STATS_KEY, "hits" if value is not None else "misses", 1)
+            await pipe.execute()
+        except Exception as e:
+            ml_logger.warning(f"LLM cache lookup failed: {e}")
+            value = None
+        return self._lookup_result(value)
+
+    # Function to look up a response (blocking)
+    def get_sync(self, key: str) -> Optional[str]:
+        try:
+            value = redis_client.get(key)
+            pipe = redis_client.pipeline(transaction=False)
+            if value is not None:
+                self._queue_touch(pipe, key)
+            pipe.hincrby(self.STATS_KEY, "hits" if value is not None else "misses", 1)
+            pipe.execute()
+        except Exception as e:
+            ml_logger.warning(f"LLM cache lookup failed: {e}")
+            value = None
+        return self._lookup_result(value)
+
+    # Function to queue the commands that mark a hit as used
+    def _queue_touch(self, pipe, key: str):
+        # Sliding TTL: the key expires exactly when its LRU score falls below now - ttl
+        pipe.expire(key, self.ttl)
+        pipe.zadd(self.LRU_KEY, {key: time.time()}, xx=True)
+        pipe.expire(self.LRU_KEY, self.ttl)
+
+    # Function to queue the commands that store an entry
+    def _queue_put(self, pipe, key: str, content: str):
+        now = time.time()
+        pipe.set(key, content, ex=self.ttl)
+        pipe.zadd(self.LRU_KEY, {key: now})
+        pipe.expire(self.LRU_KEY, self.ttl)
+        pipe.hincrby(self.STATS_KEY, "stores", 1)
+        # Members whose key already expired would count against max_entries forever
+        pipe.zremrangebyscore(self.LRU_KEY, "-inf", now - self.ttl)
+        pipe.zcard(self.LRU_KEY)
+
+    # Function to store a response
+    async def put(self, key: str, content: str):
+        try:
+            pipe = async_redis_client.pipeline(transaction=False)
+            self._queue_put(pipe, key, content)
+            size = (await pipe.execute())[-1]
+            if size > self.max_entries:
+                evicted = await async_redis_client.zpopmin(self.LRU_KEY, size - self.max_entries)
+                pipe = async_redis_client.pipeline(transaction=False)
+                self._queue_delete(pipe, evicted)
+                await pipe.execute()
+        except Exception as e:
+            ml_logger.warning(f"LLM cache store failed: {e}")
+
+    # Function to store a response (blocking)
+    def put_sync(self, key: str, content: str):
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            self._queue_put(pipe, key, content)
+            size = pipe.execute()[-1]
+            if size > self.max_entries:
+                evicted = redis_client.zpopmin(self.LRU_KEY, size - self.max_entries)
+                pipe = redis_client.pipeline(transaction=False)
+                self._queue_delete(pipe, evicted)
+                pipe.execute()
+        except Exception as e:
+            ml_logger.warning(f"LLM cache store failed: {e}")
+
+    # Function to queue the deletion of evicted entries
+    def _queue_delete(self, pipe, evicted: List[Any]):
+        keys = [member for member, _ in evicted]
+        if keys:
+            pipe.delete(*keys)
+            pipe.hincrby(self.STATS_KEY, "evictions", len(keys))
+
+    # Function to report cache counters (all processes)
+    def stats(self) -> Dict[str, Any]:
+        counters = redis_client.hgetall(self.STATS_KEY)
+        counters = {k.decode() if isinstance(k, bytes) else k: int(v) for k, v in counters.items()}
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        return {
+            "entries": redis_client.zcount(self.LRU_KEY, time.time() - self.ttl, "+inf"),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+            "stores": counters.get("stores", 0),
+            "evictions": counters.get("evictions", 0),
+        }
+
+    # Function to drop every cached response and reset the counters
+    def clear(self) -> int:
+        """
+        Returns:
+            Number of entries deleted
+        """
+        entries = redis_client.zcard(self.LRU_KEY)
+        keys = list(redis_client.scan_iter(match=self.PREFIX + "*", count=1000))
+        for i in range(0, len(keys), 1000):
+            redis_client.delete(*keys[i:i + 1000])
+        return entries
+
+
+llm_cache = LLMResponseCache()
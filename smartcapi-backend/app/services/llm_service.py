@@ -1,11 +1,18 @@
 import os
 import re
 import json
+import random
+import asyncio
 import datetime
-from typing import Dict, Any, List
-from openai import OpenAI
+from typing import Dict, Any, List, Optional
+import httpx
+from openai import OpenAI, AsyncOpenAI, APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
 from app.core.config import settings
 from app.core.logger import ml_logger
+from app.services.llm_cache import llm_cache
+
+# Failures worth retrying (rate limit, timeout, connection reset, 5xx)
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
 
 # Improved Prompt Template (User Provided)
 EXTRACTION_PROMPT_TEMPLATE = """
@@ -75,10 +82,43 @@ OUTPUT JSON:
 Pastikan response Anda HANYA berisi valid JSON tanpa penjelasan tambahan.
 """
 
+
+# Function to compute the wait before retrying a failed OpenAI request
+def retry_delay(error: Exception, attempt: int) -> float:
+    """
+    Args:
+        error: The failure (a 429 usually carries Retry-After)
+        attempt: Retries made so far (0 for the first)
+
+    Returns:
+        Seconds to wait: the server's Retry-After when given, else exponential
+        backoff with full jitter so concurrent requests do not retry in lockstep
+    """
+    response = getattr(error, "response", None)
+    if response is not None:
+        headers = response.headers
+        try:
+            if headers.get("retry-after-ms"):
+                return min(float(headers["retry-after-ms"]) / 1000, settings.LLM_RETRY_MAX_DELAY)
+            if headers.get("retry-after"):
+                return min(float(headers["retry-after"]), settings.LLM_RETRY_MAX_DELAY)
+        except ValueError:
+            pass  # HTTP-date form; fall back to backoff
+    backoff = min(settings.LLM_RETRY_BASE_DELAY * (2 ** attempt), settings.LLM_RETRY_MAX_DELAY)
+    return random.uniform(backoff / 2, backoff)
+
+
 class LLMService:
     # Function to initialize LLMService
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = OpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL)
+        # Async client, created per event loop on first use (see async_client)
+        self._async_client: Optional[AsyncOpenAI] = None
+        self._async_loop = None
+        # Metrics (async client)
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
         self.system_prompt_path = "./app/processing/llm/prompts/system_prompt.txt"
         self.extract_prompt_path = "./app/processing/llm/prompts/extract_info.txt"
         self._load_prompts()
@@ -139,77 +179,200 @@ Transkrip: {transcript}
             ml_logger.error(f"Error loading prompts: {str(e)}")
             self.system_prompt = "Anda adalah asisten AI untuk SmartCAPI."
 
+    # Function to get the async OpenAI client (shared HTTP connection pool)
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """
+        One client per event loop: its httpx pool is bound to the loop that
+        opened the connections. Retries are done in _chat, not by the SDK.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=settings.OPENAI_BASE_URL,
+                max_retries=0,
+                timeout=settings.LLM_TIMEOUT,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=settings.LLM_MAX_CONNECTIONS,
+                        max_keepalive_connections=settings.LLM_MAX_CONNECTIONS
+                    ),
+                    timeout=settings.LLM_TIMEOUT
+                )
+            )
+            self._async_loop = loop
+        return self._async_client
+
+    # Function to get the response cache key of a request (None when not cached)
+    def _cache_key(self, method: str, request: Dict[str, Any], use_cache: bool) -> Optional[str]:
+        if not use_cache or not settings.LLM_CACHE_ENABLED:
+            return None
+        return llm_cache.key(method, request)
+
+    # Function to check that a response is worth caching
+    @staticmethod
+    def _cacheable(request: Dict[str, Any], content: Optional[str]) -> bool:
+        """Empty answers, and invalid JSON from a JSON-mode request, are not cached (the next call may do better)"""
+        if not content or not content.strip():
+            return False
+        if request.get("response_format", {}).get("type") == "json_object":
+            try:
+                json.loads(content)
+            except json.JSONDecodeError:
+                return False
+        return True
+
+    # Function to run a chat completion on the async client (cached, retrying 429s and transient failures)
+    async def _chat(self, method: str, request: Dict[str, Any], use_cache: bool = True) -> str:
+        """
+        Args:
+            method: Calling LLMService method (part of the cache key)
+            request: chat.completions.create arguments
+            use_cache: Look up / store the response in the LLM response cache
+
+        Returns:
+            Content of the first choice
+        """
+        key = self._cache_key(method, request, use_cache)
+        if key is not None:
+            cached = await llm_cache.get(key)
+            if cached is not None:
+                return cached
+
+        attempt = 0
+        while True:
+            self.requests += 1
+            try:
+                response = await self.async_client.chat.completions.create(**request)
+                content = response.choices[0].message.content
+                if key is not None and self._cacheable(request, content):
+                    await llm_cache.put(key, content)
+                return content
+            except RETRYABLE_ERRORS as e:
+                if isinstance(e, RateLimitError):
+                    self.rate_limited += 1
+                if attempt >= settings.LLM_MAX_RETRIES:
+                    raise
+                delay = retry_delay(e, attempt)
+                attempt += 1
+                self.retries += 1
+                ml_logger.warning(f"OpenAI request failed ({type(e).__name__}), retry {attempt}/{settings.LLM_MAX_RETRIES} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    # Function to run a chat completion on the sync client (cached)
+    def _chat_sync(self, method: str, request: Dict[str, Any], use_cache: bool = True) -> str:
+        key = self._cache_key(method, request, use_cache)
+        if key is not None:
+            cached = llm_cache.get_sync(key)
+            if cached is not None:
+                return cached
+
+        response = self.client.chat.completions.create(**request)
+        content = response.choices[0].message.content
+        if key is not None and self._cacheable(request, content):
+            llm_cache.put_sync(key, content)
+        return content
+
+    # Function to build the extraction request
+    def _extraction_request(self, transcript: str, prompt: str = None, schema: List[str] = None, interview_date: Optional[datetime.date] = None) -> Optional[Dict[str, Any]]:
+        """
+        Args:
+            interview_date: Date the interview took place ("TANGGAL WAWANCARA", the
+                            reference for ages and relative dates); today if not given.
+                            Part of the request, so it also keeps cache keys stable.
+
+        Returns:
+            chat.completions.create arguments, None if there is nothing to extract
+        """
+        # Handle empty transcript early
+        if not transcript or not transcript.strip():
+            return None
+
+        ml_logger.info(f"Extracting information (Length: {len(transcript)})")
+
+        # Bersihkan transkrip dari noise
+        cleaned_transcript = self.clean_transcript(transcript)
+        
+        # Build Schema Representation
+        # If prompt is NOT None, we might skip this if the manual prompt doesn't need schema injection
+        # But the user logic generally relies on TARGET_FIELD placeholder?
+        # Existing code checked if schema: -> schema_str. 
+        # The new template uses {target_schema}.
+        
+        target_schema_list = schema if schema else list(self.DEFAULT_STRUCTURE.keys())
+        
+        # Buat prompt
+        current_date = (interview_date or datetime.date.today()).strftime("%d/%m/%Y")
+        
+        if prompt is None:
+            final_prompt = EXTRACTION_PROMPT_TEMPLATE.format(
+                transcript=cleaned_transcript,
+                target_schema=json.dumps(target_schema_list, ensure_ascii=False),
+                current_date=current_date
+            )
+        else:
+            # Fallback to manual prompt if provided (legacy support)
+            final_prompt = prompt.replace("{transcript}", cleaned_transcript)
+            if schema and "{target_schema}" in final_prompt:
+                 final_prompt = final_prompt.replace("{target_schema}", json.dumps(target_schema_list, ensure_ascii=False))
+            # Try inject date if placeholder exists
+            if "{current_date}" in final_prompt:
+                final_prompt = final_prompt.replace("{current_date}", current_date)
+
+        # GPT-4o-mini
+        return dict(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You are an expert data extraction assistant for CAPI interviews. Always respond with valid JSON only."},
+                {"role": "user", "content": final_prompt}
+            ],
+            temperature=0.1,  # Lower temperature untuk konsistensi
+            max_tokens=800,
+            response_format={"type": "json_object"}
+        )
+
+    # Function to parse and normalize the extraction response
+    def _parse_extraction(self, result_text: str) -> Dict[str, Any]:
+        result_text = (result_text or "").strip()
+        
+        extracted = {}
+        try:
+            extracted = json.loads(result_text)
+        except json.JSONDecodeError:
+            # Handle markdown code block if not handled by response_format (gpt usually gives pure json with that flag but just in case)
+            if '```' in result_text:
+                 # try to extract json block
+                 match = re.search(r'```(?:json)?(.*?)```', result_text, re.DOTALL)
+                 if match:
+                     extracted = json.loads(match.group(1).strip())
+
+        # Post-processing: Normalisasi format
+        return self.normalize_extracted_data(extracted)
+
     # Function to extract information from transcript
-    def extract_information(self, transcript: str, prompt: str = None, schema: List[str] = None) -> Dict[str, Any]:
+    async def extract_information(self, transcript: str, prompt: str = None, schema: List[str] = None, use_cache: bool = True, interview_date: Optional[datetime.date] = None) -> Dict[str, Any]:
         """
         Ekstraksi informasi dengan prompt yang lebih baik
+        (use_cache=False always calls the API; interview_date is the interview's
+        own date, see _extraction_request)
         """
         try:
-            # Handle empty transcript early
-            if not transcript or not transcript.strip():
+            request = self._extraction_request(transcript, prompt, schema, interview_date)
+            if request is None:
                 return {}
+            return self._parse_extraction(await self._chat("extract_information", request, use_cache))
+        except Exception as e:
+            ml_logger.error(f"LLM extraction failed: {e}")
+            return {}
 
-            ml_logger.info(f"Extracting information (Length: {len(transcript)})")
-
-            # Bersihkan transkrip dari noise
-            cleaned_transcript = self.clean_transcript(transcript)
-            
-            # Build Schema Representation
-            # If prompt is NOT None, we might skip this if the manual prompt doesn't need schema injection
-            # But the user logic generally relies on TARGET_FIELD placeholder?
-            # Existing code checked if schema: -> schema_str. 
-            # The new template uses {target_schema}.
-            
-            target_schema_list = schema if schema else list(self.DEFAULT_STRUCTURE.keys())
-            
-            # Buat prompt
-            current_date = datetime.datetime.now().strftime("%d/%m/%Y")
-            
-            if prompt is None:
-                final_prompt = EXTRACTION_PROMPT_TEMPLATE.format(
-                    transcript=cleaned_transcript,
-                    target_schema=json.dumps(target_schema_list, ensure_ascii=False),
-                    current_date=current_date
-                )
-            else:
-                # Fallback to manual prompt if provided (legacy support)
-                final_prompt = prompt.replace("{transcript}", cleaned_transcript)
-                if schema and "{target_schema}" in final_prompt:
-                     final_prompt = final_prompt.replace("{target_schema}", json.dumps(target_schema_list, ensure_ascii=False))
-                # Try inject date if placeholder exists
-                if "{current_date}" in final_prompt:
-                    final_prompt = final_prompt.replace("{current_date}", current_date)
-
-            # Call OpenAI GPT-4o-mini
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert data extraction assistant for CAPI interviews. Always respond with valid JSON only."},
-                    {"role": "user", "content": final_prompt}
-                ],
-                temperature=0.1,  # Lower temperature untuk konsistensi
-                max_tokens=800,
-                response_format={"type": "json_object"}
-            )
-            
-            result_text = response.choices[0].message.content.strip()
-            
-            extracted = {}
-            try:
-                extracted = json.loads(result_text)
-            except json.JSONDecodeError:
-                # Handle markdown code block if not handled by response_format (gpt usually gives pure json with that flag but just in case)
-                if '```' in result_text:
-                     # try to extract json block
-                     match = re.search(r'```(?:json)?(.*?)```', result_text, re.DOTALL)
-                     if match:
-                         extracted = json.loads(match.group(1).strip())
-
-            # Post-processing: Normalisasi format
-            extracted = self.normalize_extracted_data(extracted)
-            
-            return extracted
-            
+    # Function to extract information from transcript (blocking, for sync endpoints)
+    def extract_information_sync(self, transcript: str, prompt: str = None, schema: List[str] = None, use_cache: bool = True, interview_date: Optional[datetime.date] = None) -> Dict[str, Any]:
+        try:
+            request = self._extraction_request(transcript, prompt, schema, interview_date)
+            if request is None:
+                return {}
+            return self._parse_extraction(self._chat_sync("extract_information", request, use_cache))
         except Exception as e:
             ml_logger.error(f"LLM extraction failed: {e}")
             return {}
@@ -306,17 +469,12 @@ Transkrip: {transcript}
         
         return normalized
 
-    # Function to correct grammar of transcript
-    def correct_grammar(self, text: str) -> str:
-        """
-        Correct grammar and punctuation of ASR text without changing meaning.
-        Useful for cleaning up raw Whisper output before extraction.
-        """
-        try:
-            if not text or len(text) < 5:
-                return text
+    # Function to build the grammar correction request
+    def _grammar_request(self, text: str) -> Optional[Dict[str, Any]]:
+        if not text or len(text) < 5:
+            return None
 
-            prompt = f"""Perbaiki tata bahasa dan tanda baca dari teks berikut.
+        prompt = f"""Perbaiki tata bahasa dan tanda baca dari teks berikut.
 JANGAN mengubah makna, nama orang, atau informasi penting.
 Hanya perbaiki typo, kapitalisasi, dan struktur kalimat yang berantakan.
 Outputkan HANYA teks yang diperbaiki tanpa basa-basi.
@@ -324,46 +482,55 @@ Outputkan HANYA teks yang diperbaiki tanpa basa-basi.
 Teks Asli: "{text}"
 Teks Perbaikan:"""
 
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a helpful grammar checking assistant for Indonesian language."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=500
-            )
+        return dict(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You are a helpful grammar checking assistant for Indonesian language."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.1,
+            max_tokens=500
+        )
 
-            corrected = response.choices[0].message.content.strip()
-            # If model returns empty or hallucinated weirdness, fallback to original
-            if not corrected:
+    # Function to correct grammar of transcript
+    async def correct_grammar(self, text: str, use_cache: bool = True) -> str:
+        """
+        Correct grammar and punctuation of ASR text without changing meaning.
+        Useful for cleaning up raw Whisper output before extraction.
+        (use_cache=False always calls the API)
+        """
+        try:
+            request = self._grammar_request(text)
+            if request is None:
                 return text
-                
-            return corrected
-
+            corrected = (await self._chat("correct_grammar", request, use_cache) or "").strip()
+            # If model returns empty or hallucinated weirdness, fallback to original
+            return corrected or text
         except Exception as e:
             ml_logger.error(f"Error correcting grammar: {e}")
             return text
 
-    # Function to correct diarization
-    def correct_diarization(self, segments: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """
-        Correct speaker diarization labels using LLM reasoning.
-        
-        Args:
-            segments: List of dicts with keys 'speaker' and 'text'
-            
-        Returns:
-            Dict with corrected segments
-        """
+    # Function to correct grammar of transcript (blocking)
+    def correct_grammar_sync(self, text: str, use_cache: bool = True) -> str:
         try:
-            if not segments:
-                return {"segments": []}
-                
-            # Format input for LLM
-            input_text = json.dumps(segments, indent=2)
+            request = self._grammar_request(text)
+            if request is None:
+                return text
+            corrected = (self._chat_sync("correct_grammar", request, use_cache) or "").strip()
+            return corrected or text
+        except Exception as e:
+            ml_logger.error(f"Error correcting grammar: {e}")
+            return text
+
+    # Function to build the diarization correction request
+    def _diarization_request(self, segments: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not segments:
+            return None
             
-            prompt = f"""
+        # Format input for LLM
+        input_text = json.dumps(segments, indent=2)
+        
+        prompt = f"""
 Anda adalah sistem koreksi diarization untuk SmartCAPI.
 Anda menerima transkripsi yang sudah memiliki label speaker, tetapi label tersebut dapat salah atau tidak berubah ketika penutur berganti.
 
@@ -404,50 +571,66 @@ Lakukan penalaran internal secara diam-diam, berikan hanya hasil JSON.
 Berikut input transkripsi:
 {input_text}
 """
-            ml_logger.info(f"Correcting diarization for {len(segments)} segments")
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that outputs strictly JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=2000,
-                response_format={"type": "json_object"}
-            )
-            
-            content = response.choices[0].message.content
-            
-            try:
-                result = json.loads(content)
-                return result
-            except json.JSONDecodeError:
-                ml_logger.error(f"Failed to parse diarization correction JSON: {content}")
-                # Fallback: return original structure
-                return {"segments": []}
-                
-        except Exception as e:
-            ml_logger.error(f"Error correcting diarization: {str(e)}")
+        ml_logger.info(f"Correcting diarization for {len(segments)} segments")
+        
+        return dict(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant that outputs strictly JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.1,
+            max_tokens=2000,
+            response_format={"type": "json_object"}
+        )
+
+    # Function to parse the diarization correction response
+    def _parse_diarization(self, content: str) -> Dict[str, Any]:
+        try:
+            return json.loads(content)
+        except (TypeError, json.JSONDecodeError):
+            ml_logger.error(f"Failed to parse diarization correction JSON: {content}")
+            # Fallback: return original structure
             return {"segments": []}
 
-    # Function to normalize transcription (remove fillers, fix punctuation)
-    def normalize_transcript(self, text: str) -> str:
+    # Function to correct diarization
+    async def correct_diarization(self, segments: List[Dict[str, Any]], use_cache: bool = True) -> Dict[str, Any]:
         """
-        Normalize transcription by removing fillers, correcting punctuation and capitalization,
-        without changing the meaning or factual information.
+        Correct speaker diarization labels using LLM reasoning.
         
         Args:
-            text: Raw transcript text
+            segments: List of dicts with keys 'speaker' and 'text'
+            use_cache: False always calls the API
             
         Returns:
-            Normalized transcript text
+            Dict with corrected segments
         """
         try:
-            if not text or len(text) < 10:
-                return text
-                
-            prompt = f"""
+            request = self._diarization_request(segments)
+            if request is None:
+                return {"segments": []}
+            return self._parse_diarization(await self._chat("correct_diarization", request, use_cache))
+        except Exception as e:
+            ml_logger.error(f"Error correcting diarization: {str(e)}")
+            return {"segments": []}
+
+    # Function to correct diarization (blocking)
+    def correct_diarization_sync(self, segments: List[Dict[str, Any]], use_cache: bool = True) -> Dict[str, Any]:
+        try:
+            request = self._diarization_request(segments)
+            if request is None:
+                return {"segments": []}
+            return self._parse_diarization(self._chat_sync("correct_diarization", request, use_cache))
+        except Exception as e:
+            ml_logger.error(f"Error correcting diarization: {str(e)}")
+            return {"segments": []}
+
+    # Function to build the transcript normalization request
+    def _normalization_request(self, text: str) -> Optional[Dict[str, Any]]:
+        if not text or len(text) < 10:
+            return None
+            
+        prompt = f"""
 Anda adalah modul Normalisasi Transkripsi untuk SmartCAPI.
 
 Tugas Anda adalah membersihkan transkripsi Whisper tanpa mengubah makna perkataan responden.
@@ -481,34 +664,63 @@ Lakukan seluruh penalaran internal secara diam-diam. Berikan hanya JSON final.
 Berikut transkripsi Whisper:
 "{text}"
 """
-            ml_logger.info("Normalizing transcript...")
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that outputs strictly JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=3000, # Allow for long transcripts
-                response_format={"type": "json_object"}
-            )
-            
-            content = response.choices[0].message.content
+        ml_logger.info("Normalizing transcript...")
+        
+        return dict(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant that outputs strictly JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.1,
+            max_tokens=3000, # Allow for long transcripts
+            response_format={"type": "json_object"}
+        )
+
+    # Function to parse the normalization response
+    def _parse_normalization(self, content: str, text: str) -> str:
+        try:
+            result = json.loads(content)
+            normalized = result.get("normalized_text", text)
+            changes = result.get("changes_made", [])
             
-            try:
-                result = json.loads(content)
-                normalized = result.get("normalized_text", text)
-                changes = result.get("changes_made", [])
+            if changes:
+                ml_logger.info(f"Normalization changes ({len(changes)}): {changes[:3]}...")
                 
-                if changes:
-                    ml_logger.info(f"Normalization changes ({len(changes)}): {changes[:3]}...")
-                    
-                return normalized
-            except json.JSONDecodeError:
-                ml_logger.error(f"Failed to parse normalization JSON: {content[:100]}...")
+            return normalized
+        except (TypeError, json.JSONDecodeError):
+            ml_logger.error(f"Failed to parse normalization JSON: {str(content)[:100]}...")
+            return text
+
+    # Function to normalize transcription (remove fillers, fix punctuation)
+    async def normalize_transcript(self, text: str, use_cache: bool = True) -> str:
+        """
+        Normalize transcription by removing fillers, correcting punctuation and capitalization,
+        without changing the meaning or factual information.
+        
+        Args:
+            text: Raw transcript text
+            use_cache: False always calls the API
+            
+        Returns:
+            Normalized transcript text
+        """
+        try:
+            request = self._normalization_request(text)
+            if request is None:
                 return text
-                
+            return self._parse_normalization(await self._chat("normalize_transcript", request, use_cache), text)
+        except Exception as e:
+            ml_logger.error(f"Error normalizing transcript: {str(e)}")
+            return text
+
+    # Function to normalize transcription (blocking)
+    def normalize_transcript_sync(self, text: str, use_cache: bool = True) -> str:
+        try:
+            request = self._normalization_request(text)
+            if request is None:
+                return text
+            return self._parse_normalization(self._chat_sync("normalize_transcript", request, use_cache), text)
         except Exception as e:
             ml_logger.error(f"Error normalizing transcript: {str(e)}")
             return text
@@ -0,0 +1,90 @@
+import re
+from typing import List, Tuple
+
+# (start, end, word) on the interview timeline, in seconds
+Word = Tuple[float, float, str]
+
+def normalize_word(word: str) -> str:
+    """Lowercase and strip punctuation so 'Budi,' and 'budi' agree"""
+    return re.sub(r"[^\w]", "", word.lower())
+
+class LocalAgreement:
+    """
+    LocalAgreement-2 policy for streaming Whisper.
+
+    The same (growing) audio window is transcribed repeatedly. A word is
+    committed only once two consecutive hypotheses agree on it, so the
+    committed prefix never changes afterwards. Everything after the agreed
+    prefix is the tentative tail, shown to the user as a partial.
+    """
+
+    # Function to initialize LocalAgreement
+    def __init__(self):
+        self.committed: List[Word] = []   # committed words still inside the audio window
+        self.previous: List[Word] = []    # unconfirmed tail of the previous hypothesis
+        self.last_committed_time = 0.0
+
+    # Function to add a new hypothesis and commit the agreed prefix
+    def insert(self, words: List[dict], offset: float) -> List[Word]:
+        """
+        Args:
+            words: Whisper word timings relative to the window start ({"start", "end", "word"})
+            offset: Timeline position of the window start
+
+        Returns:
+            Newly committed words (possibly empty)
+        """
+        new = [
+            (w["start"] + offset, w["end"] + offset, w["word"].strip())
+            for w in words
+            if w["word"].strip()
+        ]
+        # Ignore words the window still contains but that were already committed
+        new = [w for w in new if w[0] > self.last_committed_time - 0.1]
+        new = self._drop_repeated_prefix(new)
+
+        commit = []
+        while new and self.previous and normalize_word(new[0][2]) == normalize_word(self.previous[0][2]):
+            word = new.pop(0)
+            self.previous.pop(0)
+            commit.append(word)
+            self.last_committed_time = word[1]
+
+        self.previous = new
+        self.committed.extend(commit)
+        return commit
+
+    # Function to commit everything (end of utterance)
+    def flush(self) -> List[Word]:
+        commit = self.previous
+        if commit:
+            self.last_committed_time = commit[-1][1]
+        self.committed.extend(commit)
+        self.previous = []
+        return commit
+
+    # Function to get the uncommitted words of the latest hypothesis
+    def tentative(self) -> List[Word]:
+        return list(self.previous)
+
+    # Function to forget committed words whose audio has been trimmed
+    def trim_committed(self, before: float):
+        self.committed = [w for w in self.committed if w[1] > before]
+
+    # Function to drop an n-gram the new hypothesis repeats from the committed tail
+    def _drop_repeated_prefix(self, new: List[Word]) -> List[Word]:
+        """
+        Whisper often re-emits the last committed word(s) at the start of the
+        window; if the first 1..5 new words equal the committed tail, drop them.
+        """
+        if not new or not self.committed or abs(new[0][0] - self.last_committed_time) >= 1.0:
+            return new
+        for n in range(min(len(self.committed), len(new), 5), 0, -1):
+            tail = [normalize_word(w[2]) for w in self.committed[-n:]]
+            head = [normalize_word(w[2]) for w in new[:n]]
+            if tail == head:
+                return new[n:]
+        return new
+
+def join_words(words: List[Word]) -> str:
+    return " ".join(w[2] for w in words)
@@ -0,0 +1,192 @@
+"""
+Versioned speaker model registry backed by the MLModel table.
+
+Every retrain / enrollment writes a new artifact file
+(<MODEL_REGISTRY_DIR>/<name>-v<version>.npz), inserts an MLModel row for
+it and makes it the only active row of that name. The activation is then
+mirrored to Redis:
+
+    model_registry:active:<name>        JSON {id, name, version, file_path}
+    channel:speaker_model_updates       same JSON, published on activation
+
+so workers can swap the model in without a database round trip; the table
+stays the source of truth (and the history) when Redis has nothing.
+
+Publishing a name is serialized across processes by a Redis lock
+(model_registry:lock:<name>) held from choosing the version number to the
+commit, so two publishers never write the same artifact or version.
+"""
+
+import json
+import os
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.logger import ml_logger
+from app.core.redis_client import redis_client, RedisChannel
+from app.db.database import SessionLocal
+from app.db.models import MLModel, ModelType
+
+# Registered model names
+FOREST = "speaker_rf"           # ForestArrays export of the Random Forest
+PROFILES = "speaker_profiles"   # SpeakerProfiles enrollment statistics
+
+
+class ModelRegistry:
+    """Publish and look up versioned speaker model artifacts"""
+
+    # Function to initialize ModelRegistry
+    def __init__(self, root: str = None, keep: int = None):
+        self.root = root or settings.MODEL_REGISTRY_DIR
+        self.keep = keep or settings.MODEL_REGISTRY_KEEP
+
+    @staticmethod
+    def active_key(name: str) -> str:
+        return f"model_registry:active:{name}"
+
+    @staticmethod
+    def lock_key(name: str) -> str:
+        return f"model_registry:lock:{name}"
+
+    # Function to get the artifact path of a version
+    def artifact_path(self, name: str, version: str) -> str:
+        return os.path.join(self.root, f"{name}-v{version}.npz")
+
+    # Function to write, register and activate a new version
+    def publish(
+        self,
+        name: str,
+        write: Callable[[str], bool],
+        metrics: Optional[Dict[str, Any]] = None,
+        parameters: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Args:
+            name: Model name (FOREST or PROFILES)
+            write: Function writing the artifact to the given path, returns success
+            metrics: Training metrics stored with the version (JSON)
+            parameters: Model parameters stored with the version (JSON)
+
+        Returns:
+            {id, name, version, file_path} of the activated version, or None on failure
+        """
+        lock = redis_client.lock(
+            self.lock_key(name),
+            timeout=settings.MODEL_REGISTRY_LOCK_TIMEOUT,
+            blocking_timeout=settings.MODEL_REGISTRY_LOCK_TIMEOUT
+        )
+        try:
+            if not lock.acquire():
+                ml_logger.error(f"Model registry: timed out waiting to publish {name}")
+                return None
+        except Exception as e:
+            ml_logger.error(f"Model registry: could not lock {name} for publishing: {str(e)}")
+            return None
+        try:
+            return self._publish_locked(name, write, metrics, parameters)
+        finally:
+            try:
+                lock.release()
+            except Exception as e:
+                # Expired (publish took longer than the timeout) or Redis went away
+                ml_logger.warning(f"Model registry: publish lock for {name} lost: {e}")
+
+    # Function to write, register and activate a new version (publish lock held)
+    def _publish_locked(
+        self,
+        name: str,
+        write: Callable[[str], bool],
+        metrics: Optional[Dict[str, Any]],
+        parameters: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        db = SessionLocal()
+        path, committed = None, False
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            last = db.query(MLModel).filter(MLModel.name == name).order_by(MLModel.id.desc()).first()
+            version = str(int(last.version) + 1) if last and last.version.isdigit() else "1"
+            path = self.artifact_path(name, version)
+            if not write(path):
+                return None
+
+            db.query(MLModel).filter(MLModel.name == name, MLModel.is_active == True).update({"is_active": False})
+            row = MLModel(
+                name=name,
+                version=version,
+                model_type=ModelType.RF,
+                file_path=path,
+                metrics=json.dumps(metrics or {}),
+                parameters=json.dumps(parameters or {}),
+                is_active=True
+            )
+            db.add(row)
+            db.commit()
+            committed = True
+            entry = {"id": row.id, "name": name, "version": version, "file_path": path}
+            ml_logger.info(f"Model registry: activated {name} v{version}")
+
+            self._announce(entry)
+            self._prune(db, name)
+            return entry
+        except Exception as e:
+            db.rollback()
+            ml_logger.error(f"Model registry: failed to publish {name}: {str(e)}")
+            # The version was not registered: drop its artifact so a retry starts clean
+            if path and not committed and os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            return None
+        finally:
+            db.close()
+
+    # Function to mirror an activation to Redis and notify workers
+    def _announce(self, entry: Dict[str, Any]):
+        try:
+            message = json.dumps(entry)
+            pipe = redis_client.pipeline()
+            pipe.set(self.active_key(entry["name"]), message)
+            pipe.publish(RedisChannel.SPEAKER_MODEL_UPDATES, message)
+            pipe.execute()
+        except Exception as e:
+            ml_logger.warning(f"Model registry: could not announce {entry['name']} v{entry['version']}: {e}")
+
+    # Function to delete artifacts of old versions
+    def _prune(self, db, name: str):
+        """Keep the newest `keep` artifacts (rows stay as history); files still mapped elsewhere may survive"""
+        old = db.query(MLModel).filter(MLModel.name == name).order_by(MLModel.id.desc()).offset(self.keep).all()
+        for row in old:
+            try:
+                if os.path.exists(row.file_path):
+                    os.remove(row.file_path)
+            except OSError:
+                pass
+
+    # Function to get the active version of a model
+    def active(self, name: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Returns:
+            {id, name, version, file_path} or None if nothing is registered
+        """
+        if use_cache:
+            try:
+                cached = redis_client.get(self.active_key(name))
+                if cached:
+                    return json.loads(cached)
+            except Exception:
+                pass
+        db = SessionLocal()
+        try:
+            row = db.query(MLModel).filter(MLModel.name == name, MLModel.is_active == True).order_by(MLModel.id.desc()).first()
+            if row is None:
+                return None
+            return {"id": row.id, "name": name, "version": row.version, "file_path": row.file_path}
+        except Exception as e:
+            ml_logger.warning(f"Model registry: could not read active {name}: {str(e)}")
+            return None
+        finally:
+            db.close()
+
+
+model_registry = ModelRegistry()
@@ -5,10 +5,7 @@ Orchestrates transcription and extraction for real-time interview processing
 """
 
 import os
-import tempfile
-import asyncio
 import numpy as np
-import soundfile as sf
 from typing import List, Dict, Optional
 from sqlalchemy.orm import Session
 
@@ -73,133 +70,125 @@ class RealtimeExtractionService:
             if len(audio_data) == 0:
                 raise ValueError("No audio data to process")
             
-            # Step 2: Save to temporary file
+            # Step 2: Audio is sent to Whisper straight from memory
             duration = len(audio_data) / sample_rate
             api_logger.info(f"Processing audio: {duration:.2f}s")
             
-            temp_audio_path = self._save_temp_audio(audio_data, sample_rate)
+            # Step 3: Transcribe with Whisper
+            if progress_callback:
+                await progress_callback({
+                    "type": "transcription_started",
+                    "progress": 30
+                })
             
-            try:
-                # Step 3: Transcribe with Whisper
-                if progress_callback:
-                    await progress_callback({
-                        "type": "transcription_started",
-                        "progress": 30
-                    })
-                
-                api_logger.info(f"Transcribing audio for question {question.id} with context prompt.")
-                
-                # Context Injection: Tell Whisper what the question was!
-                # This drastically improves accuracy for short answers like "Dua" vs "Tua"
-                context_prompt = f"Pertanyaan: {question.question_text}. Jawaban responden adalah:"
-                
-                transcription_result = await self.whisper.transcribe(
-                    audio_path=temp_audio_path,
-                    initial_prompt=context_prompt
-                )
-                transcript = transcription_result.get("text", "").strip()
-                
-                if not transcript:
-                    # Instead of raising an error, just return a "no speech" result
-                    # This prevents the frontend from showing an error popup for silence/noise
-                    api_logger.info("Empty transcription result (likely silence or noise)")
-                    return {
-                        "success": False,
-                        "error": "No speech detected",
-                        "is_silence": True,  # Flag to indicate this isn't a system error
-                        "question_id": question.id
-                    }
-                
-                api_logger.info(f"Transcription: {transcript[:100]}...")
-                
-                if progress_callback:
-                    await progress_callback({
-                        "type": "transcription_completed",
-                        "transcript": transcript,
-                        "progress": 60
-                    })
-                
-                # Step 3b: Grammar Correction (Optional but recommended)
-                if progress_callback:
-                    await progress_callback({
-                        "type": "grammar_correction_started",
-                        "progress": 65
-                    })
-                
-                # Run grammar correction in executor
-                loop = asyncio.get_event_loop()
-                transcript = await loop.run_in_executor(None, lambda: self.llm.correct_grammar(transcript))
-                
-                api_logger.info(f"Corrected Transcript: {transcript[:100]}...")
-
-                # Step 4: Extract answer with LLM
-                if progress_callback:
-                    await progress_callback({
-                        "type": "extraction_started",
-                        "progress": 70
-                    })
-                
-                api_logger.info(f"Extracting answer for question {question.id}")
-                extraction_result = await self._extract_answer_with_llm(
-                    transcript=transcript,
-                    question=question
-                )
-                
-                extracted_answer = extraction_result.get("answer")
-                confidence = extraction_result.get("confidence", 0.0)
-                
-                # SANITIZATION: If LLM rejected the answer (null) or confidence is low,
-                # it likely means the transcript was hallucination/noise.
-                # We should NOT show the user "Menteri kakang-kakang" etc.
-                if not extracted_answer or confidence < 0.2:
-                     api_logger.warning("Low confidence extraction, sanitizing transcript.")
-                     # Original transcript is still useful for debugging logs above, but for DB we sanitize.
-                     transcript = "[Suara tidak jelas / Noise]"
-                     extracted_answer = "" # Default to empty string
-                     confidence = 0.0
-                else:
-                    api_logger.info(f"Extracted answer: {extracted_answer[:100]}...")
-                
-                # Step 5: Save to database
-                if progress_callback:
-                    await progress_callback({
-                        "type": "saving_to_database",
-                        "progress": 90
-                    })
-                
-                self._save_extracted_answer(
-                    db=db,
-                    interview_id=interview_id,
-                    question=question,
-                    transcript=transcript,
-                    answer=extracted_answer,
-                    confidence=confidence
-                )
-                
-                # Step 6: Return result
-                result = {
-                    "success": True,
-                    "question_id": question.id,
-                    "question_text": question.question_text,
-                    "variable_name": question.variable_name,  # Added for frontend mapping
-                    "transcript": transcript,
-                    "extracted_answer": extracted_answer,
-                    "confidence": confidence
+            api_logger.info(f"Transcribing audio for question {question.id} with context prompt.")
+            
+            # Context Injection: Tell Whisper what the question was!
+            # This drastically improves accuracy for short answers like "Dua" vs "Tua"
+            context_prompt = f"Pertanyaan: {question.question_text}. Jawaban responden adalah:"
+            
+            transcription_result = await self.whisper.transcribe(
+                audio_data,
+                initial_prompt=context_prompt,
+                sample_rate=sample_rate
+            )
+            transcript = transcription_result.get("text", "").strip()
+            
+            if not transcript:
+                # Instead of raising an error, just return a "no speech" result
+                # This prevents the frontend from showing an error popup for silence/noise
+                api_logger.info("Empty transcription result (likely silence or noise)")
+                return {
+                    "success": False,
+                    "error": "No speech detected",
+                    "is_silence": True,  # Flag to indicate this isn't a system error
+                    "question_id": question.id
                 }
-                
-                if progress_callback:
-                    await progress_callback({
-                        "type": "answer_extracted",
-                        "progress": 100,
-                        **result
-                    })
-                
-                return result
-                
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_audio_path):
-                    os.remove(temp_audio_path)
+            
+            api_logger.info(f"Transcription: {transcript[:100]}...")
+            
+            if progress_callback:
+                await progress_callback({
+                    "type": "transcription_completed",
+                    "transcript": transcript,
+                    "progress": 60
+                })
+            
+            # Step 3b: Grammar Correction (Optional but recommended)
+            if progress_callback:
+                await progress_callback({
+                    "type": "grammar_correction_started",
+                    "progress": 65
+                })
+            
+            # Grammar correction (async client)
+            transcript = await self.llm.correct_grammar(transcript)
+            
+            api_logger.info(f"Corrected Transcript: {transcript[:100]}...")
+
+            # Step 4: Extract answer with LLM
+            if progress_callback:
+                await progress_callback({
+                    "type": "extraction_started",
+                    "progress": 70
+                })
+            
+            api_logger.info(f"Extracting answer for question {question.id}")
+            extraction_result = await self._extract_answer_with_llm(
+                transcript=transcript,
+                question=question
+            )
+            
+            extracted_answer = extraction_result.get("answer")
+            confidence = extraction_result.get("confidence", 0.0)
+            
+            # SANITIZATION: If LLM rejected the answer (null) or confidence is low,
+            # it likely means the transcript was hallucination/noise.
+            # We should NOT show the user "Menteri kakang-kakang" etc.
+            if not extracted_answer or confidence < 0.2:
+                 api_logger.warning("Low confidence extraction, sanitizing transcript.")
+                 # Original transcript is still useful for debugging logs above, but for DB we sanitize.
+                 transcript = "[Suara tidak jelas / Noise]"
+                 extracted_answer = "" # Default to empty string
+                 confidence = 0.0
+            else:
+                api_logger.info(f"Extracted answer: {extracted_answer[:100]}...")
+            
+            # Step 5: Save to database
+            if progress_callback:
+                await progress_callback({
+                    "type": "saving_to_database",
+                    "progress": 90
+                })
+            
+            self._save_extracted_answer(
+                db=db,
+                interview_id=interview_id,
+                question=question,
+                transcript=transcript,
+                answer=extracted_answer,
+                confidence=confidence
+            )
+            
+            # Step 6: Return result
+            result = {
+                "success": True,
+                "question_id": question.id,
+                "question_text": question.question_text,
+                "variable_name": question.variable_name,  # Added for frontend mapping
+                "transcript": transcript,
+                "extracted_answer": extracted_answer,
+                "confidence": confidence
+            }
+            
+            if progress_callback:
+                await progress_callback({
+                    "type": "answer_extracted",
+                    "progress": 100,
+                    **result
+                })
+            
+            return result
                     
         except Exception as e:
             api_logger.error(f"Error processing question audio: {str(e)}")
@@ -250,37 +239,6 @@ class RealtimeExtractionService:
             ml_logger.error(f"Error concatenating audio chunks: {str(e)}")
             return np.array([])
     
-    # Function to save temporary audio file
-    def _save_temp_audio(self, audio_data: np.ndarray, sample_rate: int) -> str:
-        """
-        Save audio to temporary file
-        
-        Args:
-            audio_data: Audio numpy array
-            sample_rate: Sample rate
-            
-        Returns:
-            Path to temporary file
-        """
-        try:
-            # Create temporary file
-            temp_file = tempfile.NamedTemporaryFile(
-                delete=False, 
-                suffix=".wav",
-                dir=tempfile.gettempdir()
-            )
-            temp_path = temp_file.name
-            temp_file.close()
-            
-            # Save audio
-            sf.write(temp_path, audio_data, sample_rate)
-            
-            return temp_path
-            
-        except Exception as e:
-            ml_logger.error(f"Error saving temporary audio: {str(e)}")
-            raise
-    
     # Function to extract answer with LLM
     async def _extract_answer_with_llm(
         self,
@@ -385,15 +343,10 @@ Format JSON:
 }}
 """
             
-            # Call LLM service (Synchronous)
-            # Use run_in_executor to avoid blocking the event loop for too long
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None, 
-                lambda: self.llm.extract_information(
-                    transcript=transcript,
-                    prompt=prompt
-                )
+            # Call LLM service (async client, does not block the event loop)
+            result = await self.llm.extract_information(
+                transcript=transcript,
+                prompt=prompt
             )
             
             # Parse result
@@ -1,88 +1,425 @@
+import io
 import os
-from typing import Optional
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple, Union
+import numpy as np
 from openai import AsyncOpenAI
 from app.core.config import settings
 from app.core.logger import ml_logger
+from app.processing.audio.audio_utils import audio_to_wav_buffer
 
-class WhisperService:
-    # Function to initialize WhisperService
+AudioInput = Union[str, np.ndarray, bytes]
+
+DEFAULT_PROMPT = "Survei Uji Coba SmartCAPI"
+
+# Longest window the batched path decodes (one 30 s encoder input at 16 kHz)
+BATCH_MAX_SAMPLES = 30 * 16000
+
+class WhisperBackend:
+    """Base class for transcription backends. Results share one dict shape:
+    {"text", "segments", "language", "language_probability"}, plus "words"
+    ([{"start", "end", "word"}]) when word timestamps are requested"""
+    name = "base"
+
+    async def transcribe(self, audio: AudioInput, language: Optional[str], initial_prompt: Optional[str], sample_rate: int, word_timestamps: bool = False) -> dict:
+        raise NotImplementedError
+
+class OpenAIWhisperBackend(WhisperBackend):
+    """OpenAI whisper-1 API"""
+    name = "openai"
+
+    # Function to initialize OpenAIWhisperBackend
     def __init__(self):
         # Initialize Async OpenAI Client
         self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-        ml_logger.info("Layanan Whisper diaktifkan")
+
+    async def transcribe(self, audio: AudioInput, language: Optional[str], initial_prompt: Optional[str], sample_rate: int, word_timestamps: bool = False) -> dict:
+        if isinstance(audio, str):
+            ml_logger.info(f"Mentranskripsikan ucapan: {audio}")
+            if not os.path.exists(audio):
+                raise FileNotFoundError(f"Audio file not found: {audio}")
+            with open(audio, "rb") as f:
+                upload = (os.path.basename(audio), f.read())
+        elif isinstance(audio, (bytes, bytearray)) and bytes(audio[:4]) == b"RIFF":
+            upload = ("audio.wav", bytes(audio))
+        else:
+            wav = audio_to_wav_buffer(audio, sample_rate)
+            ml_logger.info(f"Mentranskripsikan ucapan (memory, {wav.getbuffer().nbytes} bytes)")
+            upload = ("audio.wav", wav)
+
+        # Call OpenAI Whisper API with verbose_json to get segments
+        options = {}
+        if word_timestamps:
+            options["timestamp_granularities"] = ["word", "segment"]
+        transcript = await self.client.audio.transcriptions.create(
+            model="whisper-1",
+            file=upload,
+            language="id", # Force ID for consistency
+            prompt=initial_prompt,
+            response_format="verbose_json",
+            **options
+        )
+
+        result = {
+            "text": transcript.text.strip(),
+            # OpenAI v1 segments are objects with attributes (text, start, end)
+            "segments": transcript.segments,
+            "language": transcript.language,
+            "language_probability": 1.0 # API doesn't return prob in usually the same way, assume high confidence
+        }
+        if word_timestamps:
+            result["words"] = [
+                {"start": w.start, "end": w.end, "word": w.word}
+                for w in (getattr(transcript, "words", None) or [])
+            ]
+        return result
+
+class FasterWhisperBackend(WhisperBackend):
+    """
+    Local faster-whisper (CTranslate2) inference, CPU int8 by default.
+    The model is loaded once per process and inference runs on a dedicated
+    thread pool so the event loop (and the default executor) stay free.
+    """
+    name = "local"
+
+    # Function to initialize FasterWhisperBackend
+    def __init__(self):
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.WHISPER_LOCAL_WORKERS,
+            thread_name_prefix="whisper-local"
+        )
+        # Cross-interview micro-batching (disabled when max size is 1)
+        self.batcher = None
+        if settings.WHISPER_BATCH_MAX_SIZE > 1:
+            self.batcher = WhisperBatcher(
+                self,
+                settings.WHISPER_BATCH_MAX_SIZE,
+                settings.WHISPER_BATCH_MAX_WAIT_MS,
+                settings.WHISPER_BATCH_BUCKET_SECONDS
+            )
+
+    # Function to load the model (once per process)
+    def _get_model(self):
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    from faster_whisper import WhisperModel
+                    ml_logger.info(
+                        f"Loading faster-whisper '{settings.WHISPER_MODEL_SIZE}' "
+                        f"({settings.WHISPER_DEVICE}, {settings.WHISPER_COMPUTE_TYPE})"
+                    )
+                    self._model = WhisperModel(
+                        settings.WHISPER_MODEL_SIZE,
+                        device=settings.WHISPER_DEVICE,
+                        compute_type=settings.WHISPER_COMPUTE_TYPE,
+                        cpu_threads=settings.WHISPER_CPU_THREADS,
+                        download_root=os.path.dirname(settings.WHISPER_MODEL_PATH)
+                    )
+        return self._model
+
+    # Function to convert any supported input to what faster-whisper accepts
+    def _prepare(self, audio: AudioInput):
+        if isinstance(audio, str):
+            return audio
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            if bytes(audio[:4]) == b"RIFF":
+                return io.BytesIO(bytes(audio))
+            audio = np.frombuffer(audio, dtype=np.int16)
+        if audio.dtype == np.int16:
+            return audio.astype(np.float32) / 32768.0
+        return np.ascontiguousarray(audio, dtype=np.float32)
+
+    # Function to run inference (blocking, on the dedicated pool)
+    def _transcribe_sync(self, audio, language: Optional[str], initial_prompt: Optional[str], word_timestamps: bool = False) -> dict:
+        model = self._get_model()
+        segments, info = model.transcribe(
+            audio,
+            language=language or "id",
+            initial_prompt=initial_prompt,
+            beam_size=settings.WHISPER_BEAM_SIZE,
+            no_speech_threshold=settings.WHISPER_NO_SPEECH_THRESHOLD,
+            log_prob_threshold=settings.WHISPER_LOG_PROB_THRESHOLD,
+            word_timestamps=word_timestamps,
+            vad_filter=False
+        )
+        # Consume the generator here, inside the worker thread
+        segment_dicts, words = [], []
+        for s in segments:
+            segment_dicts.append({"id": s.id, "start": s.start, "end": s.end, "text": s.text})
+            words.extend({"start": w.start, "end": w.end, "word": w.word} for w in (s.words or []))
+        result = {
+            "text": "".join(s["text"] for s in segment_dicts).strip(),
+            "segments": segment_dicts,
+            "language": info.language,
+            "language_probability": info.language_probability
+        }
+        if word_timestamps:
+            result["words"] = words
+        return result
+
+    # Function to decode several windows with one batched generate call (blocking)
+    def _transcribe_batch_sync(self, items: List[Tuple[np.ndarray, Optional[str]]], language: str = "id") -> List[dict]:
+        """
+        Batched decode with timestamps. All windows (at most 30 s, see
+        BATCH_MAX_SAMPLES) are padded to the encoder input, encoded together,
+        and decoded with one CTranslate2 generate call. The language token is
+        shared by the batch, so the batcher only groups windows of the same
+        language. There is no temperature fallback; windows that look like
+        silence (no_speech_prob and avg log-prob thresholds, as in
+        faster-whisper) come back empty.
+        """
+        from faster_whisper.audio import pad_or_trim
+        from faster_whisper.tokenizer import Tokenizer
+        from faster_whisper.transcribe import get_ctranslate2_storage
+
+        model = self._get_model()
+        tokenizer = Tokenizer(model.hf_tokenizer, model.model.is_multilingual, task="transcribe", language=language)
+        n_frames = model.feature_extractor.nb_max_frames
+
+        features = np.stack([
+            pad_or_trim(model.feature_extractor(audio)[:, :n_frames], n_frames)
+            for audio, _ in items
+        ]).astype(np.float32)
+        prompts = [
+            model.get_prompt(tokenizer, tokenizer.encode(" " + prompt.strip()) if prompt else [])
+            for _, prompt in items
+        ]
+
+        encoder_output = model.model.encode(get_ctranslate2_storage(features))
+        results = model.model.generate(
+            encoder_output,
+            prompts,
+            beam_size=settings.WHISPER_BEAM_SIZE,
+            max_length=model.max_length,
+            suppress_blank=True,
+            suppress_tokens=[-1],
+            return_scores=True,
+            return_no_speech_prob=True
+        )
+
+        outputs = []
+        for (audio, _), result in zip(items, results):
+            tokens = result.sequences_ids[0]
+            avg_logprob = result.scores[0] * len(tokens) / (len(tokens) + 1)
+            if (result.no_speech_prob > settings.WHISPER_NO_SPEECH_THRESHOLD
+                    and avg_logprob < settings.WHISPER_LOG_PROB_THRESHOLD):
+                segments = []
+            else:
+                segments = self._split_segments(tokenizer, tokens, len(audio) / 16000.0)
+            outputs.append({
+                "text": "".join(seg["text"] for seg in segments).strip(),
+                "segments": segments,
+                "language": language,
+                "language_probability": 1.0
+            })
+        return outputs
+
+    # Function to turn a timestamped token sequence into segments
+    def _split_segments(self, tokenizer, tokens: List[int], duration: float) -> List[dict]:
+        segments = []
+        start, text_tokens = None, []
+        for token in tokens:
+            if token >= tokenizer.timestamp_begin:
+                t = (token - tokenizer.timestamp_begin) * 0.02
+                if start is not None and text_tokens:
+                    segments.append({"id": len(segments), "start": start, "end": t, "text": tokenizer.decode(text_tokens)})
+                    start, text_tokens = None, []
+                else:
+                    start = t
+            elif token < tokenizer.eot:
+                text_tokens.append(token)
+        if text_tokens:
+            segments.append({"id": len(segments), "start": start or 0.0, "end": duration, "text": tokenizer.decode(text_tokens)})
+        return segments
+
+    async def transcribe(self, audio: AudioInput, language: Optional[str], initial_prompt: Optional[str], sample_rate: int, word_timestamps: bool = False) -> dict:
+        if sample_rate != 16000 and not isinstance(audio, str):
+            raise ValueError(f"Local Whisper expects 16 kHz audio, got {sample_rate} Hz")
+        prepared = self._prepare(audio)
+        # The batched path has no cross-attention alignment, so requests for
+        # word timestamps (streaming commits, buffer trims) decode sequentially
+        if self.batcher is not None and not word_timestamps:
+            if not isinstance(prepared, np.ndarray):
+                from faster_whisper.audio import decode_audio
+                prepared = decode_audio(prepared, sampling_rate=16000)
+            # Longer windows need the sequential decoder to keep their tail
+            if len(prepared) <= BATCH_MAX_SAMPLES:
+                return await self.batcher.submit(prepared, initial_prompt, language or "id")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            self._transcribe_sync, prepared, language, initial_prompt, word_timestamps
+        )
+
+class WhisperBatcher:
+    """
+    Micro-batching scheduler for local inference.
+
+    Windows submitted by different interviews within WHISPER_BATCH_MAX_WAIT_MS
+    of each other are decoded together (up to WHISPER_BATCH_MAX_SIZE). Requests
+    are bucketed by length so short utterances are not held back by long
+    ones (and by language, which a batch shares), and each result is
+    delivered to the caller's future.
+    """
+
+    # Function to initialize WhisperBatcher
+    def __init__(self, backend: "FasterWhisperBackend", max_size: int, max_wait_ms: float, bucket_seconds: float):
+        self.backend = backend
+        self.max_size = max_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.bucket_seconds = bucket_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.batches = 0
+        self.items = 0
+        self.size_histogram = {}
+        self.total_wait = 0.0
+
+    # Function to queue one window and wait for its result
+    async def submit(self, audio: np.ndarray, prompt: Optional[str], language: str = "id") -> dict:
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((audio, prompt, language, future, time.perf_counter()))
+        return await future
+
+    # Function to report achieved batch sizes
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "avg_wait_ms": round(1000.0 * self.total_wait / self.items, 1) if self.items else 0.0,
+            "size_histogram": dict(sorted(self.size_histogram.items())),
+        }
+
+    # Function to collect requests into batches
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(pending) < self.max_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Bucket by language and length (in bucket_seconds steps)
+            buckets = {}
+            for item in pending:
+                key = (item[2], int(len(item[0]) / 16000.0 // self.bucket_seconds))
+                buckets.setdefault(key, []).append(item)
+
+            for (language, _), bucket in buckets.items():
+                await self._decode(bucket, language)
+
+    # Function to run one batch and scatter the results
+    async def _decode(self, bucket, language: str):
+        now = time.perf_counter()
+        self.batches += 1
+        self.items += len(bucket)
+        self.size_histogram[len(bucket)] = self.size_histogram.get(len(bucket), 0) + 1
+        self.total_wait += sum(now - queued_at for _, _, _, _, queued_at in bucket)
+        if self.batches % 100 == 0:
+            ml_logger.info(f"Whisper batching stats: {self.stats()}")
+
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.backend._executor,
+                self.backend._transcribe_batch_sync,
+                [(audio, prompt) for audio, prompt, _, _, _ in bucket],
+                language
+            )
+            for (_, _, _, future, _), result in zip(bucket, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, _, _, future, _ in bucket:
+                if not future.done():
+                    future.set_exception(e)
+
+# Function to build the configured backend
+def create_backend(name: str) -> WhisperBackend:
+    if name == FasterWhisperBackend.name:
+        return FasterWhisperBackend()
+    if name == OpenAIWhisperBackend.name:
+        return OpenAIWhisperBackend()
+    raise ValueError(f"Unknown WHISPER_BACKEND '{name}' (expected 'openai' or 'local')")
+
+class WhisperService:
+    # Function to initialize WhisperService
+    def __init__(self, backend: Optional[WhisperBackend] = None):
+        self.backend = backend or create_backend(settings.WHISPER_BACKEND)
+        ml_logger.info(f"Layanan Whisper diaktifkan (backend: {self.backend.name})")
+
+    # Function to report micro-batching statistics (local backend only)
+    def batch_stats(self) -> Optional[dict]:
+        batcher = getattr(self.backend, "batcher", None)
+        return batcher.stats() if batcher else None
 
     # Function to transcribe audio
-    async def transcribe(self, audio_path: str, language: Optional[str] = None, initial_prompt: Optional[str] = None) -> dict:
+    async def transcribe(
+        self,
+        audio: AudioInput,
+        language: Optional[str] = None,
+        initial_prompt: Optional[str] = None,
+        sample_rate: Optional[int] = None,
+        word_timestamps: bool = False
+    ) -> dict:
         """
-        Transcribe audio file using OpenAI Whisper
-        
+        Transcribe audio with the configured backend (settings.WHISPER_BACKEND)
+
         Args:
-            audio_path: Path to the audio file
+            audio: Path to an audio file, a numpy array of samples (float32 in [-1, 1]
+                   or int16), raw int16 PCM bytes, or the bytes of a WAV file.
+                   In-memory audio never touches the disk: the OpenAI backend
+                   encodes it to WAV in a BytesIO, the local backend uses the array directly.
             language: Optional language code (e.g., 'id' for Indonesian)
             initial_prompt: Optional context prompt to guide Whisper
-            
+            sample_rate: Sample rate of in-memory audio (default: settings.SAMPLE_RATE)
+            word_timestamps: Also return per-word timings under "words"
+
         Returns:
             Dictionary containing transcription results (text, segments, etc.)
         """
         try:
-            ml_logger.info(f"Mentranskripsikan ucapan: {audio_path}")
-            
             # Use provided prompt or fallback
-            prompt_to_use = initial_prompt or "Survei Uji Coba SmartCAPI"
-            
-            if not os.path.exists(audio_path):
-                raise FileNotFoundError(f"Audio file not found: {audio_path}")
-
-            with open(audio_path, "rb") as audio_file:
-                # Call OpenAI Whisper API with verbose_json to get segments
-                transcript = await self.client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    language="id", # Force ID for consistency
-                    prompt=prompt_to_use,
-                    response_format="verbose_json"
-                )
-
-            # Extract data
-            text = transcript.text.strip()
-            # OpenAI v1 segments are objects with attributes (text, start, end)
-            segments = transcript.segments 
-            detected_language = transcript.language
-            
-            result = {
-                "text": text,
-                "segments": segments,
-                "language": detected_language,
-                "language_probability": 1.0 # API doesn't return prob in usually the same way, assume high confidence
-            }
-            
-            # LANGUAGE FILTER (Optional logic from previous version)
-            # OpenAI API 'language' parameter forces the language, so detected_language should be 'id'.
-            # But if it auto-detects something else despite hint (rare), we can check.
-            if detected_language and detected_language not in ["en", "id", "indonesian"]:
-                 # 'indonesian' acts as 'id' sometimes in full names
-                 pass
+            prompt_to_use = initial_prompt or DEFAULT_PROMPT
+
+            result = await self.backend.transcribe(
+                audio,
+                language,
+                prompt_to_use,
+                sample_rate or settings.SAMPLE_RATE,
+                word_timestamps
+            )
 
             # HALLUCINATION FILTER removed per user request
             # We pass the raw text and segments directly.
-            
-            valid_segments = segments
-            filtered_text = text
-            
-            result["text"] = filtered_text
-            result["segments"] = valid_segments
-            
+            filtered_text = result["text"]
+
             if not filtered_text:
                 ml_logger.info("Transcription result empty after filtering.")
             else:
                 safe_text = filtered_text[:100].encode('ascii', 'ignore').decode('ascii')
-                ml_logger.info(f"Transcription completed (OpenAI): {safe_text}...")
-                
+                ml_logger.info(f"Transcription completed ({self.backend.name}): {safe_text}...")
+
             return result
 
         except Exception as e:
-            ml_logger.error(f"Error transcribing with OpenAI API: {str(e)}")
+            ml_logger.error(f"Error transcribing with {self.backend.name} backend: {str(e)}")
             return {"text": "", "language": None, "error": str(e)}
 
 # Create a singleton instance
-whisper_service = WhisperService()
\ No newline at end of file
+whisper_service = WhisperService()
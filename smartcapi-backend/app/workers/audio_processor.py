@@ -1,176 +1,338 @@
 import asyncio
 import json
-import base64
 import time
 import numpy as np
 import traceback
+from typing import Dict, List, Optional, Tuple
 
 from app.core.config import settings
 from app.core.logger import ml_logger
-from app.core.redis_client import async_redis_client, RedisQueue, RedisChannel, redis_client as sync_redis_client
-from app.services.silence_detector import silence_detector
+from app.core.redis_client import async_redis_client, RedisQueue, RedisChannel, RedisStream, redis_client as sync_redis_client
+from app.core.audio_stream import AudioStreamConsumer, entry_order
+from app.core.shard_map import ShardCoordinator
+from app.core.event_coalescer import EventCoalescer
+from app.core.interview_context import InterviewContext, InterviewContextCache
+from app.processing.audio.vad import VADRegistry
+from app.processing.audio.frame_codec import AudioFrame, decode_audio_frame, pcm_to_float32
 from app.services.diarization_service import speaker_service
 from app.db.database import SessionLocal
 from app.db.models import Interview
 
-async def process_audio_chunk(data: dict):
+RECLAIM_INTERVAL = 10.0 # seconds between pending-entry reclaim passes
+
+# Per-interview adaptive VAD (noise floor tracked per interview). This and the
+# other per-interview state below assume one processor per interview, which
+# the shard ring guarantees (see main)
+vad_registry = VADRegistry()
+
+# Stream position (entry_order) of the last frame fed through each interview's
+# VAD and feature window, and the results of fed frames whose batch was not
+# applied, reused when the batch is replayed (see process_audio_batch)
+fed_until: Dict[int, Tuple[int, int]] = {}
+unapplied_results: Dict[Tuple[int, Tuple[int, int]], Tuple[bool, Tuple[str, float], Optional[str]]] = {}
+
+# Function to get the Redis key of a speaker model version's serving metrics
+def model_metrics_key(model_version: str) -> str:
+    return f"metrics:speaker_model:{model_version}"
+
+# Per-interview context read by every batch (see interview_context)
+interview_contexts = InterviewContextCache(settings.INTERVIEW_CONTEXT_CACHE_SIZE, settings.INTERVIEW_CONTEXT_TTL)
+
+# speaker_detected events, coalesced per interview (see event_coalescer)
+speaker_events = EventCoalescer(
+    settings.SPEAKER_EVENT_INTERVAL,
+    on_change_only=settings.SPEAKER_EVENT_ON_CHANGE_ONLY,
+    ttl=settings.SPEAKER_STREAM_TTL
+)
+
+async def process_audio_batch(frames: List[AudioFrame], orders: Optional[List[Tuple[int, int]]] = None):
     """
-    Process a single audio chunk from the queue.
-    1. VAD check
-    2. Speaker Identification (RF)
-    3. Buffer Respondent Audio
-    4. Trigger Extraction on Silence
+    Process a batch of audio chunks read from the streams.
+    VAD runs per chunk (in order, per interview); the speaker of every
+    non-silent chunk is then predicted with one batched model call and the
+    results are handed to process_chunk_results in arrival order.
+    
+    VAD and the feature window are stateful, so a chunk must go through them
+    only once. A batch that fails is replayed by the main loop: chunks it
+    already fed reuse the results they got then, and chunks that were
+    applied (only their ack was lost) are skipped.
+    
+    Args:
+        frames: Decoded chunks, in stream order
+        orders: Stream position of each frame (entry_order); without them
+            replays are not detected
     """
+    prepared = []
+    for i, frame in enumerate(frames):
+        if len(frame.pcm) == 0 or not frame.interview_id:
+            continue
+        order = orders[i] if orders else None
+        # Decode audio (int16 view -> float32, single allocation)
+        audio_array = pcm_to_float32(frame.pcm)
+        if order is not None and order <= fed_until.get(frame.interview_id, (-1, -1)):
+            previous = unapplied_results.pop((frame.interview_id, order), None)
+            if previous is not None:
+                prepared.append((frame, audio_array, order, *previous))
+            continue
+        # 1. Silence Detection (10 ms frames, adaptive noise floor, hangover)
+        is_silence = not vad_registry.process(frame.interview_id, audio_array).is_speech
+        if order is not None:
+            fed_until[frame.interview_id] = order
+        prepared.append((frame, audio_array, order, is_silence, ("silence", 1.0) if is_silence else None, None))
+
     try:
-        audio_b64 = data.get("audio_data")
-        interview_id = data.get("interview_id")
-        user_id = data.get("user_id") # Dynamic Logged-in User
-        timestamp = data.get("timestamp")
-        
-        if not audio_b64 or not interview_id:
-            return
+        # 2. Identify Speakers (rolling-window features per interview + single predict_proba)
+        speech = [i for i, chunk in enumerate(prepared) if chunk[4] is None]
+        model_version = next((chunk[5] for chunk in prepared if chunk[5]), None)
+        latency_ms = 0.0
+        if speech:
+            started = time.perf_counter()
+            results, model_version = await speaker_service.predict_speakers_versioned(
+                [prepared[i][1] for i in speech],
+                settings.SAMPLE_RATE,
+                stream_keys=[prepared[i][0].interview_id for i in speech]
+            )
+            latency_ms = (time.perf_counter() - started) * 1000
+            for i, result in zip(speech, results):
+                prepared[i] = prepared[i][:4] + (result, model_version)
 
-        # Redis Keys
-        key_current_q = f"interview:{interview_id}:current_question"
-        key_buffer = f"interview:{interview_id}:respondent_buffer"
-        key_last_speech = f"interview:{interview_id}:last_speech_time"
-        
-        # 0. Get Current Question (Fast check)
-        # If no question active, we might skip buffering to save memory, or buffer anyway?
-        # Let's skip buffering if no question is focused, assuming interview hasn't started or is done.
-        current_q_id = await async_redis_client.get(key_current_q)
-        if not current_q_id:
-            # Maybe just log debug and return, or allow standard processing without extraction?
-            # For now, let's process standard "speaker detection" only for UI but skip buffering.
-            pass
-
-        # Decode audio
-        audio_bytes = base64.b64decode(audio_b64)
-        audio_array = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-        
-        # 1. Silence Detection
-        is_silence = silence_detector.is_silence(audio_array)
+        chunks = [
+            (frame, audio_array, is_silence, prediction)
+            for frame, audio_array, _, is_silence, prediction, _ in prepared
+        ]
+        await process_chunk_results(chunks, model_version, latency_ms)
+    except Exception:
+        # Keep what the fed chunks produced for the replay
+        for frame, _, order, is_silence, prediction, version in prepared:
+            if order is not None:
+                unapplied_results[(frame.interview_id, order)] = (is_silence, prediction, version)
+        raise
+
+    if unapplied_results:
+        # Entries the consumer gave up on are never replayed
+        applied = {}
+        for frame, _, order, _, _, _ in prepared:
+            if order is not None:
+                applied[frame.interview_id] = order
+        for key in [k for k in unapplied_results if k[0] in applied and k[1] <= applied[k[0]]]:
+            del unapplied_results[key]
+
+# Function to look up the enumerator of an interview in the database (blocking)
+def fetch_enumerator_id(interview_id: int) -> Optional[str]:
+    db = SessionLocal()
+    try:
+        interview = db.query(Interview).filter(Interview.id == interview_id).first()
+        return str(interview.enumerator_id) if interview else None
+    finally:
+        db.close()
+
+# Function to get the enumerator of an interview from the database (Redis and local cache missed)
+async def get_enumerator_id(interview_id: int) -> Optional[str]:
+    try:
+        # Only happens ONCE per interview (cached for 24h); the query runs in the thread pool
+        loop = asyncio.get_running_loop()
+        enumerator_id = await loop.run_in_executor(None, fetch_enumerator_id, interview_id)
+        if enumerator_id:
+            await async_redis_client.set(f"interview:{interview_id}:enumerator_id", enumerator_id, ex=3600*24)
+        return enumerator_id
+    except Exception as ex:
+        ml_logger.error(f"Error fetching enumerator ID: {ex}")
+    return None
+
+# Function to get the context of every interview in a batch
+async def load_interview_contexts(user_ids: Dict[int, int]) -> Dict[int, InterviewContext]:
+    """
+    Args:
+        user_ids: interview_id -> user_id from the frames (0/None if unknown)
         
-        speaker_label = "silence"
-        confidence = 1.0
+    Returns:
+        interview_id -> InterviewContext; cached contexts are used as they are,
+        the others are read from Redis in one pipeline and cached
+    """
+    contexts = {}
+    missing = []
+    for interview_id in user_ids:
+        context = interview_contexts.get(interview_id)
+        if context is None:
+            missing.append(interview_id)
+        else:
+            contexts[interview_id] = context
+    if not missing:
+        return contexts
+    
+    token = interview_contexts.invalidations
+    pipe = async_redis_client.pipeline(transaction=False)
+    for interview_id in missing:
+        pipe.get(f"interview:{interview_id}:current_question")
+        pipe.get(f"interview:{interview_id}:last_speech_time")
+        pipe.llen(f"interview:{interview_id}:respondent_buffer")
+        if not user_ids[interview_id]:
+            pipe.get(f"interview:{interview_id}:enumerator_id")
+    values = iter(await pipe.execute())
+    for interview_id in missing:
+        user_id = user_ids[interview_id]
+        context = InterviewContext(
+            current_question_id=next(values),
+            last_speech=next(values),
+            buffer_len=next(values),
+            enumerator_id=str(user_id) if user_id else next(values)
+        )
+        interview_contexts.put(interview_id, context, token)
+        contexts[interview_id] = context
+    return contexts
+
+async def process_chunk_results(
+    chunks: List[Tuple[AudioFrame, np.ndarray, bool, Tuple[str, float]]],
+    model_version: Optional[str] = None,
+    latency_ms: float = 0.0
+):
+    """
+    Apply the VAD/speaker results of a batch of chunks to Redis.
+    1. Buffer Respondent Audio
+    2. Push speech segments to the merger
+    3. Clear the buffer after a long silence
+    4. Publish speaker_detected (coalesced per interview)
+    
+    Per-interview context (current question, last speech time, buffer
+    length, enumerator) comes from the local cache, read from Redis in one
+    pipeline only for interviews not cached; all writes go out in a second
+    pipeline (MULTI/EXEC, so a batch is applied entirely or not at all).
+    Chunks are applied in arrival order against that context, which is
+    updated in place (write-through).
+    
+    Raises:
+        Exception: If the writes could not be applied; the caller must not
+        ack the batch
+    
+    Args:
+        chunks: (frame, audio_array, is_silence, (speaker_label, confidence)) per chunk, in arrival order
+        model_version: Speaker model version that scored the batch
+        latency_ms: Time spent scoring the batch
+    """
+    if not chunks:
+        return
+    user_ids = {}
+    for frame, _, _, _ in chunks:
+        user_ids[frame.interview_id] = user_ids.get(frame.interview_id) or frame.user_id # Dynamic Logged-in User
+    try:
+        # 0. Context of every interview in the batch (at most one round-trip)
+        contexts = await load_interview_contexts(user_ids)
+        pending = {interview_id: [] for interview_id in contexts}
+        speech_seen = set()
         
-        if not is_silence:
-            # 2. Identify Speaker
-            speaker_label, confidence = await speaker_service.predict_speaker_from_memory(
-                audio_array, 
-                settings.SAMPLE_RATE
-            )
-            
-            # Update last speech time
-            await async_redis_client.set(key_last_speech, timestamp)
+        # 1-4. Apply the chunks in order, queueing the writes
+        pipe = async_redis_client.pipeline(transaction=True)
+        segments = []
+        for frame, audio_array, is_silence, (speaker_label, confidence) in chunks:
+            interview_id = frame.interview_id
+            context = contexts[interview_id]
+            current_q_id = context.current_question_id
             
-            # 3. Buffer Respondent Audio
-            # We ONLY want to extract Respondent answers.
-            # 3. Buffer Respondent Audio
-            # LOGIC:
-            # - IF speaker is the enumerator -> SKIP (Don't buffer)
-            # - IF speaker is NOT enumerator (Unknown, Other User, or explicitly Respondent) -> BUFFER (Process)
-            
-            should_process = True
-            
-            # 3a. Identify Current Enumerator (Dynamic or Cached)
-            if user_id:
-                # Priority: Use the user_id from the payload (The logged-in user conducting the interview)
-                cached_enum_id = str(user_id)
-            else:
-                 # Fallback: Cache miss, fetch from DB
-                 key_enum_id = f"interview:{interview_id}:enumerator_id"
-                 cached_enum_id = await async_redis_client.get(key_enum_id)
-            
-            if not cached_enum_id:
-                # Cache miss, fetch from DB
-                try:
-                    # Use sync session in async way or just quick lookup
-                    # Since we are in async function, ideally we use async DB or run in executor
-                    # But for now, SessionLocal is sync. 
-                    # Optimization: This only happens ONCE per interview per worker restart.
-                    db = SessionLocal()
-                    interview = db.query(Interview).filter(Interview.id == interview_id).first()
-                    if interview:
-                        cached_enum_id = str(interview.enumerator_id)
-                        await async_redis_client.set(key_enum_id, cached_enum_id, ex=3600*24) # 24h cache
-                    db.close()
-                except Exception as ex:
-                    ml_logger.error(f"Error fetching enumerator ID: {ex}")
-            
-            if cached_enum_id:
-                enumerator_label = f"user_{cached_enum_id}"
+            if not is_silence:
+                # Update last speech time (written once per interview below)
+                context.last_speech = frame.timestamp
+                speech_seen.add(interview_id)
                 
-                # Check for Match
+                # Buffer Respondent Audio
+                # LOGIC:
+                # - IF speaker is the enumerator -> SKIP (Don't buffer)
+                # - IF speaker is NOT enumerator (Unknown, Other User, or explicitly Respondent) -> BUFFER (Process)
                 # USER REQUEST: Process EVERYTHING. Do not filter Enumerator.
-                # if speaker_label == enumerator_label or speaker_label == "enumerator":
-                #      should_process = False
-                # else:
+                # The enumerator is the user_id from the payload (the logged-in user
+                # conducting the interview), else the cached / stored one.
+                if context.enumerator_id is None:
+                    context.enumerator_id = await get_enumerator_id(interview_id) or ""
                 should_process = True
-                # speaker_label = "respondent" # We can keep the label for UI, but process it.
-            
-            # 3b. Buffer if it is Valid Respondent Speech
-            if speaker_label != "silence" and should_process:
-                 if current_q_id:
-                     await async_redis_client.rpush(key_buffer, audio_b64)
-            
-            # PUSH SEGMENT TO MERGER
-            duration = len(audio_array) / settings.SAMPLE_RATE
-            # Estimate end time (timestamp is start)
-            # Ensure timestamp is float
-            try:
-                ts_float = float(timestamp)
-            except:
-                ts_float = time.time()
                 
-            segment_payload = {
-                "interview_id": interview_id,
-                "start_time": ts_float,
-                "end_time": ts_float + duration,
-                "is_silence": False,
-                "speaker": speaker_label,
-                "confidence": confidence
-            }
-            await async_redis_client.rpush(RedisQueue.MERGER_SEGMENTS, json.dumps(segment_payload))
+                if speaker_label != "silence" and should_process and current_q_id:
+                    pending[interview_id].append(frame.pcm.tobytes())
+                    context.buffer_len += 1
+                
+                # PUSH SEGMENT TO MERGER
+                # Ensure timestamp is float (timestamp is start)
+                try:
+                    ts_float = float(frame.timestamp)
+                except:
+                    ts_float = time.time()
+                duration = len(audio_array) / settings.SAMPLE_RATE
+                segments.append(json.dumps({
+                    "interview_id": interview_id,
+                    "start_time": ts_float,
+                    "end_time": ts_float + duration,
+                    "is_silence": False,
+                    "speaker": speaker_label,
+                    "confidence": confidence,
+                    "model_version": model_version
+                }))
+                
+                # UI Update (Speaker ID visualization), rate measured in audio time
+                if speaker_events.should_publish(interview_id, speaker_label, now=ts_float):
+                    pipe.publish(RedisChannel.interview_updates(interview_id), json.dumps({
+                        "type": "speaker_detected",
+                        "speaker": speaker_label,
+                        "confidence": confidence,
+                        "model_version": model_version
+                    }))
+            
+            elif current_q_id and context.last_speech:
+                # IS SILENCE: Check for Trigger
+                silence_duration = time.time() - float(context.last_speech)
+                if silence_duration > settings.SILENCE_MIN_DURATION and context.buffer_len > 0:
+                    # Legacy Extraction Trigger (DISABLED per User Request)
+                    # Triggers on silence, but we now use Merger + Whisper Final
+                    # Just clear buffer to avoid memory leak if we are still buffering
+                    pipe.delete(f"interview:{interview_id}:respondent_buffer")
+                    pending[interview_id].clear()
+                    context.buffer_len = 0
+                    ml_logger.info(f"Silence detected ({silence_duration:.2f}s) - Skipping legacy trigger (using Merger)")
         
-        else:
-            # IS SILECE
-            # 4. Check for Trigger
-            if current_q_id:
-                last_speech = await async_redis_client.get(key_last_speech)
-                if last_speech:
-                    silence_duration = time.time() - float(last_speech)
-                    
-                    if silence_duration > settings.SILENCE_MIN_DURATION:
-                        # Check buffer size
-                        buffer_len = await async_redis_client.llen(key_buffer)
-                        if buffer_len > 0:
-                            ml_logger.info(f"Silence detected ({silence_duration:.2f}s) -> Triggering Extraction for Q {current_q_id}")
-                            
-                            # Legacy Extraction Trigger (DISABLED per User Request)
-                            # Triggers on silence, but we now use Merger + Whisper Final
-                            
-                            # Just clear buffer to avoid memory leak if we are still buffering
-                            await async_redis_client.delete(key_buffer)
-                            
-                            # audio_list_b64 = await async_redis_client.lrange(key_buffer, 0, -1)
-                            # ... (Legacy code commented out) ...
-                            ml_logger.info(f"Silence detected ({silence_duration:.2f}s) - Skipping legacy trigger (using Merger)")
-
-        # UI Update (Speaker ID visualization)
-        if not is_silence:
-            ui_update = {
-                "type": "speaker_detected",
-                "speaker": speaker_label,
-                "confidence": confidence
-            }
-            channel = RedisChannel.interview_updates(interview_id)
-            await async_redis_client.publish(channel, json.dumps(ui_update))
+        for interview_id, buffered in pending.items():
+            if buffered:
+                pipe.rpush(f"interview:{interview_id}:respondent_buffer", *buffered)
+        for interview_id in speech_seen:
+            pipe.set(f"interview:{interview_id}:last_speech_time", contexts[interview_id].last_speech)
+        if segments:
+            pipe.rpush(RedisQueue.MERGER_SEGMENTS, *segments)
+        
+        # Count predictions and scoring latency per model version
+        if model_version:
+            key = model_metrics_key(model_version)
+            pipe.hincrby(key, "batches", 1)
+            pipe.hincrby(key, "predictions", len(segments))
+            pipe.hincrbyfloat(key, "latency_ms", latency_ms)
+            pipe.hset(key, "last_used", time.time())
+        await pipe.execute()
 
     except Exception as e:
-        ml_logger.error(f"Error processing audio chunk: {str(e)}")
-        import traceback
+        ml_logger.error(f"Error processing audio chunks: {str(e)}")
         traceback.print_exc()
+        # The local context may be ahead of Redis now
+        for interview_id in user_ids:
+            interview_contexts.invalidate(interview_id)
+        raise
+
+async def hand_off_shard(shard: int):
+    """
+    Called before this processor gives up a shard: drop the local state of
+    its interviews (VAD noise floor, speaker feature window, coalesced
+    events, cached context, replay bookkeeping). The new owner reads the
+    context from Redis and re-adapts VAD and features within a few chunks.
+    The main loop acks (or releases) every batch before rebalancing, so
+    nothing of the shard is still in flight.
+    """
+    known = set(vad_registry.keys()) | set(interview_contexts.ids()) | set(fed_until)
+    moving = [i for i in known if RedisStream.audio_shard(i) == shard]
+    for interview_id in moving:
+        vad_registry.forget(interview_id)
+        fed_until.pop(interview_id, None)
+        speaker_service.forget_stream(interview_id)
+        speaker_events.forget(interview_id)
+        interview_contexts.invalidate(interview_id)
+    if moving:
+        moving_ids = set(moving)
+        for key in [k for k in unapplied_results if k[0] in moving_ids]:
+            del unapplied_results[key]
+        ml_logger.info(f"Released {len(moving)} interviews on shard {shard}")
 
 async def publish_progress(interview_id, message):
     try:
@@ -180,6 +342,46 @@ async def publish_progress(interview_id, message):
     except:
         pass
 
+async def watch_speaker_model_updates():
+    """Swap in speaker model versions activated in the model registry (no restart needed)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        pubsub = async_redis_client.pubsub()
+        try:
+            await pubsub.subscribe(RedisChannel.SPEAKER_MODEL_UPDATES)
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    try:
+                        entry = json.loads(message["data"])
+                    except (TypeError, ValueError):
+                        entry = None
+                    await loop.run_in_executor(None, speaker_service.reload_models, entry)
+        except Exception as e:
+            ml_logger.error(f"Speaker model update subscription error: {e}")
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.close()
+
+async def watch_interview_context():
+    """Invalidate cached interview contexts when the API changes them (set_question)"""
+    while True:
+        pubsub = async_redis_client.pubsub()
+        try:
+            await pubsub.subscribe(RedisChannel.INTERVIEW_CONTEXT)
+            # Changes made while we were not subscribed are unknown
+            interview_contexts.clear()
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    try:
+                        interview_contexts.invalidate(int(json.loads(message["data"])["interview_id"]))
+                    except (TypeError, ValueError, KeyError):
+                        interview_contexts.clear()
+        except Exception as e:
+            ml_logger.error(f"Interview context subscription error: {e}")
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.close()
+
 async def main():
     ml_logger.info("Starting Audio Processor Worker...")
     
@@ -201,33 +403,80 @@ async def main():
     def get_db_session():
         return SessionLocal()
 
-    while True:
-        try:
-            # Blocking pop from queue
-            result = await async_redis_client.blpop(RedisQueue.AUDIO_PROCESSING, timeout=1)
-            
-            if result:
-                queue_name, data_json = result
-                data = json.loads(data_json)
+    model_watcher = asyncio.create_task(watch_speaker_model_updates())
+    context_watcher = asyncio.create_task(watch_interview_context())
+
+    # Shards are spread over audio processor replicas by consistent hashing, so
+    # all audio of one interview goes through a single replica (VAD, feature
+    # window, coalescer and write-through context are per process)
+    consumer = AudioStreamConsumer(RedisStream.GROUP_AUDIO_PROCESSOR, shards=[])
+    coordinator = ShardCoordinator(
+        RedisStream.GROUP_AUDIO_PROCESSOR,
+        consumer.consumer,
+        settings.AUDIO_STREAM_SHARDS,
+        on_release=hand_off_shard
+    )
+    ml_logger.info(f"Audio processor '{consumer.consumer}' joining shard ring")
+    heartbeat = asyncio.create_task(coordinator.keep_alive())
+    last_reclaim = 0.0
+    last_rebalance = 0.0
+
+    try:
+        while True:
+            entries = []
+            try:
+                # Batches are acked (or released) before rebalancing, so a shard
+                # is never given away with entries in flight
+                if time.time() - last_rebalance > settings.SHARD_REBALANCE_INTERVAL:
+                    last_rebalance = time.time()
+                    if await coordinator.rebalance():
+                        consumer.set_shards(coordinator.owned)
+                        await consumer.ensure_groups()
                 
-                # --- PROCESS AUDIO CHUNK ---
-                # We inline the logic here or keep calling process_audio_chunk, 
-                # but we need to inject the new logic. 
-                # For cleaner code, let's update process_audio_chunk itself or wrap it.
-                # Since we are replacing the file content, let's just call the updated process_audio_chunk 
-                # (which we need to define/update in the file).
+                if not consumer.streams:
+                    await asyncio.sleep(settings.SHARD_REBALANCE_INTERVAL)
+                    continue
                 
-                # ... Wait, I am replacing 'main' but I also need to update 'process_audio_chunk'.
-                # Let's do a multi_replace for both if possible, or just replace the whole file if it's cleaner.
-                # actually, let's just call process_audio_chunk and update that function in a separate call 
-                # to keep this tool call simple or do it all here? 
-                # The tool call replaces lines. I will do 2 calls.
+                # Periodically take over entries left pending by crashed consumers;
+                # they are older than anything new, so don't block on the read then
+                reclaimed = []
+                if time.time() - last_reclaim > RECLAIM_INTERVAL:
+                    last_reclaim = time.time()
+                    reclaimed = await consumer.reclaim()
+                entries = reclaimed + await consumer.read(block_ms=None if reclaimed else 1000)
+                if reclaimed:
+                    # Per-interview order is entry id order within a shard stream
+                    entries.sort(key=entry_order)
                 
-                await process_audio_chunk(data)
+                frames, orders = [], []
+                for entry in entries:
+                    stream, entry_id, raw = entry
+                    if not raw:
+                        continue
+                    try:
+                        frames.append(decode_audio_frame(raw))
+                        orders.append(entry_order(entry))
+                    except Exception as e:
+                        ml_logger.error(f"Dropping undecodable audio entry {entry_id} on {stream}: {e}")
+                        continue
+                if frames:
+                    await process_audio_batch(frames, orders)
                 
-        except Exception as e:
-            ml_logger.error(f"Worker Loop Error: {e}")
-            await asyncio.sleep(1)
+                # Ack only after processing so a crash leaves entries pending
+                await consumer.ack(entries)
+                    
+            except Exception as e:
+                ml_logger.error(f"Worker Loop Error: {e}")
+                # Not applied: keep the entries pending so they are replayed
+                try:
+                    await consumer.release(entries)
+                except Exception as release_error:
+                    ml_logger.error(f"Failed to release audio entries: {release_error}")
+                await asyncio.sleep(1)
+    finally:
+        # Graceful shutdown: give the shards up instead of waiting for the member TTL
+        heartbeat.cancel()
+        await coordinator.leave()
 
 if __name__ == "__main__":
     import sys
@@ -6,17 +6,21 @@ from celery import shared_task
 from app.core.logger import ml_logger
 from app.services.diarization_service import speaker_service
 from app.core.config import settings
+from app.processing.audio.vad import VADRegistry
 import redis
 import json
 
 # Redis connection for publishing events
 redis_client = redis.Redis.from_url(settings.CELERY_BROKER_URL)
 
+# Per-interview adaptive VAD (per worker process)
+vad_registry = VADRegistry()
+
 @shared_task(name="process_audio_chunk", ignore_result=True)
 def process_audio_chunk(audio_bytes: bytes, interview_id: int, timestamp: float, chunk_seq: int):
     """
     Process a raw audio chunk:
-    1. Validate Audio (Simple VAD check via RMS)
+    1. Validate Audio (frame-level VAD)
     2. Identify Speaker (RF Model)
     3. Publish 'segment.speaker' event
     """
@@ -26,22 +30,21 @@ def process_audio_chunk(audio_bytes: bytes, interview_id: int, timestamp: float,
         # Convert bytes to numpy float32
         audio_array = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
         
-        # 1. Simple VAD (RMS)
+        # 1. VAD (10 ms frames against this interview's noise floor)
         rms = np.sqrt(np.mean(audio_array**2))
-        
-        # Determine silence
-        # (Using a slightly higher threshold for 'active processing' decision vs mere silence detection)
-        is_speech = rms > 0.01 
+        is_speech = vad_registry.process(interview_id, audio_array).is_speech
         
         speaker_label = "silence"
         confidence = 1.0
+        model_version = None
         
         if is_speech:
             # 2. Speaker Prediction
             # Run RF model on this chunk
             # Note: 0.5s chunks might be too short for high accuracy, but it's "real-time" labeling
             # ideally we accumulate a bit, but here we process what we get
-            speaker_label, confidence = speaker_service.predict_speaker_from_memory_sync(audio_array, settings.SAMPLE_RATE)
+            results, model_version = speaker_service.predict_speakers_versioned_sync([audio_array], settings.SAMPLE_RATE, stream_keys=[interview_id])
+            speaker_label, confidence = results[0]
         
         # 3. Publish Result
         payload = {
@@ -52,6 +55,7 @@ def process_audio_chunk(audio_bytes: bytes, interview_id: int, timestamp: float,
             "chunk_seq": chunk_seq,
             "speaker": speaker_label,
             "confidence": confidence,
+            "model_version": model_version,
             "rms": float(rms)
         }
         
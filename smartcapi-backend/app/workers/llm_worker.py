@@ -4,14 +4,19 @@ import traceback
 import datetime
 import re
 import logging
-from typing import Dict, Any, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 from app.db.database import SessionLocal
+from app.core.config import settings
 from app.core.logger import ml_logger
 from app.core.redis_client import async_redis_client, RedisQueue, RedisChannel
+from app.core.interview_states import watch_interview_end
+from app.core.keyed_scheduler import KeyedScheduler
 from app.services.llm_service import llm_service
-from app.services.question_manager import QuestionManager
+from app.services.llm_cache import llm_cache
 from app.db.models import QuestionnaireQuestion, ExtractedAnswer, InterviewTranscript
 
 # Reusing logic from realtime_extraction.py (modified for worker)
@@ -160,16 +165,189 @@ def guard_hobi(value: str) -> bool:
 # I will use `guard_telepon` name for the function implementation to match existing mapping.
 
 
+# =========================================================
+# EXTRACTION BATCHING
+# =========================================================
+
+SPEAKER_LABELS = {"respondent": "Respondent"}
+
+
+# Function to estimate the token count of a transcript fragment (no tokenizer needed)
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+# Function to format batched fragments as one speaker-labelled transcript
+def format_fragments(fragments: List[Tuple[str, str]]) -> str:
+    """
+    Args:
+        fragments: (speaker, text) in arrival order
+
+    Returns:
+        One line per fragment, "<Speaker>: <text>" (labels as named in the extraction prompt)
+    """
+    lines = []
+    for speaker, text in fragments:
+        speaker = speaker or "unknown"
+        label = SPEAKER_LABELS.get(speaker, "Enumerator" if speaker.startswith("user_") else "Unknown")
+        lines.append(f"{label}: {text}")
+    return "\n".join(lines)
+
+
+# Function to pick the part of a batch an extracted answer came from
+def answer_transcript(fragments: List[Tuple[str, str]], value: Any) -> str:
+    """
+    Args:
+        fragments: (speaker, text) of the batch, in arrival order
+        value: Extracted answer
+
+    Returns:
+        Text of the fragments mentioning the answer (a word of it, ignoring
+        case), else of the respondent's fragments, else of the whole batch
+    """
+    values = value if isinstance(value, (list, tuple)) else [value]
+    words = {w for v in values for w in re.findall(r"\w+", str(v).lower()) if len(w) >= 3 or w.isdigit()}
+    mentioned = [text for _, text in fragments if words & set(re.findall(r"\w+", text.lower()))]
+    if mentioned:
+        return " ".join(mentioned)
+    respondent = [text for speaker, text in fragments if speaker == "respondent"]
+    return " ".join(respondent or [text for _, text in fragments])
+
+
+class PendingExtraction:
+    """Finalized fragments of one interview waiting to be extracted together"""
+
+    __slots__ = ("fragments", "tokens", "first_at", "last_at", "flush")
+
+    # Function to initialize PendingExtraction
+    def __init__(self, now: float):
+        self.fragments: List[Tuple[str, str]] = []
+        self.tokens = 0
+        self.first_at = now
+        self.last_at = now
+        self.flush = False  # Send on the next pass regardless of the windows
+
+
+class ExtractionBatcher:
+    """
+    Debounce finalized transcript fragments per interview into one extraction call.
+
+    Whisper finalizes short fragments (often a few words), and one LLM call
+    per fragment sends the whole questionnaire schema each time. Fragments
+    are held per interview and sent together once the interview has been
+    quiet for `debounce` seconds, the oldest fragment has waited `max_wait`
+    seconds, or `max_fragments` / `max_tokens` is reached. A flush can be
+    requested (question changed, interview ended) to send right away.
+    """
+
+    # Function to initialize ExtractionBatcher
+    def __init__(self, debounce: float, max_wait: float, max_fragments: int, max_tokens: int):
+        """
+        Args:
+            debounce: Seconds without a new fragment before a batch is sent
+            max_wait: Seconds the oldest fragment of a batch may wait
+            max_fragments: Fragments per batch
+            max_tokens: Approximate transcript tokens per batch
+        """
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.max_fragments = max_fragments
+        self.max_tokens = max_tokens
+        self._pending: Dict[int, PendingExtraction] = {}
+
+        # Metrics
+        self.fragments = 0
+        self.batches = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    # Function to add a finalized fragment
+    def add(self, interview_id: int, speaker: str, text: str, now: float = None) -> bool:
+        """
+        Returns:
+            True if the interview's batch is full and should be sent now
+        """
+        now = time.monotonic() if now is None else now
+        pending = self._pending.get(interview_id)
+        if pending is None:
+            pending = self._pending[interview_id] = PendingExtraction(now)
+        pending.fragments.append((speaker, text))
+        pending.tokens += estimate_tokens(text)
+        pending.last_at = now
+        self.fragments += 1
+        if len(pending.fragments) >= self.max_fragments or pending.tokens >= self.max_tokens:
+            pending.flush = True
+        return pending.flush
+
+    # Function to request that an interview's batch is sent on the next pass
+    def request_flush(self, interview_id: int) -> bool:
+        """
+        Returns:
+            True if the interview had pending fragments
+        """
+        pending = self._pending.get(interview_id)
+        if pending is None:
+            return False
+        pending.flush = True
+        return True
+
+    # Function to get the time at which a batch becomes due
+    def _deadline(self, pending: PendingExtraction) -> float:
+        if pending.flush:
+            return float("-inf")
+        return min(pending.last_at + self.debounce, pending.first_at + self.max_wait)
+
+    # Function to list the interviews whose batch is due
+    def due(self, now: float = None) -> List[int]:
+        now = time.monotonic() if now is None else now
+        return [i for i, pending in self._pending.items() if self._deadline(pending) <= now]
+
+    # Function to get the seconds until the next batch is due
+    def time_to_next(self, now: float = None) -> Optional[float]:
+        """
+        Returns:
+            Seconds (0 if one is due already), None if nothing is pending
+        """
+        if not self._pending:
+            return None
+        now = time.monotonic() if now is None else now
+        return max(0.0, min(self._deadline(p) for p in self._pending.values()) - now)
+
+    # Function to take an interview's batch
+    def pop(self, interview_id: int) -> Optional[List[Tuple[str, str]]]:
+        """
+        Returns:
+            (speaker, text) fragments in arrival order, None if nothing was pending
+        """
+        pending = self._pending.pop(interview_id, None)
+        if pending is None:
+            return None
+        self.batches += 1
+        return pending.fragments
+
+
 # =========================================================
 
 class LLMWorker:
     """Worker untuk ekstraksi data dengan LLM"""
     
     def __init__(self):
-        self.db = SessionLocal()
-        self.question_manager = QuestionManager(self.db)
+        # Extractions run concurrently: each uses its own session on this pool
+        self.db_pool = ThreadPoolExecutor(max_workers=settings.LLM_MAX_IN_FLIGHT, thread_name_prefix="llm-db")
         self.llm = llm_service
         self.logger = logging.getLogger('ml')
+        self.batcher = ExtractionBatcher(
+            settings.LLM_BATCH_DEBOUNCE,
+            settings.LLM_BATCH_MAX_WAIT,
+            settings.LLM_BATCH_MAX_FRAGMENTS,
+            settings.LLM_BATCH_MAX_TOKENS
+        )
+        self._wakeup: Optional[asyncio.Event] = None
+        self.scheduler: Optional[KeyedScheduler] = None  # Created in run_batches (needs the running loop)
+        # Raw queue messages of the batched fragments per interview: they stay in
+        # RedisQueue.LLM_EXTRACTION_PENDING until their batch has been extracted
+        self._pending_messages: Dict[int, List[bytes]] = {}
         # Konfigurasi logger untuk menghindari emoji di Windows
         self._configure_logger()
         
@@ -267,7 +445,7 @@ class LLMWorker:
         except:
             return None
 
-    def _save_result(self, interview_id: int, question_obj, transcript: str, 
+    def _save_result(self, db: Session, interview_id: int, question_obj, transcript: str, 
                      value: Any, confidence: float = 1.0):
         """
         Simpan hasil ekstraksi dengan konversi tipe data yang benar
@@ -289,7 +467,7 @@ class LLMWorker:
                 value = str(value)
             
             # Use Question.id directly
-            existing = self.db.query(ExtractedAnswer).filter(
+            existing = db.query(ExtractedAnswer).filter(
                 ExtractedAnswer.interview_id == interview_id,
                 ExtractedAnswer.question_id == question_obj.id
             ).first()
@@ -308,25 +486,25 @@ class LLMWorker:
                     transcript=transcript,
                     confidence_score=confidence
                 )
-                self.db.add(new_answer)
+                db.add(new_answer)
                 self.logger.info(f" -> Found '{question_obj.variable_name}': '{value}'")
             
-            self.db.commit()
+            db.commit()
             
             # Update nama responden jika ada
             if question_obj.variable_name == 'nama':
-                self._update_respondent_name(interview_id, value)
+                self._update_respondent_name(db, interview_id, value)
                 
         except Exception as e:
-            self.db.rollback()
+            db.rollback()
             self.logger.error(f"Failed to save {question_obj.variable_name}: {e}")
             raise e
 
-    def _update_respondent_name(self, interview_id: int, name: str):
+    def _update_respondent_name(self, db: Session, interview_id: int, name: str):
         """Update nama responden di tabel Interview"""
         try:
             from app.db.models import Interview # Import here to avoid circular
-            interview = self.db.query(Interview).filter(
+            interview = db.query(Interview).filter(
                 Interview.id == interview_id
             ).first()
             
@@ -336,12 +514,55 @@ class LLMWorker:
                 # Heuristic: Priority to longer names
                 if len(name) > len(current_name) or not current_name:
                     interview.respondent.full_name = name
-                    self.db.commit()
+                    db.commit()
                     self.logger.info(f"Auto-updated Respondent Name to '{name}' from LLM extraction")
                     
         except Exception as e:
             self.logger.error(f"Failed to update respondent name: {e}")
-            self.db.rollback()
+            db.rollback()
+
+    # Function to load the active questions (runs on db_pool)
+    def _load_questions(self) -> List[QuestionnaireQuestion]:
+        db = SessionLocal()
+        try:
+            return db.query(QuestionnaireQuestion).filter(
+                QuestionnaireQuestion.is_active == True
+            ).all()
+        finally:
+            db.close()
+
+    # Function to get the date an interview took place (runs on db_pool)
+    def _load_interview_date(self, interview_id: int) -> Optional[datetime.date]:
+        from app.db.models import Interview # Import here to avoid circular
+        db = SessionLocal()
+        try:
+            interview = db.query(Interview).filter(Interview.id == interview_id).first()
+            return interview.created_at.date() if interview and interview.created_at else None
+        finally:
+            db.close()
+
+    # Function to save the answers of one extraction (runs on db_pool)
+    def _save_answers(self, interview_id: int, answers: List[Tuple[Any, Any, str]]) -> List[Tuple[Any, Any, str]]:
+        """
+        Args:
+            interview_id: ID of the interview
+            answers: (question, value, transcript the value came from) triples
+
+        Returns:
+            The triples that were saved (a failed one is logged and skipped)
+        """
+        db = SessionLocal()
+        saved = []
+        try:
+            for question, value, transcript in answers:
+                try:
+                    self._save_result(db, interview_id, question, transcript, value, confidence=1.0)
+                    saved.append((question, value, transcript))
+                except Exception:
+                    continue
+        finally:
+            db.close()
+        return saved
 
     async def process_extraction(self, data: Dict):
         """
@@ -350,6 +571,8 @@ class LLMWorker:
         try:
             interview_id = data.get('interview_id')
             transcript = data.get('text')
+            # (speaker, text) of a batch; each answer keeps the fragments it came from
+            fragments = data.get('fragments') or [(data.get('speaker'), transcript)]
             
             if not interview_id or not transcript:
                 return
@@ -358,9 +581,11 @@ class LLMWorker:
             
             # 1. Fetch Target Schema
             # Reusing existing logic to fetch active questions
-            all_questions = self.db.query(QuestionnaireQuestion).filter(
-                QuestionnaireQuestion.is_active == True
-            ).all()
+            loop = asyncio.get_running_loop()
+            all_questions, interview_date = await asyncio.gather(
+                loop.run_in_executor(self.db_pool, self._load_questions),
+                loop.run_in_executor(self.db_pool, self._load_interview_date, interview_id)
+            )
             
             if not all_questions:
                 self.logger.warning("No active questions found in DB.")
@@ -409,13 +634,8 @@ class LLMWorker:
                             
                 return None
             
-            # 2. Extract
-            # Call loop runner
-            loop = asyncio.get_event_loop()
-            extracted_data = await loop.run_in_executor(
-                None, 
-                lambda: self.llm.extract_information(transcript, schema=target_schema_list)
-            )
+            # 2. Extract (async client, shared connection pool)
+            extracted_data = await self.llm.extract_information(transcript, schema=target_schema_list, interview_date=interview_date)
             
             self.logger.info(f"Opportunistic Extraction Result: {extracted_data}")
             
@@ -423,42 +643,178 @@ class LLMWorker:
             extracted_data = self.semantic_filter(extracted_data)
             
             # 4. Simpan hasil
+            answers = []
             for field, value in extracted_data.items():
                 if value is not None and value != "" and value != []:
                      # Resolve key to DB variable name
                     db_key = resolve_db_key(field, question_map)
                 
                     if db_key and db_key in question_map:
-                        question = question_map[db_key]
-                        self._save_result(
-                            interview_id=interview_id,
-                            question_obj=question,
-                            transcript=transcript,
-                            value=value,
-                            confidence=1.0
-                        )
-                        # PUBLISH Event
-                        channel = RedisChannel.interview_updates(interview_id)
-                        await async_redis_client.publish(channel, json.dumps({
-                            "type": "answer_extracted",
-                            "success": True,
-                            "question_id": question.id,
-                            "variable_name": question.variable_name,
-                            "extracted_answer": value,
-                            "confidence": 1.0,
-                            "transcript": transcript
-                        }))
+                        answers.append((question_map[db_key], value, answer_transcript(fragments, value)))
+            if not answers:
+                return
+
+            saved = await loop.run_in_executor(self.db_pool, self._save_answers, interview_id, answers)
+
+            # PUBLISH Events (one round-trip)
+            channel = RedisChannel.interview_updates(interview_id)
+            pipe = async_redis_client.pipeline(transaction=False)
+            for question, value, source in saved:
+                pipe.publish(channel, json.dumps({
+                    "type": "answer_extracted",
+                    "success": True,
+                    "question_id": question.id,
+                    "variable_name": question.variable_name,
+                    "extracted_answer": value,
+                    "confidence": 1.0,
+                    "transcript": source
+                }))
+            await pipe.execute()
 
-            
         except Exception as e:
             self.logger.error(f"Extraction processing failed: {e}")
             self.logger.error(traceback.format_exc())
-            self.db.rollback()
 
     # Legacy method kept just in case but likely unused now
     async def _extract_answer(self, transcript: str, question: QuestionnaireQuestion) -> dict:
         return {}
 
+    # Function to wake the batch loop
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # Function to queue a finalized fragment from the merger for batched extraction
+    def enqueue(self, data: Dict, message: Optional[bytes] = None) -> bool:
+        """
+        Args:
+            data: Fragment from the merger
+            message: Its raw message in RedisQueue.LLM_EXTRACTION_PENDING, removed once extracted
+
+        Returns:
+            False if the fragment is empty (nothing was queued)
+        """
+        interview_id = data.get('interview_id')
+        text = (data.get('text') or "").strip()
+        if not interview_id or not text:
+            return False
+        self.batcher.add(int(interview_id), data.get('speaker'), text)
+        if message is not None:
+            self._pending_messages.setdefault(int(interview_id), []).append(message)
+        # The next deadline may be earlier now (new batch, or a full one)
+        self._wake()
+        return True
+
+    # Function to drop extracted (or unusable) fragments from the pending list
+    async def release(self, messages: List[bytes]):
+        if not messages:
+            return
+        try:
+            pipe = async_redis_client.pipeline(transaction=False)
+            for message in messages:
+                pipe.lrem(RedisQueue.LLM_EXTRACTION_PENDING, 1, message)
+            await pipe.execute()
+        except Exception as e:
+            self.logger.error(f"Failed to release {len(messages)} extracted fragments: {e}")
+
+    # Function to re-batch fragments a previous run took but never extracted
+    async def recover(self):
+        """
+        Fragments wait in memory for up to LLM_BATCH_MAX_WAIT; they are only
+        removed from RedisQueue.LLM_EXTRACTION_PENDING once extracted, so a
+        restart picks them up here and sends them right away. Assumes a
+        single LLM worker (run_workers.py starts one).
+        """
+        messages = await async_redis_client.lrange(RedisQueue.LLM_EXTRACTION_PENDING, 0, -1)
+        unusable, interviews = [], set()
+        for message in messages:
+            try:
+                data = json.loads(message)
+            except (TypeError, ValueError):
+                data = {}
+            if self.enqueue(data, message):
+                interviews.add(int(data['interview_id']))
+            else:
+                unusable.append(message)
+        await self.release(unusable)
+        for interview_id in interviews:
+            self.batcher.request_flush(interview_id)
+        if interviews:
+            self.logger.info(f"Recovered {len(messages) - len(unusable)} pending fragments of {len(interviews)} interviews")
+
+    # Function to send an interview's pending fragments now (question changed, interview ended)
+    async def flush_interview(self, interview_id: int):
+        if self.batcher.request_flush(interview_id):
+            self._wake()
+
+    # Function to run one interview's extraction batch (in order per interview)
+    async def _handle_batch(self, interview_id: int, data: Dict):
+        async with self.scheduler.slot():
+            await self.process_extraction(data)
+        # Failed extractions are logged and not retried, as before batching
+        await self.release(data.get('messages'))
+
+    # Function to hand batches to the scheduler as they become due
+    async def run_batches(self):
+        """
+        Up to LLM_MAX_IN_FLIGHT extractions run at once across interviews;
+        an interview's batches run one after the other, so a later answer
+        never overwrites a newer one.
+        """
+        self._wakeup = asyncio.Event()
+        self.scheduler = KeyedScheduler(
+            "llm",
+            self._handle_batch,
+            max_in_flight=settings.LLM_MAX_IN_FLIGHT,
+            max_queue_per_key=settings.LLM_INTERVIEW_QUEUE_MAX
+        )
+        last_report = time.monotonic()
+        while True:
+            timeout = self.batcher.time_to_next()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=1.0 if timeout is None else timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            for interview_id in self.batcher.due():
+                fragments = self.batcher.pop(interview_id)
+                await self.scheduler.submit(interview_id, {
+                    "interview_id": interview_id,
+                    "text": format_fragments(fragments),
+                    "fragments": fragments,
+                    "messages": self._pending_messages.pop(interview_id, [])
+                })
+
+            if time.monotonic() - last_report > 60 and self.batcher.batches:
+                last_report = time.monotonic()
+                self.logger.info(
+                    f"LLM batching: {self.batcher.fragments} fragments in {self.batcher.batches} extraction calls "
+                    f"({self.batcher.fragments / self.batcher.batches:.1f} per call), {len(self.batcher)} interviews pending; "
+                    f"{self.scheduler.in_flight} in flight, {self.llm.retries} retries ({self.llm.rate_limited} rate limited), "
+                    f"cache {llm_cache.hits} hits / {llm_cache.misses} misses"
+                )
+
+
+# Function to flush an interview's batch when its current question changes
+async def watch_question_changes(worker: LLMWorker):
+    """Fragments batched so far belong to the previous question; send them before the answer is needed"""
+    while True:
+        pubsub = async_redis_client.pubsub()
+        try:
+            await pubsub.subscribe(RedisChannel.INTERVIEW_CONTEXT)
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    try:
+                        await worker.flush_interview(int(json.loads(message["data"])["interview_id"]))
+                    except (TypeError, ValueError, KeyError):
+                        continue
+        except Exception as e:
+            ml_logger.error(f"Question change subscription error: {e}")
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.close()
+
 async def main():
     ml_logger.info("Starting LLM Worker...")
     worker = LLMWorker()
@@ -469,12 +825,23 @@ async def main():
     except Exception as e:
         return
 
+    # Fragments are batched per interview; run_batches sends them
+    batch_loop = asyncio.create_task(worker.run_batches())
+    question_watcher = asyncio.create_task(watch_question_changes(worker))
+    end_watcher = asyncio.create_task(watch_interview_end(on_end=worker.flush_interview))
+    try:
+        await worker.recover()
+    except Exception as e:
+        ml_logger.error(f"Failed to recover pending fragments: {e}")
+
     while True:
         try:
-            result = await async_redis_client.blpop(RedisQueue.LLM_EXTRACTION, timeout=1)
-            if result:
-                _, data_json = result
-                await worker.process_extraction(json.loads(data_json))
+            # Moved (not popped) so a batched fragment survives a crash until extracted
+            data_json = await async_redis_client.blmove(
+                RedisQueue.LLM_EXTRACTION, RedisQueue.LLM_EXTRACTION_PENDING, 1, "LEFT", "RIGHT"
+            )
+            if data_json and not worker.enqueue(json.loads(data_json), data_json):
+                await worker.release([data_json])
         except Exception as e:
             ml_logger.error(f"LLM Worker Error: {e}")
             await asyncio.sleep(1)
@@ -1,23 +1,50 @@
 import asyncio
 import json
 import traceback
-from collections import defaultdict
-from typing import List, Dict
 
 from app.core.config import settings
 from app.core.logger import ml_logger
 from app.core.redis_client import async_redis_client, RedisQueue, RedisChannel
+from app.core.interview_states import InterviewStateManager, watch_interview_end
+from app.processing.audio.segment_index import SegmentIndex
 
 class Interviewstate:
     def __init__(self, interview_id):
         self.interview_id = interview_id
-        self.segments: List[dict] = [] # History of speaker segments
+        # Speaker segments not yet covered by a finalized transcript (see segment_index)
+        self.segments = SegmentIndex(max_segments=settings.MERGER_MAX_SEGMENTS)
         self.current_transcript: str = ""
         self.last_finalized_time: float = 0.0
         self.silence_counter: int = 0  # Count continuous silence segments
+        self.partial_pending: bool = False  # current_transcript is a Whisper partial (a final will follow)
+
+    def to_snapshot(self) -> dict:
+        """Redis hash fields of a state snapshot (see interview_states)"""
+        starts, ends, speakers = self.segments.retained()
+        return {"meta": json.dumps({
+            "current_transcript": self.current_transcript,
+            "last_finalized_time": self.last_finalized_time,
+            "silence_counter": self.silence_counter,
+            "partial_pending": self.partial_pending,
+            "segments": [starts, ends, speakers]
+        })}
+
+    @classmethod
+    def from_snapshot(cls, interview_id, fields: dict) -> "Interviewstate":
+        meta = json.loads(fields[b"meta"])
+        state = cls(interview_id)
+        for key in ("current_transcript", "last_finalized_time", "silence_counter", "partial_pending"):
+            setattr(state, key, meta[key])
+        for start, end, speaker in zip(*meta["segments"]):
+            state.segments.add(start, end, speaker)
+        return state
 
     def add_segment(self, segment: dict):
-        self.segments.append(segment)
+        self.segments.add(
+            segment.get("start_time", 0.0),
+            segment.get("end_time", 0.0),
+            segment.get("speaker", "unknown")
+        )
         
         # Check silence for finalization
         if segment.get("is_silence"):
@@ -28,42 +55,31 @@ class Interviewstate:
 
     def should_finalize(self) -> bool:
         # Finalize if we have > 1.0s of continuous silence
-        return self.silence_counter >= 1.0 and self.current_transcript.strip()
+        # (unless Whisper is still streaming this utterance: it sends its own final)
+        return self.silence_counter >= 1.0 and self.current_transcript.strip() and not self.partial_pending
 
     def get_majority_speaker(self, start: float, end: float) -> str:
         """
         Determine the dominant speaker in a given time range.
         """
-        counts = defaultdict(float)
-        total_overlap = 0.0
-        
-        for seg in self.segments:
-            # Check overlap
-            seg_start = seg.get("start_time", 0.0)
-            seg_end = seg.get("end_time", 0.0)
-            
-            # Intersection
-            overlap_start = max(start, seg_start)
-            overlap_end = min(end, seg_end)
-            
-            if overlap_end > overlap_start:
-                duration = overlap_end - overlap_start
-                speaker = seg.get("speaker", "unknown")
-                counts[speaker] += duration
-                total_overlap += duration
-                
-        if not counts:
+        if start is None or end is None:
             return "unknown"
-            
-        # Return speaker with max duration
-        # If 'respondent' exists and has significant presence, prefer it?
-        # For now, strict majority.
-        return max(counts, key=counts.get)
+        # Strict majority by overlap duration (O(log n + k), see SegmentIndex)
+        return self.segments.majority_speaker(start, end)
+
+    def finalize_until(self, end: float):
+        """A transcript ending at `end` was finalized: drop the segments before it"""
+        if end is None:
+            return
+        self.last_finalized_time = max(self.last_finalized_time, end)
+        # Keep some slack for transcripts that overlap the finalized one
+        self.segments.evict_before(self.last_finalized_time - settings.MERGER_SEGMENT_SLACK_SECONDS)
 
 async def process_messages():
     ml_logger.info("Starting Merger/Aligner Worker...")
     
-    interviews: Dict[int, Interviewstate] = {}
+    # Per-interview states, evicted when idle and snapshotted to Redis
+    interviews = InterviewStateManager("merger", Interviewstate, Interviewstate.to_snapshot, Interviewstate.from_snapshot)
     
     try:
         await async_redis_client.ping()
@@ -72,8 +88,13 @@ async def process_messages():
         ml_logger.error(f"Failed to connect to Redis: {e}")
         return
 
+    end_watcher = asyncio.create_task(watch_interview_end(interviews))
+
     while True:
         try:
+            # Snapshot changed interview states, drop idle ones
+            await interviews.maintain()
+            
             # Pop from both queues (Prioritize TRANSCRIPTS!)
             result = await async_redis_client.blpop(
                 [RedisQueue.MERGER_TRANSCRIPTS, RedisQueue.MERGER_SEGMENTS], 
@@ -98,9 +119,7 @@ async def process_messages():
             if not interview_id:
                 continue
                 
-            if interview_id not in interviews:
-                interviews[interview_id] = Interviewstate(interview_id)
-            state = interviews[interview_id]
+            state = await interviews.get(interview_id)
             
             if queue_name == RedisQueue.MERGER_SEGMENTS:
                 # Handle Segment
@@ -157,6 +176,7 @@ async def process_messages():
                 
                 # Update current view
                 state.current_transcript = text
+                state.partial_pending = not data.get("is_final", False)
                 
                 # Identify speaker for this specific fragment
                 speaker = state.get_majority_speaker(start, end)
@@ -204,6 +224,7 @@ async def process_messages():
                     # Reset state
                     state.current_transcript = ""
                     state.silence_counter = 0
+                    state.finalize_until(end)
                 
         except Exception as e:
             ml_logger.error(f"Merger Loop Error: {e}")
@@ -0,0 +1,83 @@
+import asyncio
+import traceback
+
+from app.core.config import settings
+from app.core.logger import ml_logger
+from app.core.redis_client import async_redis_client, RedisQueue
+from app.core.training_state import update_training_status
+from app.schemas.queue_messages import TrainingJobMessage
+from app.services.diarization_service import speaker_service
+
+# Speaker training runs here instead of in the API process: jobs come from
+# RedisQueue.TRAINING_JOBS (one at a time, in order), progress goes to the
+# user's training status hash and channel (see training_state). Every model
+# a job produces is published through the model registry, which records the
+# version in the MLModel table and announces it on
+# RedisChannel.SPEAKER_MODEL_UPDATES so running audio processors swap it in.
+
+def run_job(job: TrainingJobMessage) -> bool:
+    """Run one training job (blocking)"""
+    def progress_callback(progress, status, message):
+        update_training_status(job.user_id, progress, status, message, job.job_id)
+
+    update_training_status(job.user_id, 1, "starting", "Starting training process...", job.job_id)
+
+    if job.kind == "enroll":
+        success = speaker_service.add_voice_sample(job.audio_path, job.speaker_label, progress_callback)
+    elif job.kind == "retrain":
+        features, labels = speaker_service.training_store.read()
+        if not len(labels):
+            progress_callback(0, "error", "No training data found. Add voice samples first.")
+            return False
+        success = speaker_service.train_model(features, labels, progress_callback)
+        if success and settings.SPEAKER_SCORER == "profiles":
+            progress_callback(100, "completed", "Random Forest trained; inactive while SPEAKER_SCORER is 'profiles'")
+        elif success:
+            progress_callback(100, "completed", "Training completed successfully!")
+    elif job.kind == "remove":
+        success = speaker_service.remove_speaker(job.speaker_label)
+        if success:
+            progress_callback(100, "completed", f"Removed speaker {job.speaker_label}")
+    else:
+        ml_logger.error(f"Unknown training job kind: {job.kind}")
+        return False
+
+    if not success:
+        progress_callback(0, "error", f"Training job '{job.kind}' failed")
+    return success
+
+async def main():
+    ml_logger.info("Starting Training Worker...")
+
+    try:
+        await async_redis_client.ping()
+        ml_logger.info("Connected to Redis.")
+    except Exception as e:
+        ml_logger.error(f"Failed to connect to Redis: {e}")
+        return
+
+    loop = asyncio.get_running_loop()
+    # First start after the upgrade: import training_data.pkl, then build the profiles, once
+    await loop.run_in_executor(None, speaker_service.migrate_training_data)
+    await loop.run_in_executor(None, speaker_service.bootstrap_profiles)
+    while True:
+        try:
+            result = await async_redis_client.blpop(RedisQueue.TRAINING_JOBS, timeout=1)
+            if not result:
+                continue
+            _, data_json = result
+            job = TrainingJobMessage.model_validate_json(data_json)
+            ml_logger.info(f"Training job {job.job_id}: {job.kind} {job.speaker_label or ''}")
+
+            # Feature extraction and fitting are CPU-bound: keep the loop free
+            await loop.run_in_executor(None, run_job, job)
+        except Exception as e:
+            ml_logger.error(f"Training Worker Error: {e}")
+            ml_logger.error(traceback.format_exc())
+            await asyncio.sleep(1)
+
+if __name__ == "__main__":
+    import sys
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(main())
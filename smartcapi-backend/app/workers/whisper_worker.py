@@ -1,21 +1,21 @@
 import asyncio
 import json
-import base64
 import time
 import numpy as np
-import tempfile
-import os
-import traceback
-from typing import Dict, List, Tuple
-import collections
+from typing import List, Optional, Tuple
 
 from app.core.config import settings
 from app.core.logger import ml_logger
-from app.core.redis_client import async_redis_client, RedisQueue, RedisChannel
+from app.core.redis_client import async_redis_client, RedisQueue, RedisChannel, RedisStream
+from app.core.audio_stream import AudioStreamConsumer
+from app.core.shard_map import ShardCoordinator
+from app.core.keyed_scheduler import KeyedScheduler
+from app.core.interview_states import InterviewStateManager, watch_interview_end
 from app.services.whisper_service import whisper_service
-from app.processing.audio.audio_utils import save_audio, compute_rms
-from app.processing.models.loader import load_rf_model
-from app.processing.audio.feature_extractor import extract_mfcc_features
+from app.services.local_agreement import LocalAgreement, join_words
+from app.processing.audio.vad import FrameVAD
+from app.processing.audio.frame_codec import AudioFrame, decode_audio_frame, pcm_to_float32
+from app.processing.audio.ring_buffer import AudioRingBuffer
 from app.db.database import SessionLocal
 from app.db.models import LogType, ProcessingLog, Interview, RoleEventLog, RoleEventType, RoleActionTaken
 
@@ -24,14 +24,19 @@ from app.db.models import LogType, ProcessingLog, Interview, RoleEventLog, RoleE
 TRANSCRIBE_INTERVAL = 2.0  # seconds
 MIN_DURATION_TO_TRANSCRIBE = 2.0 # seconds
 MAX_CONTEXT_WINDOW = 30.0 # seconds (keep reasonable context)
+RECLAIM_INTERVAL = 10.0 # seconds between pending-entry reclaim passes
+METRICS_INTERVAL = 10.0 # seconds between queue-depth metric reports
+PRE_ROLL = 0.5 # seconds of audio kept before speech starts
 SAMPLE_RATE = settings.SAMPLE_RATE
+# Streaming re-decodes the window every WHISPER_STREAM_STEP, which the openai
+# backend bills as new audio, so unless configured it is on for local only
+STREAMING = settings.WHISPER_STREAMING if settings.WHISPER_STREAMING is not None else settings.WHISPER_BACKEND == "local"
 
 class InterviewState:
     def __init__(self, interview_id):
         self.interview_id = interview_id
-        # We keep a deque of float chunks for efficient appending/popping
-        self.audio_buffer = np.array([], dtype=np.float32)
-        self.buffer_start_time = 0.0 # Timeline position of the start of audio_buffer
+        # Preallocated circular buffer: O(1) append, zero-copy processing window
+        self.audio_buffer = AudioRingBuffer(int(settings.WHISPER_RING_SECONDS * SAMPLE_RATE), SAMPLE_RATE)
         self.last_transcribe_time = 0.0
         
         # We track what we have "finalized" to avoid re-emitting
@@ -40,108 +45,160 @@ class InterviewState:
         self.accumulated_text = ""
         
         # VAD State
+        self.vad = FrameVAD(SAMPLE_RATE)
+        self.speech_in_buffer = False # never send silence/noise-only audio to Whisper
         self.is_speaking = False
         self.last_speech_time = 0.0
         self.silence_start_time = 0.0
 
+        # Streaming (LocalAgreement) state
+        self.agreement = LocalAgreement()
+        self.utterance_words: List[tuple] = [] # committed, not yet sent as final
+        self.utterance_active = False
+        self.utterance_started_at = 0.0 # wall clock, for time-to-first-text
+        self.first_text_sent = False
+        self.last_decode_end = 0.0 # timeline position of the end of the last decoded window
+
+    @property
+    def buffer_start_time(self) -> float:
+        """Timeline position of the start of audio_buffer"""
+        return self.audio_buffer.start_time
+
+    @property
+    def buffer_end_time(self) -> float:
+        """Timeline position of the end of audio_buffer"""
+        return self.audio_buffer.start_time + self.audio_buffer.duration
+
     def add_audio(self, samples: np.ndarray, timestamp: float):
-        if len(self.audio_buffer) == 0:
-            self.buffer_start_time = timestamp
-            self.audio_buffer = samples
-        else:
-            self.audio_buffer = np.concatenate((self.audio_buffer, samples))
-            
-        # Safety: Cap buffer size to avoid memory leak if no transcription happens
-        max_samples = 60 * SAMPLE_RATE # 60 seconds max buffer
-        if len(self.audio_buffer) > max_samples:
-            # Drop oldest
-            drop_count = len(self.audio_buffer) - max_samples
-            self.audio_buffer = self.audio_buffer[drop_count:]
-            self.buffer_start_time += (drop_count / SAMPLE_RATE)
+        # The ring drops the oldest audio once full, so the buffer stays capped
+        # even if no transcription happens
+        self.audio_buffer.append(samples, timestamp)
 
     def get_processing_window(self) -> Tuple[np.ndarray, float]:
         """
-        Get audio to transcribe. 
-        We send the whole buffer up to 30s.
+        Get audio to transcribe (zero-copy view of the whole buffer).
+        The view stays valid until the next add_audio for this interview.
         """
-        return self.audio_buffer, self.buffer_start_time
+        return self.audio_buffer.view(), self.audio_buffer.start_time
 
     def commit_segment(self, end_time: float):
         """
-        Mark audio up to end_time as finalized. 
-        We strip it from buffer, BUT keep some overlap for context!
+        Mark audio up to end_time as finalized and drop it from the buffer.
         """
-        # Calculate samples to drop
-        # We want to drop audio that is older than end_time, 
-        # BUT we might want to keep 1-2s for context? 
-        # Actually FasterWhisper handles context if we give prompt, but prompt is text.
-        # Giving audio context (overlap) is better for VAD.
-        
-        # For simplicity in this implementation: 
-        # Drop everything up to end_time.
-        
-        duration_to_drop = end_time - self.buffer_start_time
-        if duration_to_drop <= 0:
-            return
+        self.audio_buffer.consume_until(end_time)
 
-        samples_to_drop = int(duration_to_drop * SAMPLE_RATE)
-        
-        if samples_to_drop >= len(self.audio_buffer):
-            # Clear all
-            self.audio_buffer = np.array([], dtype=np.float32)
-            self.buffer_start_time = end_time
+    def to_snapshot(self) -> Tuple[dict, bytes]:
+        """Serialize state for a snapshot / handoff (metadata, int16 audio bytes)"""
+        meta = {
+            "interview_id": self.interview_id,
+            "buffer_start_time": self.buffer_start_time,
+            "last_transcribe_time": self.last_transcribe_time,
+            "last_finalized_time": self.last_finalized_time,
+            "accumulated_text": self.accumulated_text,
+            "is_speaking": self.is_speaking,
+            "last_speech_time": self.last_speech_time,
+            "silence_start_time": self.silence_start_time,
+            "vad": self.vad.state(),
+            "speech_in_buffer": self.speech_in_buffer,
+            "agreement": {
+                "committed": self.agreement.committed,
+                "previous": self.agreement.previous,
+                "last_committed_time": self.agreement.last_committed_time,
+            },
+            "utterance_words": self.utterance_words,
+            "utterance_active": self.utterance_active,
+            "utterance_started_at": self.utterance_started_at,
+            "first_text_sent": self.first_text_sent,
+            "last_decode_end": self.last_decode_end,
+            "audio_format": "int16",
+        }
+        # The buffered samples came from int16 PCM: storing them as int16 is lossless and half the size
+        audio = np.clip(np.rint(self.audio_buffer.view() * 32768.0), -32768, 32767).astype(np.int16)
+        return meta, audio.tobytes()
+
+    @classmethod
+    def from_snapshot(cls, meta: dict, audio: bytes) -> "InterviewState":
+        state = cls(meta["interview_id"])
+        if meta.get("audio_format") == "int16":
+            samples = pcm_to_float32(np.frombuffer(audio, dtype=np.int16))
         else:
-            self.audio_buffer = self.audio_buffer[samples_to_drop:]
-            self.buffer_start_time += (samples_to_drop / SAMPLE_RATE)
+            samples = np.frombuffer(audio, dtype=np.float32)
+        state.audio_buffer.reset(samples, meta["buffer_start_time"])
+        for key in ("last_transcribe_time", "last_finalized_time",
+                    "accumulated_text", "is_speaking", "last_speech_time", "silence_start_time"):
+            setattr(state, key, meta[key])
+        # Streaming fields (absent in snapshots from older replicas)
+        agreement = meta.get("agreement")
+        if agreement:
+            state.agreement.committed = [tuple(w) for w in agreement["committed"]]
+            state.agreement.previous = [tuple(w) for w in agreement["previous"]]
+            state.agreement.last_committed_time = agreement["last_committed_time"]
+        state.utterance_words = [tuple(w) for w in meta.get("utterance_words", [])]
+        if "vad" in meta:
+            state.vad.load_state(meta["vad"])
+        for key in ("speech_in_buffer", "utterance_active", "utterance_started_at", "first_text_sent", "last_decode_end"):
+            if key in meta:
+                setattr(state, key, meta[key])
+        return state
+
+def snapshot_fields(state: InterviewState) -> dict:
+    """Redis hash fields of a state snapshot"""
+    meta, audio = state.to_snapshot()
+    return {"meta": json.dumps(meta), "audio": audio}
+
+def restore_state(interview_id: int, fields: dict) -> InterviewState:
+    return InterviewState.from_snapshot(json.loads(fields[b"meta"]), fields[b"audio"])
+
+# Global state: per-interview states, evicted when idle and snapshotted to Redis
+interviews = InterviewStateManager("whisper", InterviewState, snapshot_fields, restore_state)
+scheduler: Optional[KeyedScheduler] = None # Created in main() (needs the running loop)
+stream_stats = {
+    "decodes": 0,
+    "decoded_seconds": 0.0,
+    "partials": 0,
+    "finals": 0,
+    "first_text_count": 0,
+    "first_text_latency_sum": 0.0,
+}
 
-# Global state
-interviews: Dict[int, InterviewState] = {}
-rf_model = None
+async def hand_off_shard(shard: int):
+    """
+    Called before this replica gives up a shard: snapshot the state of every
+    interview on that shard to Redis so the new owner continues seamlessly.
+    """
+    # Finish frames already queued for this shard so the snapshot is complete
+    if scheduler:
+        for interview_id in list(scheduler.metrics()["depths"]):
+            if RedisStream.audio_shard(interview_id) == shard:
+                await scheduler.drain(interview_id)
+    
+    moving = [i for i in interviews.ids() if RedisStream.audio_shard(i) == shard]
+    await interviews.save(moving, ttl=settings.SHARD_HANDOFF_TTL)
+    for interview_id in moving:
+        interviews.pop(interview_id)
+    if moving:
+        ml_logger.info(f"Handed off {len(moving)} interview buffers from shard {shard}")
+
+async def get_interview_state(interview_id: int) -> InterviewState:
+    """Local state, or the snapshot left by the previous owner (handoff or restart), or a fresh one"""
+    return await interviews.get(interview_id)
 
-async def process_audio_chunk(data: dict):
+async def process_audio_chunk(frame: AudioFrame):
     try:
-        audio_b64 = data.get("audio_data")
-        interview_id = data.get("interview_id")
-        timestamp = data.get("timestamp")
+        interview_id = frame.interview_id
+        timestamp = frame.timestamp
         
-        if not audio_b64 or not interview_id:
+        if len(frame.pcm) == 0 or not interview_id:
             return
 
-        # Decode
-        audio_bytes = base64.b64decode(audio_b64)
-        audio_array = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-        
-        if interview_id not in interviews:
-            interviews[interview_id] = InterviewState(interview_id)
-        
-        state = interviews[interview_id]
+        # Decode (int16 view -> float32, single allocation)
+        audio_array = pcm_to_float32(frame.pcm)
         
-        # 0. Check RMS for Activity (Robust VAD)
-        # We use a slightly higher threshold here to avoid noise triggering
-        # silence_detector is robust, but we can also do a quick check
-        from app.services.silence_detector import silence_detector
+        state = await get_interview_state(interview_id)
         
-        # Use simple RMS first for speed, but rely on silence_detector thresholds
-        rms = compute_rms(audio_array)
-        
-        # Use a hardcoded higher threshold if noise is issue (User log showed 0.05)
-        # but let's trust the settings or override if needed. 
-        # Plan: "Tune VAD". Let's set a local effective threshold.
-        # If logs showed 0.05, that's high. If it was hallucinating, maybe it wasn't detecting silence?
-        # Actually, if it hallucinates "during silence", it means it THOUGHT it was speech (or processed silence as speech).
-        # Increasing threshold prevents processing noise as speech.
-        
-        # UPDATE: Tuning for VPS Hallucinations.
-        # The previous override to 0.01 was too sensitive (triggered on noise).
-        # We will respect settings.SILENCE_THRESHOLD if reasonable, or default to 0.02.
-        EFFECTIVE_THRESHOLD = getattr(settings, 'SILENCE_THRESHOLD', 0.02)
-        
-        # Safety clamp: Don't let it be too high (miss speech) or too low (hallucinate)
-        # 0.1 is too high (cuts speech). 0.005 is too low (noise).
-        # Let's clamp it between 0.015 and 0.05
-        EFFECTIVE_THRESHOLD = max(0.015, min(EFFECTIVE_THRESHOLD, 0.05))
-
-        is_silence_frame = rms < EFFECTIVE_THRESHOLD
+        # 0. Voice activity: 10 ms frames against this interview's adaptive noise floor
+        vad_result = state.vad.process(audio_array)
+        is_silence_frame = not vad_result.is_speech
         
         now = time.time()
         
@@ -166,6 +223,17 @@ async def process_audio_chunk(data: dict):
         # Add to buffer
         state.add_audio(audio_array, timestamp)
 
+        if STREAMING:
+            await stream_transcribe(state, now)
+            return
+
+        if not is_silence_frame:
+            state.speech_in_buffer = True
+        elif not state.speech_in_buffer:
+            # Nothing but silence/noise buffered: never worth a Whisper call
+            state.commit_segment(state.buffer_end_time - PRE_ROLL)
+            return
+
         # DECISION: To Transcribe or Not?
         # Trigger conditions:
         # 1. We were speaking, and now we've been silent for > 0.5s (End of sentence/phrase)
@@ -201,98 +269,295 @@ async def process_audio_chunk(data: dict):
             
             ml_logger.info(f"Processing audio segment ({len(audio_window)/SAMPLE_RATE:.2f}s) for Full Transcription...")
 
-            # 2. Save to temp
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-                temp_path = tmp.name
-            
-            save_audio(audio_window, temp_path, SAMPLE_RATE)
-            
-            try:
-                # 3. Transcribe with OpenAI / Whisper
-                # It returns segments!
+            # 2. Transcribe with OpenAI / Whisper
+            # It returns segments!
+            # Bounded across interviews: other interviews keep flowing while this waits
+            async with scheduler.slot():
                 result = await whisper_service.transcribe(
-                    temp_path, 
+                    audio_window, # Encoded to WAV in memory, no temp file
                     language="id", 
                     initial_prompt=state.accumulated_text[-200:] # Feed last text as prompt context
                 )
+            
+            segments = result.get("segments", [])
+            
+            final_text_chunk = ""
+            final_end_time = window_start
+            has_final = False
+            
+            # Logic: Since we triggered on silence, we assume the ENTIRE buffer is a valid phrase.
+            # We can mark it all as final.
+            
+            for seg in segments:
+                # Handle both object and dict access for robustness
+                if isinstance(seg, dict):
+                     final_text_chunk += seg.get("text", "") + " "
+                     final_end_time = window_start + seg.get("end", 0)
+                else:
+                     final_text_chunk += seg.text + " "
+                     final_end_time = window_start + seg.end
+                has_final = True
+            
+            if has_final:
+                state.accumulated_text += final_text_chunk
                 
-                segments = result.get("segments", [])
-                
-                final_text_chunk = ""
-                final_end_time = window_start
-                has_final = False
-                
-                # Logic: Since we triggered on silence, we assume the ENTIRE buffer is a valid phrase.
-                # We can mark it all as final.
-                
-                for seg in segments:
-                    # Handle both object and dict access for robustness
-                    if isinstance(seg, dict):
-                         final_text_chunk += seg.get("text", "") + " "
-                         final_end_time = window_start + seg.get("end", 0)
-                    else:
-                         final_text_chunk += seg.text + " "
-                         final_end_time = window_start + seg.end
-                    has_final = True
+                # Emit Final
+                payload_final = {
+                    "interview_id": interview_id,
+                    # We don't have perfect start time for merged chunks easily here,
+                    # but Merger handles sequence.
+                    "start_time": window_start, 
+                    "end_time": final_end_time,
+                    "text": final_text_chunk.strip(),
+                    "is_final": True
+                }
+                if async_redis_client:
+                     ml_logger.info(f"VAD Triggered: Sending FINAL transcript: {final_text_chunk[:50]}...")
+                     await async_redis_client.rpush(RedisQueue.MERGER_TRANSCRIPTS, json.dumps(payload_final))
                 
-                if has_final:
-                    state.accumulated_text += final_text_chunk
-                    
-                    # Emit Final
-                    payload_final = {
-                        "interview_id": interview_id,
-                        # We don't have perfect start time for merged chunks easily here,
-                        # but Merger handles sequence.
-                        "start_time": window_start, 
-                        "end_time": final_end_time,
-                        "text": final_text_chunk.strip(),
-                        "is_final": True
-                    }
-                    if async_redis_client:
-                         ml_logger.info(f"VAD Triggered: Sending FINAL transcript: {final_text_chunk[:50]}...")
-                         await async_redis_client.rpush(RedisQueue.MERGER_TRANSCRIPTS, json.dumps(payload_final))
-                    
-                    # Commit (Clear Buffer)
-                    state.commit_segment(final_end_time)
-            
-            finally:
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
+                # Commit (Clear Buffer)
+                state.commit_segment(final_end_time)
+                state.speech_in_buffer = state.is_speaking
 
     except Exception as e:
         ml_logger.error(f"Whisper Worker Error: {str(e)}")
         # traceback.print_exc()
 
+async def emit_transcript(state: InterviewState, words: List[tuple], is_final: bool):
+    """Push a partial (committed + tentative words) or final transcript to the merger"""
+    payload = {
+        "interview_id": state.interview_id,
+        "start_time": words[0][0],
+        "end_time": words[-1][1],
+        "text": join_words(words),
+        "is_final": is_final
+    }
+    stream_stats["finals" if is_final else "partials"] += 1
+    if not state.first_text_sent:
+        state.first_text_sent = True
+        stream_stats["first_text_count"] += 1
+        stream_stats["first_text_latency_sum"] += time.time() - state.utterance_started_at
+    await async_redis_client.rpush(RedisQueue.MERGER_TRANSCRIPTS, json.dumps(payload))
+
+async def decode_window(state: InterviewState) -> Tuple[List[dict], float]:
+    """Transcribe the uncommitted audio window, returning word timings and the window start"""
+    audio_window, window_start = state.get_processing_window()
+    state.last_decode_end = window_start + len(audio_window) / SAMPLE_RATE
+    stream_stats["decodes"] += 1
+    stream_stats["decoded_seconds"] += len(audio_window) / SAMPLE_RATE
+
+    prompt = (state.accumulated_text + " " + join_words(state.utterance_words)).strip()
+    async with scheduler.slot():
+        result = await whisper_service.transcribe(
+            audio_window,
+            language="id",
+            initial_prompt=prompt[-200:],
+            word_timestamps=True
+        )
+    return result.get("words", []), window_start
+
+async def stream_transcribe(state: InterviewState, now: float):
+    """
+    Streaming mode: while the speaker talks, re-decode the uncommitted window
+    every WHISPER_STREAM_STEP seconds of new audio. Words two consecutive
+    hypotheses agree on are committed and their audio is dropped from the
+    buffer; the rest is sent as a partial. At the end of the utterance the
+    remaining words are flushed and the whole utterance is sent as final.
+    """
+    if state.is_speaking and not state.utterance_active:
+        # Speech started: keep only a short pre-roll before it
+        state.utterance_active = True
+        state.utterance_started_at = now
+        state.first_text_sent = False
+        state.commit_segment(state.buffer_end_time - PRE_ROLL)
+        state.last_decode_end = state.buffer_start_time
+
+    if not state.utterance_active:
+        # Silence between utterances is never decoded
+        state.commit_segment(state.buffer_end_time - PRE_ROLL)
+        return
+
+    if state.is_speaking:
+        if state.buffer_end_time - state.last_decode_end < settings.WHISPER_STREAM_STEP:
+            return
+        words, window_start = await decode_window(state)
+        committed = state.agreement.insert(words, window_start)
+        if state.audio_buffer.duration > settings.WHISPER_STREAM_MAX_WINDOW:
+            # No agreement for too long: accept the current hypothesis
+            committed += state.agreement.flush()
+        end_of_utterance = False
+    else:
+        # Endpoint: decode what is left and flush it
+        words, window_start = await decode_window(state)
+        committed = state.agreement.insert(words, window_start)
+        committed += state.agreement.flush()
+        end_of_utterance = True
+
+    if committed:
+        state.utterance_words.extend(committed)
+        # Committed audio is never decoded again
+        state.commit_segment(committed[-1][1])
+        state.agreement.trim_committed(state.buffer_start_time - 5.0)
+
+    if end_of_utterance:
+        if state.utterance_words:
+            ml_logger.info(f"Streaming FINAL for interview {state.interview_id}: {join_words(state.utterance_words)[:50]}...")
+            await emit_transcript(state, state.utterance_words, is_final=True)
+            state.accumulated_text += " " + join_words(state.utterance_words)
+        state.utterance_words = []
+        state.utterance_active = False
+        state.commit_segment(state.buffer_end_time - PRE_ROLL)
+        return
+
+    utterance_duration = state.utterance_words[-1][1] - state.utterance_words[0][0] if state.utterance_words else 0.0
+    if utterance_duration > settings.WHISPER_STREAM_MAX_UTTERANCE:
+        # Long monologue: finalize the committed part so extraction is not delayed
+        await emit_transcript(state, state.utterance_words, is_final=True)
+        state.accumulated_text += " " + join_words(state.utterance_words)
+        state.utterance_words = []
+
+    visible = state.utterance_words + state.agreement.tentative()
+    if visible:
+        await emit_transcript(state, visible, is_final=False)
+
+async def report_metrics(worker_name: str):
+    """Log scheduler queue depths and publish them to Redis for dashboards"""
+    m = scheduler.metrics()
+    deepest = sorted(m["depths"].items(), key=lambda kv: kv[1], reverse=True)[:5]
+    ml_logger.info(
+        f"Whisper scheduler: interviews={m['keys']} queued={m['queued']} in_flight={m['in_flight']} "
+        f"waiting={m['waiting_for_slot']} backpressure={m['backpressure_waits']} deepest={deepest}"
+    )
+    key = f"metrics:whisper:{worker_name}"
+    summary = {k: v for k, v in m.items() if k != "depths"}
+    summary["depths"] = json.dumps(m["depths"])
+    summary["updated_at"] = time.time()
+    summary["live_interviews"] = len(interviews)
+    summary["evicted_interviews"] = interviews.evicted
+    summary["restored_interviews"] = interviews.restored
+    if STREAMING and stream_stats["decodes"]:
+        summary.update({f"stream_{k}": round(v, 3) for k, v in stream_stats.items()})
+        summary["stream_first_text_avg"] = round(
+            stream_stats["first_text_latency_sum"] / max(stream_stats["first_text_count"], 1), 3
+        )
+        ml_logger.info(
+            f"Whisper streaming: decodes={stream_stats['decodes']} decoded={stream_stats['decoded_seconds']:.1f}s "
+            f"partials={stream_stats['partials']} finals={stream_stats['finals']} "
+            f"first_text_avg={summary['stream_first_text_avg']:.2f}s"
+        )
+    batch_stats = whisper_service.batch_stats()
+    if batch_stats:
+        ml_logger.info(f"Whisper batching: {batch_stats}")
+        summary["batch_avg_size"] = batch_stats["avg_batch_size"]
+        summary["batch_avg_wait_ms"] = batch_stats["avg_wait_ms"]
+        summary["batch_histogram"] = json.dumps(batch_stats["size_histogram"])
+    async with async_redis_client.pipeline() as pipe:
+        pipe.hset(key, mapping=summary)
+        pipe.expire(key, int(METRICS_INTERVAL * 6))
+        await pipe.execute()
+
 async def main():
     ml_logger.info("Starting Streaming Whisper Worker (GPU)...")
     
     try:
         await async_redis_client.ping()
         ml_logger.info("Connected to Redis.")
-        
-        global rf_model
-        rf_model = load_rf_model()
-        if rf_model:
-            ml_logger.info("Speaker Identification Model (RF) Enabled.")
-        else:
-            ml_logger.warning("Speaker Identification Model (RF) NOT found. All audio will be transcribed.")
-            
     except Exception as e:
-        ml_logger.error(f"Failed to connect to Redis or Load Model: {e}")
+        ml_logger.error(f"Failed to connect to Redis: {e}")
         return
 
-    while True:
+    # Shards are spread over Whisper replicas by consistent hashing, so all
+    # audio of one interview is handled by a single replica
+    consumer = AudioStreamConsumer(RedisStream.GROUP_WHISPER, shards=[])
+    coordinator = ShardCoordinator(
+        RedisStream.GROUP_WHISPER,
+        consumer.consumer,
+        settings.AUDIO_STREAM_SHARDS,
+        on_release=hand_off_shard
+    )
+    ml_logger.info(f"Whisper replica '{consumer.consumer}' joining shard ring")
+    ml_logger.info(f"Whisper streaming {'enabled' if STREAMING else 'disabled'} ({settings.WHISPER_BACKEND} backend)")
+    
+    # Frames are processed in order per interview, in parallel across interviews.
+    # Entries are acked once their frame has been processed.
+    global scheduler
+    processed_entries = []
+    
+    async def handle_frame(interview_id, item):
+        stream, entry_id, frame = item
         try:
-            result = await async_redis_client.blpop(RedisQueue.AUDIO_WHISPER, timeout=1)
+            await process_audio_chunk(frame)
+        finally:
+            processed_entries.append((stream, entry_id, b""))
+    
+    scheduler = KeyedScheduler(
+        "whisper",
+        handle_frame,
+        max_in_flight=settings.WHISPER_MAX_IN_FLIGHT,
+        max_queue_per_key=settings.WHISPER_INTERVIEW_QUEUE_MAX
+    )
+    last_reclaim = 0.0
+    last_rebalance = 0.0
+    last_metrics = time.time()
+    end_watcher = asyncio.create_task(watch_interview_end(interviews))
+    # Membership stays alive even while scheduler.submit() waits on a full
+    # interview queue; rebalancing stays in this loop, between submits, so a
+    # shard is never handed off while its frames are being read
+    heartbeat = asyncio.create_task(coordinator.keep_alive())
+
+    try:
+        while True:
+            try:
+                if time.time() - last_rebalance > settings.SHARD_REBALANCE_INTERVAL:
+                    last_rebalance = time.time()
+                    if await coordinator.rebalance():
+                        consumer.set_shards(coordinator.owned)
+                        await consumer.ensure_groups()
+                
+                if time.time() - last_metrics > METRICS_INTERVAL:
+                    last_metrics = time.time()
+                    await report_metrics(consumer.consumer)
+                
+                # Snapshot changed interview states, drop idle ones
+                await interviews.maintain()
+                
+                # Ack whatever finished since the last pass
+                if processed_entries:
+                    done = processed_entries[:]
+                    del processed_entries[:len(done)]
+                    await consumer.ack(done)
+                
+                if not consumer.streams:
+                    await asyncio.sleep(settings.SHARD_REBALANCE_INTERVAL)
+                    continue
+                
+                # Short block so acks and rebalances stay timely while transcriptions run
+                entries = await consumer.read(block_ms=200)
+            
+                # Periodically take over entries left pending by crashed consumers
+                if time.time() - last_reclaim > RECLAIM_INTERVAL:
+                    last_reclaim = time.time()
+                    entries += await consumer.reclaim()
             
-            if result:
-                _, data_json = result
-                data = json.loads(data_json)
-                await process_audio_chunk(data)
+                for stream, entry_id, raw in entries:
+                    if not raw:
+                        processed_entries.append((stream, entry_id, b""))
+                        continue
+                    try:
+                        frame = decode_audio_frame(raw)
+                    except Exception as e:
+                        ml_logger.error(f"Dropping undecodable audio entry {entry_id} on {stream}: {e}")
+                        processed_entries.append((stream, entry_id, b""))
+                        continue
+                    await scheduler.submit(frame.interview_id, (stream, entry_id, frame))
                 
-        except Exception as e:
-            ml_logger.error(f"Whisper Loop Error: {e}")
-            await asyncio.sleep(1)
+            except Exception as e:
+                ml_logger.error(f"Whisper Loop Error: {e}")
+                await asyncio.sleep(1)
+    finally:
+        # Graceful shutdown: hand buffers over instead of waiting for the member TTL
+        heartbeat.cancel()
+        await coordinator.leave()
 
 if __name__ == "__main__":
     import sys
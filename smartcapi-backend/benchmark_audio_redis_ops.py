@@ -0,0 +1,173 @@
+import asyncio
+import time
+import sys
+import os
+import json
+import numpy as np
+
+# Load test: Redis commands and round-trips per second of audio in the audio processor
+# Usage: python benchmark_audio_redis_ops.py [n_interviews] [seconds]
+#
+# Replays n_interviews concurrent interviews (4096-sample chunks, 256 ms @ 16 kHz,
+# ~70% speech, speaker turns every few seconds) through the Redis side of the
+# audio processor, read in batches of AUDIO_STREAM_BATCH like the stream consumer.
+# Speaker predictions are synthetic; only the Redis traffic is measured.
+# Needs the Redis from settings; merger segments go to a scratch list, not the real queue.
+
+sys.path.append(os.getcwd())
+import redis.asyncio.client
+from app.core.config import settings
+from app.core.redis_client import RedisQueue, RedisChannel
+from app.processing.audio.frame_codec import AudioFrame
+from app.workers import audio_processor
+
+CHUNK = 4096
+CHUNK_SECONDS = CHUNK / settings.SAMPLE_RATE
+INTERVIEW_BASE = 900000  # Synthetic interview ids (keys are deleted afterwards)
+
+
+class RedisCounter:
+    """Count commands and network round-trips of the async client (single commands and pipelines)"""
+
+    def __init__(self, client):
+        self.commands = 0
+        self.round_trips = 0
+        counter = self
+        execute_command = client.execute_command
+        pipeline_execute = redis.asyncio.client.Pipeline.execute
+
+        async def counted_command(*args, **kwargs):
+            counter.commands += 1
+            counter.round_trips += 1
+            return await execute_command(*args, **kwargs)
+
+        async def counted_pipeline(pipe, *args, **kwargs):
+            counter.commands += len(pipe.command_stack)
+            counter.round_trips += 1
+            return await pipeline_execute(pipe, *args, **kwargs)
+
+        client.execute_command = counted_command
+        redis.asyncio.client.Pipeline.execute = counted_pipeline
+
+    def reset(self):
+        self.commands = 0
+        self.round_trips = 0
+
+
+def make_chunks(n_interviews, seconds):
+    """(frame, audio_array, is_silence, speaker) per chunk, interleaved across interviews"""
+    rng = np.random.default_rng(0)
+    n_chunks = int(seconds / CHUNK_SECONDS)
+    start = time.time()
+    streams = []
+    for i in range(n_interviews):
+        interview_id = INTERVIEW_BASE + i
+        speaker = "respondent"
+        stream = []
+        for seq in range(n_chunks):
+            if rng.random() < CHUNK_SECONDS / 4.0:  # a turn every ~4 s
+                speaker = "user_1" if speaker == "respondent" else "respondent"
+            is_silence = rng.random() < 0.3
+            pcm = (rng.normal(0, 1000, CHUNK)).astype(np.int16)
+            frame = AudioFrame(interview_id, 1, seq, start + seq * CHUNK_SECONDS, pcm)
+            label = ("silence", 1.0) if is_silence else (speaker, float(rng.uniform(0.5, 1.0)))
+            stream.append((frame, pcm.astype(np.float32) / 32768.0, is_silence, label))
+        streams.append(stream)
+    return [chunk for group in zip(*streams) for chunk in group]
+
+
+async def previous_chunk_ops(client, frame, audio_array, is_silence, speaker):
+    """Previous process_audio_chunk Redis sequence (one round-trip per command)"""
+    interview_id = frame.interview_id
+    key_buffer = f"interview:{interview_id}:respondent_buffer"
+    key_last_speech = f"interview:{interview_id}:last_speech_time"
+    current_q_id = await client.get(f"interview:{interview_id}:current_question")
+    speaker_label, confidence = speaker
+    if not is_silence:
+        await client.set(key_last_speech, frame.timestamp)
+        if current_q_id:
+            await client.rpush(key_buffer, frame.pcm.tobytes())
+        await client.rpush(RedisQueue.MERGER_SEGMENTS, json.dumps({
+            "interview_id": interview_id,
+            "start_time": frame.timestamp,
+            "end_time": frame.timestamp + len(audio_array) / settings.SAMPLE_RATE,
+            "is_silence": False,
+            "speaker": speaker_label,
+            "confidence": confidence
+        }))
+    elif current_q_id:
+        last_speech = await client.get(key_last_speech)
+        if last_speech and time.time() - float(last_speech) > settings.SILENCE_MIN_DURATION:
+            if await client.llen(key_buffer) > 0:
+                await client.delete(key_buffer)
+    if not is_silence:
+        await client.publish(RedisChannel.interview_updates(interview_id), json.dumps({
+            "type": "speaker_detected",
+            "speaker": speaker_label,
+            "confidence": confidence
+        }))
+
+
+async def cleanup(client, n_interviews):
+    keys = [RedisQueue.MERGER_SEGMENTS]
+    for i in range(n_interviews):
+        keys += [f"interview:{INTERVIEW_BASE + i}:{name}" for name in ("current_question", "last_speech_time", "respondent_buffer")]
+    await client.delete(*keys)
+
+
+async def run(n_interviews, seconds):
+    client = audio_processor.async_redis_client
+    RedisQueue.MERGER_SEGMENTS = "benchmark:merger:segments"
+    chunks = make_chunks(n_interviews, seconds)
+    audio_seconds = n_interviews * seconds
+    batch = settings.AUDIO_STREAM_BATCH
+
+    async def prepare():
+        await cleanup(client, n_interviews)
+        for i in range(n_interviews):
+            await client.set(f"interview:{INTERVIEW_BASE + i}:current_question", 1)
+        audio_processor.speaker_events = audio_processor.EventCoalescer(
+            settings.SPEAKER_EVENT_INTERVAL, settings.SPEAKER_EVENT_ON_CHANGE_ONLY
+        )
+        audio_processor.interview_contexts.clear()
+
+    counter = RedisCounter(client)
+    results = {}
+
+    await prepare()
+    counter.reset()
+    start = time.perf_counter()
+    for chunk in chunks:
+        await previous_chunk_ops(client, *chunk)
+    results["per chunk"] = (counter.commands, counter.round_trips, time.perf_counter() - start)
+
+    await prepare()
+    counter.reset()
+    start = time.perf_counter()
+    for i in range(0, len(chunks), batch):
+        await audio_processor.process_chunk_results(chunks[i:i + batch])
+    results["pipelined"] = (counter.commands, counter.round_trips, time.perf_counter() - start)
+    events = audio_processor.speaker_events
+    contexts = audio_processor.interview_contexts
+
+    await cleanup(client, n_interviews)
+
+    print(f"{n_interviews} interviews x {seconds}s of audio ({len(chunks)} chunks, batch size {batch})")
+    for name, (commands, round_trips, elapsed) in results.items():
+        print(
+            f"  {name:10s} {commands / audio_seconds:6.2f} commands/audio s, "
+            f"{round_trips / audio_seconds:6.2f} round-trips/audio s, {elapsed:.2f}s"
+        )
+    print(f"  speaker_detected: {events.published} published, {events.coalesced} coalesced "
+          f"(interval {settings.SPEAKER_EVENT_INTERVAL}s, on change only: {settings.SPEAKER_EVENT_ON_CHANGE_ONLY})")
+    print(f"  interview context cache: {contexts.hits} hits, {contexts.misses} misses")
+
+
+def main():
+    n_interviews = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 60.0
+    asyncio.run(run(n_interviews, seconds))
+
+
+if __name__ == "__main__":
+    main()
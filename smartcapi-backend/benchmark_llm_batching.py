@@ -0,0 +1,109 @@
+import sys
+import os
+import numpy as np
+
+# Benchmark: LLM extraction calls per interview, one per fragment vs ExtractionBatcher
+# Usage: python benchmark_llm_batching.py [n_interviews] [minutes]
+#
+# Replays the finalized fragments the merger pushes for an interview: a fragment
+# every 0.5-4 s while someone speaks (a few words each, streaming Whisper commits),
+# a question change every 20-60 s (set_question flushes the batch) and the end of
+# the interview (flushes the rest). Counts extraction calls, prompt tokens (the
+# question schema and instructions are sent once per call) and the delay each
+# fragment spends in a batch before its extraction starts.
+
+sys.path.append(os.getcwd())
+from app.core.config import settings
+from app.workers.llm_worker import ExtractionBatcher, estimate_tokens, format_fragments
+from app.services.llm_service import EXTRACTION_PROMPT_TEMPLATE
+
+STEP = 0.05  # Simulation clock resolution (the worker wakes exactly at deadlines)
+PROMPT_TOKENS = estimate_tokens(EXTRACTION_PROMPT_TEMPLATE) + 60  # Instructions + schema list
+
+
+def make_events(minutes, rng):
+    """(time, kind, speaker, text) with kind "fragment" or "question", sorted by time"""
+    words = ["saya", "tinggal", "di", "jalan", "mawar", "nomor", "dua", "puluh", "lahir", "tahun", "sembilan", "belas"]
+    events = []
+    t = 0.0
+    next_question = rng.uniform(20, 60)
+    while t < minutes * 60:
+        t += rng.uniform(0.5, 4.0)
+        if t >= next_question:
+            events.append((next_question, "question", None, None))
+            next_question += rng.uniform(20, 60)
+        speaker = "respondent" if rng.random() < 0.6 else "user_1"
+        text = " ".join(rng.choice(words, size=int(rng.integers(2, 9))))
+        events.append((t, "fragment", speaker, text))
+    return events
+
+
+def previous_calls(events):
+    """Previous worker: one extraction per fragment, no waiting"""
+    fragments = [e for e in events if e[1] == "fragment"]
+    tokens = sum(PROMPT_TOKENS + estimate_tokens(e[3]) for e in fragments)
+    return len(fragments), tokens, [0.0] * len(fragments)
+
+
+def batched_calls(events, batcher):
+    """Feed events through the batcher with a simulated clock"""
+    calls = 0
+    tokens = 0
+    delays = []
+    arrivals = {}
+    i = 0
+    now = 0.0
+    end = events[-1][0] if events else 0.0
+    while i < len(events) or len(batcher):
+        while i < len(events) and events[i][0] <= now:
+            t, kind, speaker, text = events[i]
+            if kind == "question":
+                batcher.request_flush(1)
+            else:
+                batcher.add(1, speaker, text, now=t)
+                arrivals.setdefault(1, []).append(t)
+            i += 1
+        if i == len(events) and now >= end:
+            batcher.request_flush(1)  # Interview ended
+        for interview_id in batcher.due(now=now):
+            fragments = batcher.pop(interview_id)
+            calls += 1
+            tokens += PROMPT_TOKENS + estimate_tokens(format_fragments(fragments))
+            delays += [now - t for t in arrivals.pop(interview_id)]
+        now += STEP
+    return calls, tokens, delays
+
+
+def main():
+    n_interviews = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    minutes = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    rng = np.random.default_rng(0)
+
+    totals = {"per fragment": [0, 0, []], "batched": [0, 0, []]}
+    n_fragments = 0
+    for _ in range(n_interviews):
+        events = make_events(minutes, rng)
+        n_fragments += sum(1 for e in events if e[1] == "fragment")
+        batcher = ExtractionBatcher(
+            settings.LLM_BATCH_DEBOUNCE, settings.LLM_BATCH_MAX_WAIT,
+            settings.LLM_BATCH_MAX_FRAGMENTS, settings.LLM_BATCH_MAX_TOKENS
+        )
+        for name, result in (("per fragment", previous_calls(events)), ("batched", batched_calls(events, batcher))):
+            totals[name][0] += result[0]
+            totals[name][1] += result[1]
+            totals[name][2] += result[2]
+
+    print(f"{n_interviews} interviews x {minutes:g} min, {n_fragments / n_interviews:.0f} fragments per interview")
+    print(f"  windows: debounce {settings.LLM_BATCH_DEBOUNCE}s, max wait {settings.LLM_BATCH_MAX_WAIT}s, "
+          f"{settings.LLM_BATCH_MAX_FRAGMENTS} fragments, {settings.LLM_BATCH_MAX_TOKENS} tokens")
+    for name, (calls, tokens, delays) in totals.items():
+        print(
+            f"  {name:12s} {calls / n_interviews:7.1f} calls/interview, {tokens / n_interviews:9,.0f} prompt tokens/interview, "
+            f"batch delay mean {np.mean(delays):.2f}s p95 {np.percentile(delays, 95):.2f}s max {np.max(delays):.2f}s"
+        )
+    old, new = totals["per fragment"], totals["batched"]
+    print(f"  calls: {old[0] / new[0]:.1f}x fewer, prompt tokens: {old[1] / new[1]:.1f}x fewer")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import asyncio
+import time
+import sys
+import os
+import numpy as np
+
+# Benchmark: reprocessing interviews with the LLM response cache
+# Usage: python benchmark_llm_cache.py [n_interviews] [segments_per_interview]
+#
+# Runs the LLM stage of /interviews/{id}/process-audio (diarization correction,
+# normalization, extraction) for n_interviews synthetic transcripts against the
+# local mock OpenAI server of benchmark_llm_worker.py (1.5-3 s per call, like
+# long prompts), twice: a cold pass and a reprocess of the unchanged interviews.
+# Needs the Redis from settings; the cache is cleared before and after.
+
+sys.path.append(os.getcwd())
+from openai import OpenAI
+from app.core.config import settings
+from benchmark_llm_worker import start_mock_server, MockOpenAIHandler
+
+LATENCY = (1.5, 3.0)
+
+
+def make_interviews(n_interviews, n_segments):
+    rng = np.random.default_rng(0)
+    words = ["saya", "tinggal", "di", "jalan", "mawar", "nomor", "dua", "lahir", "tahun", "bekerja", "sebagai", "guru"]
+    interviews = []
+    for _ in range(n_interviews):
+        segments = [
+            {"speaker": "Enumerator" if i % 2 == 0 else "Respondent", "text": " ".join(rng.choice(words, size=8))}
+            for i in range(n_segments)
+        ]
+        interviews.append(segments)
+    return interviews
+
+
+async def process_llm_stage(llm, segments, use_cache=True):
+    """LLM calls of process_audio for one interview"""
+    correction = await llm.correct_diarization(segments, use_cache=use_cache)
+    text = " ".join(s["text"] for s in segments)
+    normalized = await llm.normalize_transcript(text, use_cache=use_cache)
+    extracted = await llm.extract_information(normalized, use_cache=use_cache)
+    return correction, normalized, extracted
+
+
+async def run(n_interviews, n_segments):
+    server, base_url = start_mock_server(0.0, LATENCY)
+    settings.OPENAI_API_KEY = "mock"
+    settings.OPENAI_BASE_URL = base_url
+    from app.services.llm_service import llm_service
+    from app.services.llm_cache import llm_cache
+    llm_service.client = OpenAI(api_key="mock", base_url=base_url)
+    llm_cache.clear()
+
+    interviews = make_interviews(n_interviews, n_segments)
+    print(f"{n_interviews} interviews x {n_segments} segments, mock LLM latency {LATENCY[0]}-{LATENCY[1]}s per call")
+    results = {}
+    for name in ("first run", "reprocess"):
+        MockOpenAIHandler.stats.update(requests=0, rate_limited=0)
+        hits, misses = llm_cache.hits, llm_cache.misses
+        start = time.perf_counter()
+        results[name] = [await process_llm_stage(llm_service, segments) for segments in interviews]
+        elapsed = time.perf_counter() - start
+        print(
+            f"  {name:10s} {elapsed:7.2f}s ({elapsed / n_interviews:.2f}s per interview), "
+            f"{MockOpenAIHandler.stats['requests']} API requests, "
+            f"cache {llm_cache.hits - hits} hits / {llm_cache.misses - misses} misses"
+        )
+    print(f"  identical results: {results['first run'] == results['reprocess']}")
+    print(f"  cache: {llm_cache.stats()}")
+
+    llm_cache.clear()
+    server.shutdown()
+
+
+def main():
+    n_interviews = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    n_segments = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    asyncio.run(run(n_interviews, n_segments))
+
+
+if __name__ == "__main__":
+    main()
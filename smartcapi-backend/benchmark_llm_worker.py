@@ -0,0 +1,168 @@
+import asyncio
+import time
+import sys
+import os
+import json
+import random
+import threading
+import numpy as np
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Benchmark: LLM worker extraction throughput and latency against a local mock OpenAI server
+# Usage: python benchmark_llm_worker.py [n_interviews] [seconds] [rate_limited_fraction]
+#
+# Extraction batches arrive from n_interviews interviews (one every ~8 s each,
+# like the batched merger fragments) for `seconds`. The mock server answers
+# chat completions after 0.4-0.8 s and rejects a fraction of requests with 429
+# + retry-after-ms. Compares the previous worker (one sync call at a time via
+# run_in_executor) with the async client under KeyedScheduler (LLM_MAX_IN_FLIGHT
+# across interviews, in order per interview). Only the OpenAI side is measured.
+
+sys.path.append(os.getcwd())
+from openai import OpenAI
+from app.core.config import settings
+from app.core.keyed_scheduler import KeyedScheduler
+
+BATCH_INTERVAL = 8.0  # Seconds between extraction batches of one interview
+ANSWER = json.dumps({"nama": "Budi Santoso", "alamat": None})
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """POST /v1/chat/completions with a fixed answer, latency and random 429s"""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, so connection pooling counts
+    rate_limited = 0.0
+    latency = (0.4, 0.8)
+    stats = {"requests": 0, "rate_limited": 0}
+    lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.lock:
+            self.stats["requests"] += 1
+            limited = random.random() < self.rate_limited
+            if limited:
+                self.stats["rate_limited"] += 1
+        if limited:
+            body = json.dumps({"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}})
+            self._send(429, body, {"retry-after-ms": "250"})
+            return
+        time.sleep(random.uniform(*self.latency))
+        body = json.dumps({
+            "id": "chatcmpl-mock", "object": "chat.completion", "created": int(time.time()), "model": "gpt-4o-mini",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": ANSWER}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 900, "completion_tokens": 20, "total_tokens": 920}
+        })
+        self._send(200, body)
+
+    def _send(self, status, body, headers=None):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_mock_server(rate_limited, latency=(0.4, 0.8)):
+    MockOpenAIHandler.rate_limited = rate_limited
+    MockOpenAIHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockOpenAIHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def make_arrivals(n_interviews, seconds):
+    """(arrival time, interview id, sequence, transcript), sorted by time"""
+    rng = np.random.default_rng(0)
+    arrivals = []
+    for interview_id in range(1, n_interviews + 1):
+        t = rng.uniform(0, BATCH_INTERVAL)
+        seq = 0
+        while t < seconds:
+            arrivals.append((t, interview_id, seq, f"Respondent: nama saya Budi Santoso, batch {seq}"))
+            seq += 1
+            t += rng.uniform(0.5, 1.5) * BATCH_INTERVAL
+    return sorted(arrivals)
+
+
+async def run_previous(llm, arrivals):
+    """Previous LLMWorker loop: one extraction at a time on the sync client"""
+    loop = asyncio.get_running_loop()
+    latencies, failures = [], 0
+    start = time.perf_counter()
+    for t, interview_id, seq, text in arrivals:
+        wait = t - (time.perf_counter() - start)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        result = await loop.run_in_executor(None, lambda: llm.extract_information_sync(text))
+        failures += not result
+        latencies.append(time.perf_counter() - start - t)
+    return latencies, failures, time.perf_counter() - start, True
+
+
+async def run_concurrent(llm, arrivals):
+    """LLMWorker now: async client, KeyedScheduler per interview, LLM_MAX_IN_FLIGHT slots"""
+    latencies, failures = [], [0]
+    completed = {}
+    start = time.perf_counter()
+
+    async def handle(interview_id, item):
+        t, seq, text = item
+        async with scheduler.slot():
+            result = await llm.extract_information(text)
+        failures[0] += not result
+        latencies.append(time.perf_counter() - start - t)
+        completed.setdefault(interview_id, []).append(seq)
+
+    scheduler = KeyedScheduler("llm-benchmark", handle, settings.LLM_MAX_IN_FLIGHT, settings.LLM_INTERVIEW_QUEUE_MAX)
+    for t, interview_id, seq, text in arrivals:
+        wait = t - (time.perf_counter() - start)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        await scheduler.submit(interview_id, (t, seq, text))
+    for interview_id in {a[1] for a in arrivals}:
+        await scheduler.drain(interview_id)
+    in_order = all(seqs == sorted(seqs) for seqs in completed.values())
+    return latencies, failures[0], time.perf_counter() - start, in_order
+
+
+async def run(n_interviews, seconds, rate_limited):
+    server, base_url = start_mock_server(rate_limited)
+    settings.OPENAI_API_KEY = "mock"
+    settings.OPENAI_BASE_URL = base_url
+    from app.services.llm_service import llm_service
+    llm_service.client = OpenAI(api_key="mock", base_url=base_url)
+
+    arrivals = make_arrivals(n_interviews, seconds)
+    print(f"{n_interviews} interviews x {seconds:g}s, {len(arrivals)} extraction batches "
+          f"({len(arrivals) / seconds:.1f}/s offered), {rate_limited:.0%} of requests rate limited (429)")
+    print(f"  async client: {settings.LLM_MAX_IN_FLIGHT} in flight, pool of {settings.LLM_MAX_CONNECTIONS} connections, "
+          f"{settings.LLM_MAX_RETRIES} retries")
+    for name, runner in (("previous", run_previous), ("concurrent", run_concurrent)):
+        MockOpenAIHandler.stats.update(requests=0, rate_limited=0)
+        latencies, failures, elapsed, in_order = await runner(llm_service, arrivals)
+        print(
+            f"  {name:10s} {len(arrivals) / elapsed:5.2f} batches/s, latency p50 {np.percentile(latencies, 50):6.2f}s "
+            f"p95 {np.percentile(latencies, 95):6.2f}s max {np.max(latencies):6.2f}s, {failures} failed, "
+            f"{MockOpenAIHandler.stats['requests']} requests ({MockOpenAIHandler.stats['rate_limited']} x 429), "
+            f"in order per interview: {in_order}, {elapsed:.1f}s"
+        )
+    server.shutdown()
+
+
+def main():
+    n_interviews = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 60.0
+    rate_limited = float(sys.argv[3]) if len(sys.argv) > 3 else 0.1
+    asyncio.run(run(n_interviews, seconds, rate_limited))
+
+
+if __name__ == "__main__":
+    main()
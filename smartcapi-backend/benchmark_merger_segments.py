@@ -0,0 +1,107 @@
+import time
+import sys
+import os
+import numpy as np
+
+# Benchmark: merger majority-speaker lookup, list scan vs SegmentIndex
+# Usage: python benchmark_merger_segments.py [hours]
+#
+# Replays a synthetic interview: a speech segment every 256 ms (audio processor
+# chunk), speaker turns every few seconds, ~80% speech, and every 3-5 s two
+# partial transcripts and a final one for the utterance since the previous final.
+# Compares the previous per-transcript scan over all segments with the index,
+# which evicts segments older than the last finalized transcript.
+
+sys.path.append(os.getcwd())
+from app.core.config import settings
+from app.processing.audio.segment_index import SegmentIndex
+
+CHUNK_SECONDS = 4096 / 16000
+
+
+def previous_majority(segments, start, end):
+    """Previous Interviewstate.get_majority_speaker: scan every segment"""
+    counts = {}
+    for seg in segments:
+        overlap_start = max(start, seg["start_time"])
+        overlap_end = min(end, seg["end_time"])
+        if overlap_end > overlap_start:
+            counts[seg["speaker"]] = counts.get(seg["speaker"], 0.0) + overlap_end - overlap_start
+    if not counts:
+        return "unknown"
+    return max(counts, key=counts.get)
+
+
+def make_events(hours):
+    """("segment", start, end, speaker) and ("transcript", start, end, is_final) events in arrival order"""
+    rng = np.random.default_rng(0)
+    events = []
+    speaker = "respondent"
+    t = 0.0
+    next_transcript = 4.0
+    last_final = 0.0
+    while t < hours * 3600:
+        if rng.random() < CHUNK_SECONDS / 4.0:
+            speaker = "user_1" if speaker == "respondent" else "respondent"
+        if rng.random() < 0.8:
+            # Chunk lengths vary a little (client buffers)
+            events.append(("segment", t, t + CHUNK_SECONDS * rng.uniform(0.9, 1.0), speaker))
+        t += CHUNK_SECONDS
+        if t >= next_transcript:
+            start = last_final + rng.uniform(0.0, 0.5)
+            for partial_end in (start + (t - start) / 3, start + 2 * (t - start) / 3):
+                events.append(("transcript", start, partial_end, False))
+            events.append(("transcript", start, t, True))
+            last_final = t
+            next_transcript = t + rng.uniform(3.0, 5.0)
+    return events
+
+
+def main():
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    events = make_events(hours)
+    n_segments = sum(1 for e in events if e[0] == "segment")
+    n_transcripts = len(events) - n_segments
+
+    segments = []
+    old = []
+    old_last = []
+    start_time = time.perf_counter()
+    for event in events:
+        if event[0] == "segment":
+            segments.append({"start_time": event[1], "end_time": event[2], "speaker": event[3]})
+        else:
+            t0 = time.perf_counter()
+            old.append(previous_majority(segments, event[1], event[2]))
+            old_last.append(time.perf_counter() - t0)
+    t_old = time.perf_counter() - start_time
+
+    index = SegmentIndex(max_segments=settings.MERGER_MAX_SEGMENTS)
+    new = []
+    new_last = []
+    retained = 0
+    start_time = time.perf_counter()
+    for event in events:
+        if event[0] == "segment":
+            index.add(event[1], event[2], event[3])
+        else:
+            t0 = time.perf_counter()
+            new.append(index.majority_speaker(event[1], event[2]))
+            new_last.append(time.perf_counter() - t0)
+            if event[3]:
+                index.evict_before(event[2] - settings.MERGER_SEGMENT_SLACK_SECONDS)
+            retained = max(retained, len(index))
+    t_new = time.perf_counter() - start_time
+
+    tail = max(1, len(old_last) // 20)
+    print(f"{hours:g} h interview: {n_segments} segments, {n_transcripts} transcripts")
+    print(f"  list scan: {t_old:.2f}s total, {np.mean(old_last[-tail:]) * 1e6:,.0f} us/lookup in the last 5%, "
+          f"{len(segments)} segments retained")
+    print(f"  index:     {t_new:.2f}s total, {np.mean(new_last[-tail:]) * 1e6:,.0f} us/lookup in the last 5%, "
+          f"max {retained} segments retained")
+    print(f"  speedup:   {t_old / t_new:.1f}x")
+    print(f"  identical majority speakers: {old == new}")
+
+
+if __name__ == "__main__":
+    main()
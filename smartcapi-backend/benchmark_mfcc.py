@@ -0,0 +1,73 @@
+import time
+import sys
+import os
+import glob
+import numpy as np
+
+# Benchmark: librosa MFCC features vs the NumPy MFCC engine
+# Usage: python benchmark_mfcc.py [audio_dir]  (default: app/storage/uploads/audio)
+#
+# Audio is cut into 4096-sample chunks (256 ms, the client's ScriptProcessor size).
+# Reports time per chunk for the librosa reference, the engine one chunk at a
+# time and the engine on a batch, plus the largest difference to librosa.
+
+sys.path.append(os.getcwd())
+from app.core.config import settings
+from app.processing.audio.feature_extractor import extract_mfcc_features_librosa
+from app.processing.audio.mfcc_engine import get_engine
+
+SAMPLE_RATE = settings.SAMPLE_RATE
+CHUNK = 4096
+BATCH = 32
+
+
+def load(path):
+    try:
+        from faster_whisper.audio import decode_audio
+        return decode_audio(path, sampling_rate=SAMPLE_RATE)
+    except ImportError:
+        import librosa
+        return librosa.load(path, sr=SAMPLE_RATE)[0].astype(np.float32)
+
+
+def main():
+    audio_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join("app", "storage", "uploads", "audio")
+    paths = sorted(glob.glob(os.path.join(audio_dir, "**", "*.*"), recursive=True))
+    if not paths:
+        print(f"No recordings found in {audio_dir}")
+        return
+    recordings = [load(p) for p in paths]
+    chunks = [a[i:i + CHUNK] for a in recordings for i in range(0, len(a) - CHUNK + 1, CHUNK)]
+    engine = get_engine(SAMPLE_RATE)
+
+    # Warm up (librosa caches, FFT plans)
+    extract_mfcc_features_librosa(chunks[0], SAMPLE_RATE)
+    engine.features(chunks[0])
+
+    start = time.perf_counter()
+    reference = np.stack([extract_mfcc_features_librosa(c, SAMPLE_RATE) for c in chunks])
+    t_librosa = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = np.stack([engine.features(c) for c in chunks])
+    t_single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = np.concatenate([engine.features(np.stack(chunks[i:i + BATCH])) for i in range(0, len(chunks), BATCH)])
+    t_batch = time.perf_counter() - start
+
+    whole_ref = np.stack([extract_mfcc_features_librosa(a, SAMPLE_RATE) for a in recordings])
+    whole = np.stack([engine.features(a) for a in recordings])
+
+    n = len(chunks)
+    print(f"{len(paths)} recordings, {n} chunks of {CHUNK} samples, batch size {BATCH}")
+    print(f"  librosa:        {1000 * t_librosa / n:.3f} ms/chunk")
+    print(f"  engine:         {1000 * t_single / n:.3f} ms/chunk ({t_librosa / t_single:.1f}x)")
+    print(f"  engine batched: {1000 * t_batch / n:.3f} ms/chunk ({t_librosa / t_batch:.1f}x)")
+    for name, ours, ref in (("chunks", batched, reference), ("chunks, single", single, reference), ("whole recordings", whole, whole_ref)):
+        diff = np.abs(ours - ref)
+        print(f"  max diff ({name}): {diff.max():.2e} absolute, {diff.max() / np.abs(ref).max():.2e} of the largest value")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import time
+import sys
+import os
+import pickle
+import tempfile
+import numpy as np
+
+# Benchmark: pickled sklearn RandomForestClassifier vs the exported array forest
+# Usage: python benchmark_rf_arrays.py [n_trials]
+#
+# Uses the trained RF model if present, otherwise a 100-tree forest fitted on
+# random 198-dim vectors (same shape/cost as the production model).
+# Reports load time per process start and predict_proba latency for the
+# batch sizes the audio processor produces.
+
+sys.path.append(os.getcwd())
+from app.core.config import settings
+from app.processing.models.forest_arrays import ForestArrays, export_forest
+
+BATCH_SIZES = (1, 4, 16, 64)
+
+
+def load_model():
+    if os.path.exists(settings.RF_MODEL_PATH):
+        with open(settings.RF_MODEL_PATH, "rb") as f:
+            model = pickle.load(f)
+        if hasattr(model, "classes_"):
+            print(f"Using trained model {settings.RF_MODEL_PATH}")
+            return model
+    from sklearn.ensemble import RandomForestClassifier
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 198))
+    y = rng.choice(["user_1", "user_2", "user_3", "respondent"], size=400)
+    print("Using a synthetic 100-tree forest (no trained model found)")
+    return RandomForestClassifier(n_estimators=100, random_state=42).fit(X, y)
+
+
+def timed(fn, trials):
+    start = time.perf_counter()
+    for _ in range(trials):
+        result = fn()
+    return (time.perf_counter() - start) / trials, result
+
+
+def main():
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    model = load_model()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pkl_path = os.path.join(tmp, "rf_model.pkl")
+        npz_path = os.path.join(tmp, "rf_model.npz")
+        with open(pkl_path, "wb") as f:
+            pickle.dump(model, f)
+        export_forest(model, npz_path)
+
+        def load_pickle():
+            with open(pkl_path, "rb") as f:
+                return pickle.load(f)
+
+        t_pickle, _ = timed(load_pickle, 10)
+        t_arrays, forest = timed(lambda: ForestArrays.load(npz_path), 10)
+        print(f"{forest.n_estimators} trees, {len(forest.feature)} nodes, depth {forest.max_depth}")
+        print(f"  file size:  pickle {os.path.getsize(pkl_path) / 1e6:.2f} MB, npz {os.path.getsize(npz_path) / 1e6:.2f} MB")
+        print(f"  load:       pickle {1000 * t_pickle:.1f} ms, mmap {1000 * t_arrays:.2f} ms ({t_pickle / t_arrays:.0f}x)")
+
+        rng = np.random.default_rng(1)
+        identical = True
+        for batch in BATCH_SIZES:
+            X = rng.normal(size=(batch, 198))
+            t_sk, p_sk = timed(lambda: model.predict_proba(X), trials)
+            t_ar, p_ar = timed(lambda: forest.predict_proba(X), trials)
+            identical &= np.allclose(p_sk, p_ar, rtol=0, atol=1e-12)
+            print(f"  batch {batch:3d}:  sklearn {1000 * t_sk:.2f} ms, arrays {1000 * t_ar:.2f} ms ({t_sk / t_ar:.1f}x)")
+        print(f"  identical probabilities: {identical}")
+
+
+if __name__ == "__main__":
+    main()
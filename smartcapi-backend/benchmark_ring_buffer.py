@@ -0,0 +1,110 @@
+import time
+import sys
+import os
+import numpy as np
+
+# Microbenchmark: InterviewState audio buffering, np.concatenate vs ring buffer
+# 16 kHz audio, 20 ms frames, commit every ~10 s (like the Whisper worker)
+
+sys.path.append(os.getcwd())
+from app.processing.audio.ring_buffer import AudioRingBuffer
+
+SAMPLE_RATE = 16000
+FRAME = int(0.020 * SAMPLE_RATE)  # 320 samples
+MAX_SECONDS = 60
+
+
+class ConcatBuffer:
+    """Previous InterviewState buffering (np.concatenate per frame)"""
+
+    def __init__(self):
+        self.audio_buffer = np.array([], dtype=np.float32)
+        self.buffer_start_time = 0.0
+
+    def add_audio(self, samples, timestamp):
+        if len(self.audio_buffer) == 0:
+            self.buffer_start_time = timestamp
+            self.audio_buffer = samples
+        else:
+            self.audio_buffer = np.concatenate((self.audio_buffer, samples))
+        max_samples = MAX_SECONDS * SAMPLE_RATE
+        if len(self.audio_buffer) > max_samples:
+            drop_count = len(self.audio_buffer) - max_samples
+            self.audio_buffer = self.audio_buffer[drop_count:]
+            self.buffer_start_time += drop_count / SAMPLE_RATE
+
+    def window(self):
+        return self.audio_buffer, self.buffer_start_time
+
+    def commit(self, end_time):
+        samples_to_drop = int((end_time - self.buffer_start_time) * SAMPLE_RATE)
+        if samples_to_drop <= 0:
+            return
+        if samples_to_drop >= len(self.audio_buffer):
+            self.audio_buffer = np.array([], dtype=np.float32)
+            self.buffer_start_time = end_time
+        else:
+            self.audio_buffer = self.audio_buffer[samples_to_drop:]
+            self.buffer_start_time += samples_to_drop / SAMPLE_RATE
+
+
+class RingBuffer:
+    """Current InterviewState buffering (AudioRingBuffer)"""
+
+    def __init__(self):
+        self.ring = AudioRingBuffer(MAX_SECONDS * SAMPLE_RATE, SAMPLE_RATE)
+
+    def add_audio(self, samples, timestamp):
+        self.ring.append(samples, timestamp)
+
+    def window(self):
+        return self.ring.view(), self.ring.start_time
+
+    def commit(self, end_time):
+        self.ring.consume_until(end_time)
+
+
+def run(buffer, frames, commit_every):
+    t = 0.0
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        buffer.add_audio(frame, t)
+        t += FRAME / SAMPLE_RATE
+        if commit_every and (i + 1) % commit_every == 0:
+            window, window_start = buffer.window()
+            buffer.commit(window_start + len(window) / SAMPLE_RATE)
+    return time.perf_counter() - start
+
+
+def main():
+    minutes = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    n_frames = int(minutes * 60 * SAMPLE_RATE / FRAME)
+    rng = np.random.default_rng(0)
+    frames = [rng.uniform(-0.1, 0.1, FRAME).astype(np.float32) for _ in range(n_frames)]
+
+    print(f"{minutes:.0f} min of audio, {n_frames} frames of {FRAME} samples @ {SAMPLE_RATE} Hz")
+    scenarios = [
+        ("commit every 10s", int(10 * SAMPLE_RATE / FRAME)),
+        ("no commits (buffer saturates at 60s)", 0),
+    ]
+    for name, commit_every in scenarios:
+        t_concat = run(ConcatBuffer(), frames, commit_every)
+        t_ring = run(RingBuffer(), frames, commit_every)
+        print(f"\n{name}")
+        print(f"  concatenate: {t_concat:.3f}s ({n_frames / t_concat:,.0f} frames/s)")
+        print(f"  ring buffer: {t_ring:.3f}s ({n_frames / t_ring:,.0f} frames/s)")
+        print(f"  speedup:     {t_concat / t_ring:.1f}x")
+
+    # Sanity check: both implementations expose the same window
+    a, b = ConcatBuffer(), RingBuffer()
+    for i, frame in enumerate(frames[:5000]):
+        a.add_audio(frame, i * FRAME / SAMPLE_RATE)
+        b.add_audio(frame, i * FRAME / SAMPLE_RATE)
+    wa, sa = a.window()
+    wb, sb = b.window()
+    assert np.array_equal(wa, wb) and abs(sa - sb) < 1e-9
+    print("\nWindows identical.")
+
+
+if __name__ == "__main__":
+    main()
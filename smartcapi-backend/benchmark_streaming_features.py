@@ -0,0 +1,80 @@
+import time
+import sys
+import os
+import glob
+import numpy as np
+
+# Benchmark: speaker features per chunk (extract_mfcc_features) vs the
+# per-interview rolling window (StreamingMFCC)
+# Usage: python benchmark_streaming_features.py [audio_dir]  (default: app/storage/uploads/audio)
+#
+# Audio is fed in 4096-sample chunks (256 ms, the client's ScriptProcessor size)
+# and one 198-dim vector is computed per chunk, as the audio processor does.
+
+sys.path.append(os.getcwd())
+from app.core.config import settings
+from app.processing.audio.feature_extractor import extract_mfcc_features
+from app.processing.audio.streaming_features import StreamingMFCC
+
+SAMPLE_RATE = settings.SAMPLE_RATE
+CHUNK = 4096
+
+
+def load(path):
+    try:
+        from faster_whisper.audio import decode_audio
+        return decode_audio(path, sampling_rate=SAMPLE_RATE)
+    except ImportError:
+        import librosa
+        return librosa.load(path, sr=SAMPLE_RATE)[0].astype(np.float32)
+
+
+def main():
+    audio_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join("app", "storage", "uploads", "audio")
+    paths = sorted(glob.glob(os.path.join(audio_dir, "**", "*.*"), recursive=True))
+    if not paths:
+        print(f"No recordings found in {audio_dir}")
+        return
+    recordings = [load(p) for p in paths]
+    seconds = sum(len(a) for a in recordings) / SAMPLE_RATE
+    window = int(settings.SPEAKER_WINDOW_SECONDS * SAMPLE_RATE)
+
+    # Warm up librosa caches
+    extract_mfcc_features(recordings[0][:CHUNK], SAMPLE_RATE)
+
+    t_chunk = t_stream = 0.0
+    similarities = []
+    for audio in recordings:
+        chunks = [audio[i:i + CHUNK] for i in range(0, len(audio) - CHUNK + 1, CHUNK)]
+
+        start = time.perf_counter()
+        for chunk in chunks:
+            extract_mfcc_features(chunk, SAMPLE_RATE)
+        t_chunk += time.perf_counter() - start
+
+        stream = StreamingMFCC(SAMPLE_RATE)
+        rolling = []
+        start = time.perf_counter()
+        for chunk in chunks:
+            stream.push(chunk)
+            rolling.append(stream.features())
+        t_stream += time.perf_counter() - start
+
+        # Agreement with the batch extractor over the same window
+        for i in range(0, len(chunks), 10):
+            if rolling[i] is None:
+                continue
+            end = (i + 1) * CHUNK
+            reference = extract_mfcc_features(audio[max(0, end - window):end], SAMPLE_RATE)
+            cos = np.dot(reference, rolling[i]) / (np.linalg.norm(reference) * np.linalg.norm(rolling[i]))
+            similarities.append(cos)
+
+    print(f"{len(paths)} recordings, {seconds:.1f}s of audio, {CHUNK}-sample chunks, {settings.SPEAKER_WINDOW_SECONDS}s window")
+    print(f"  per-chunk MFCC:  {1000 * t_chunk / seconds:.2f} ms CPU per second of audio")
+    print(f"  rolling window:  {1000 * t_stream / seconds:.2f} ms CPU per second of audio")
+    print(f"  speedup:         {t_chunk / t_stream:.1f}x")
+    print(f"  cosine similarity to extract_mfcc_features(window): min {min(similarities):.4f}, mean {np.mean(similarities):.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,41 +2,61 @@ import subprocess
 import sys
 import time
 import os
+import argparse
 
-# List of worker modules to run
-workers = [
-    "app.workers.audio_processor",
-    "app.workers.whisper_worker",
-    "app.workers.merger",
-    "app.workers.llm_worker"
-]
+# Worker modules to run and how many replicas of each.
+# Audio processor and Whisper replicas each split the stream shards between
+# them, so every interview is handled by one replica of each. Merger, LLM and
+# training workers keep a single instance.
+workers = {
+    "app.workers.audio_processor": int(os.environ.get("AUDIO_PROCESSOR_REPLICAS", 1)),
+    "app.workers.whisper_worker": int(os.environ.get("WHISPER_WORKER_REPLICAS", 1)),
+    "app.workers.merger": 1,
+    "app.workers.llm_worker": 1,
+    "app.workers.training_worker": 1
+}
+
+def launch(worker, replica):
+    # Stable per-replica name so a restarted replica resumes its own pending entries
+    env = dict(os.environ)
+    env["WORKER_NAME"] = f"{worker.rsplit('.', 1)[-1]}-{replica}"
+    # Use -m to run as module so imports work correctly
+    return subprocess.Popen([sys.executable, "-m", worker], cwd=os.getcwd(), env=env)
 
 def main():
+    parser = argparse.ArgumentParser(description="Run SmartCAPI workers")
+    parser.add_argument("--audio", type=int, help="Number of audio processor replicas")
+    parser.add_argument("--whisper", type=int, help="Number of Whisper worker replicas")
+    args = parser.parse_args()
+    if args.audio:
+        workers["app.workers.audio_processor"] = args.audio
+    if args.whisper:
+        workers["app.workers.whisper_worker"] = args.whisper
+
     processes = []
-    
+
     print("Starting SmartCAPI Hybrid Workers...")
     print(f"Python executable: {sys.executable}")
-    
+
     try:
-        for worker in workers:
-            print(f"Launching {worker}...")
-            # Use -m to run as module so imports work correctly
-            p = subprocess.Popen([sys.executable, "-m", worker], cwd=os.getcwd())
-            processes.append(p)
-            
+        for worker, replicas in workers.items():
+            for replica in range(replicas):
+                print(f"Launching {worker} (replica {replica})...")
+                processes.append((worker, replica, launch(worker, replica)))
+
         print("All workers started. Press Ctrl+C to stop.")
-        
+
         while True:
             # Check if any process died
-            for i, p in enumerate(processes):
+            for i, (worker, replica, p) in enumerate(processes):
                 if p.poll() is not None:
-                    print(f"Worker {workers[i]} died with code {p.returncode}. Restarting...")
-                    processes[i] = subprocess.Popen([sys.executable, "-m", workers[i]], cwd=os.getcwd())
+                    print(f"Worker {worker} (replica {replica}) died with code {p.returncode}. Restarting...")
+                    processes[i] = (worker, replica, launch(worker, replica))
             time.sleep(1)
-            
+
     except KeyboardInterrupt:
         print("\nStopping workers...")
-        for p in processes:
+        for _, _, p in processes:
             p.terminate()
         print("Done.")
 
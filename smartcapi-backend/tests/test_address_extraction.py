@@ -36,7 +36,7 @@ def test_extraction():
             f.write(f"Transcript: {case['transcript']}\n")
             
             try:
-                result = llm_service.extract_information(case['transcript'])
+                result = llm_service.extract_information_sync(case['transcript'])
                 extracted_address = result.get('alamat')
                 
                 f.write(f"Extracted Address: {extracted_address}\n")